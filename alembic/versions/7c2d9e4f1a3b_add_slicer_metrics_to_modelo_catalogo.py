@@ -0,0 +1,32 @@
+"""add precomputed slicer metrics to modelo_catalogo
+
+Revision ID: 7c2d9e4f1a3b
+Revises: 23246b1b033b
+Create Date: 2026-10-18 11:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c2d9e4f1a3b'
+down_revision: Union[str, Sequence[str], None] = '23246b1b033b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('modelo_catalogo', sa.Column('hash_contenido', sa.String(), nullable=True))
+    op.add_column('modelo_catalogo', sa.Column('metricas_slicer', sa.JSON(), nullable=True))
+    op.add_column('modelo_catalogo', sa.Column('fecha_metricas', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('modelo_catalogo', 'fecha_metricas')
+    op.drop_column('modelo_catalogo', 'metricas_slicer')
+    op.drop_column('modelo_catalogo', 'hash_contenido')
@@ -0,0 +1,62 @@
+"""add versioned pricing rules (regla_precio)
+
+Revision ID: 9a4f3c2b8d1e
+Revises: 7c2d9e4f1a3b
+Create Date: 2026-10-18 12:30:00.000000
+
+"""
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a4f3c2b8d1e'
+down_revision: Union[str, Sequence[str], None] = '7c2d9e4f1a3b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# valores que estaban fijos en app/services/cotizacion_service.py
+REGLAS_INICIALES = {
+    "consumo_kwh_por_hora": 0.12,
+    "costo_kwh": 600,
+    "mantenimiento_por_hora": 769,
+    "mano_obra": 1000,
+    "costo_cambio_filamento": (723 + 120) / 12,
+    "herraje_llavero": 160,
+    "gastos_generales": 0.10,
+    "costo_nfc": 1000,
+    "factor_min": 1.5,
+    "factor_max": 2,
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    regla_precio = op.create_table(
+        'regla_precio',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.Column('reglas', sa.JSON(), nullable=False),
+        sa.Column('descripcion', sa.String(), nullable=True),
+        sa.Column('fecha_creacion', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_regla_precio_id'), 'regla_precio', ['id'], unique=False)
+    op.create_index(op.f('ix_regla_precio_version'), 'regla_precio', ['version'], unique=True)
+    op.bulk_insert(regla_precio, [{
+        "version": 1,
+        "reglas": REGLAS_INICIALES,
+        "descripcion": "Reglas iniciales",
+        "fecha_creacion": datetime.utcnow(),
+    }])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_regla_precio_version'), table_name='regla_precio')
+    op.drop_index(op.f('ix_regla_precio_id'), table_name='regla_precio')
+    op.drop_table('regla_precio')
@@ -0,0 +1,28 @@
+"""add quantity-tier price matrix to cotizacion
+
+Revision ID: b3d8e1f6a2c4
+Revises: 9a4f3c2b8d1e
+Create Date: 2026-10-18 13:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3d8e1f6a2c4'
+down_revision: Union[str, Sequence[str], None] = '9a4f3c2b8d1e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('cotizacion', sa.Column('matriz_cantidades', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('cotizacion', 'matriz_cantidades')
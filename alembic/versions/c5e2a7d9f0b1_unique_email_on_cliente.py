@@ -0,0 +1,49 @@
+"""unique index on cliente.email
+
+Revision ID: c5e2a7d9f0b1
+Revises: b3d8e1f6a2c4
+Create Date: 2026-10-18 14:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5e2a7d9f0b1'
+down_revision: Union[str, Sequence[str], None] = 'b3d8e1f6a2c4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# tablas con cliente_id que apuntan a cliente
+REFERENCIAS = ('pedido', 'item_personalizado')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    conn = op.get_bind()
+    # Duplicados previos (confirmaciones concurrentes con el mismo email): se conserva
+    # el id menor, que es el que create_or_update_cliente venía actualizando; las
+    # referencias de los demás pasan a él y los duplicados se eliminan.
+    duplicados = conn.execute(sa.text(
+        "SELECT email, min(id) FROM cliente GROUP BY email HAVING count(*) > 1"
+    )).all()
+    for email, keep_id in duplicados:
+        params = {"email": email, "keep_id": keep_id}
+        for tabla in REFERENCIAS:
+            conn.execute(sa.text(
+                f"UPDATE {tabla} SET cliente_id = :keep_id "
+                "WHERE cliente_id IN (SELECT id FROM cliente WHERE email = :email AND id <> :keep_id)"
+            ), params)
+        conn.execute(sa.text("DELETE FROM cliente WHERE email = :email AND id <> :keep_id"), params)
+
+    op.create_index(op.f('ix_cliente_email'), 'cliente', ['email'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # los duplicados eliminados no se restauran
+    op.drop_index(op.f('ix_cliente_email'), table_name='cliente')
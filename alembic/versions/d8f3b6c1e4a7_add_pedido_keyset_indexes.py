@@ -0,0 +1,39 @@
+"""composite indexes for the keyset-paginated cotizaciones listing
+
+Revision ID: d8f3b6c1e4a7
+Revises: c5e2a7d9f0b1
+Create Date: 2026-10-18 15:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd8f3b6c1e4a7'
+down_revision: Union[str, Sequence[str], None] = 'c5e2a7d9f0b1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEXES = {
+    'ix_pedido_fecha_pedido_id': ['fecha_pedido', 'id'],
+    'ix_pedido_estado_fecha_pedido_id': ['estado', 'fecha_pedido', 'id'],
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY (PostgreSQL): no bloquea escrituras en pedido mientras se construye;
+    # requiere ir fuera de la transacción de la migración
+    with op.get_context().autocommit_block():
+        for name, columns in INDEXES.items():
+            op.create_index(name, 'pedido', columns, unique=False, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name in INDEXES:
+            op.drop_index(name, table_name='pedido', postgresql_concurrently=True)
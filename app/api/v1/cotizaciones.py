@@ -1,27 +1,66 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+import json
+import base64
+import binascii
+from datetime import datetime, timezone
+from typing import Optional, Tuple
 
-from app.db.session import SessionLocal
-from app.crud.cotizacion import get_all_cotizaciones
-from app.schemas.cotizaciones import CotizacionListado
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.session import get_async_db
+from app.crud.cotizacion import get_cotizaciones_page_async
+from app.schemas.cotizaciones import CotizacionListado, BulkEstimateRequest, BulkEstimateResponse
+from app.services.cotizacion_service import bulk_estimate
 
 router = APIRouter()
 
-def get_db():
-    db = SessionLocal()
+
+# cursor opaco: base64url de [fecha_pedido ISO, id] del último pedido entregado
+def _encode_cursor(fecha_pedido: datetime, pedido_id: int) -> str:
+    raw = json.dumps([fecha_pedido.isoformat(), pedido_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    # fecha_pedido es DateTime sin zona (UTC, datetime.utcnow): asyncpg rechaza comparar con aware
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, int]:
     try:
-        yield db
-    finally:
-        db.close()
+        fecha, pedido_id = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return datetime.fromisoformat(fecha), int(pedido_id)
+    except (binascii.Error, ValueError, TypeError):
+        raise HTTPException(status_code=422,
+            detail={"error": {"codigo": "CURSOR_INVALIDO", "mensaje": "Cursor de paginación inválido"}})
 
 
 @router.get("", response_model=list[CotizacionListado])
-def listar_cotizaciones(db: Session = Depends(get_db)):
-    pedidos = get_all_cotizaciones(db)
+async def listar_cotizaciones(
+    http_response: Response,
+    limit: int = Query(settings.COTIZACIONES_PAGE_DEFAULT, ge=1, le=settings.COTIZACIONES_PAGE_MAX),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor de la página anterior"),
+    estado: Optional[str] = None,
+    desde: Optional[datetime] = Query(None, description="fecha_pedido >= desde"),
+    hasta: Optional[datetime] = Query(None, description="fecha_pedido < hasta"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    # más recientes primero; la página siguiente se pide con ?cursor=<X-Next-Cursor>
+    after = _decode_cursor(cursor) if cursor else None
+    pedidos = await get_cotizaciones_page_async(db, limit=limit, after=after, estado=estado,
+                                                desde=_naive_utc(desde), hasta=_naive_utc(hasta))
 
-    if not pedidos:
+    # con filtros (o más allá de la primera página) sin resultados es una lista vacía
+    if not pedidos and after is None and estado is None and desde is None and hasta is None:
         raise HTTPException(status_code=404, detail="No hay cotizaciones registradas")
 
+    if len(pedidos) > limit:
+        pedidos = pedidos[:limit]
+        http_response.headers["X-Next-Cursor"] = _encode_cursor(pedidos[-1].fecha_pedido, pedidos[-1].id)
+
     response = []
     for p in pedidos:
         cot = p.cotizacion
@@ -47,3 +86,20 @@ def listar_cotizaciones(db: Session = Depends(get_db)):
         })
 
     return response
+
+
+@router.post("/bulk-estimate", response_model=BulkEstimateResponse)
+def estimar_variantes(payload: BulkEstimateRequest):
+    # tabla de precios para muchas variantes en una sola llamada (vectorizado)
+    try:
+        return bulk_estimate(
+            variantes=payload.variantes.dict(),
+            combinar=payload.combinar,
+            slicer_metrics=payload.slicer_metrics,
+            dimensiones_base=payload.dimensiones_base.dict() if payload.dimensiones_base else None,
+            colores_base=payload.colores_base,
+            metricas=payload.metricas.dict() if payload.metricas else None,
+            max_variantes=settings.BULK_ESTIMATE_MAX_VARIANTS,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from decimal import Decimal
+import logging
 from datetime import datetime
 
 from app.schemas.confirmation import ConfirmationRequest, ConfirmationResponse
@@ -10,8 +11,10 @@ from app.models.cliente import Cliente
 from app.models.pedido import Pedido
 from app.crud.cliente import create_or_update_cliente
 from app.crud.pedido import create_pedido_from_cotizacion
+from app.utils import gcode_store
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
 
 FIXED_MESSAGE = "Pedido recibido. El precio final será confirmado manualmente por correo."
@@ -25,6 +28,7 @@ def create_custom_confirmation(payload: ConfirmationRequest, db: Session = Depen
             detail={"error": {"codigo": "NOT_FOUND", "mensaje": "Cotizacion no encontrada"}})
 
 
+    # cliente + pedido en una sola transacción: flush en cada paso, un commit al final
     cliente = create_or_update_cliente(
         db,
         nombre=payload.nombre,
@@ -32,7 +36,8 @@ def create_custom_confirmation(payload: ConfirmationRequest, db: Session = Depen
         telefono=payload.telefono,
         rut=payload.rut,
         direccion=payload.direccion,
-        comentarios=payload.comentarios
+        comentarios=payload.comentarios,
+        commit=False
     )
 
     # 3) Crear Pedido basado en la cotización
@@ -40,15 +45,15 @@ def create_custom_confirmation(payload: ConfirmationRequest, db: Session = Depen
         db=db,
         cotizacion=cotizacion,
         cliente_id=cliente.id,
-        cantidad=payload.cantidad if payload.cantidad else 1
+        cantidad=payload.cantidad if payload.cantidad else 1,
+        commit=False
     )
 
-    print("DEBUG item_personalizado_id =", cotizacion.item_personalizado_id, type(cotizacion.item_personalizado_id))
+    artifact = (cotizacion.desglose or {}).get("gcode_artifact")
 
-
-
-    # 4) Respuesta final al frontend
-    return ConfirmationResponse(
+    # 4) Respuesta final al frontend (armada antes del commit: tras él los objetos
+    # expiran y leerlos volvería a consultar la base de datos)
+    response = ConfirmationResponse(
         pedido_id=pedido.id,
         cotizacion_id=cotizacion.id,
         item_personalizado_id=cotizacion.item_personalizado_id,
@@ -57,4 +62,14 @@ def create_custom_confirmation(payload: ConfirmationRequest, db: Session = Depen
         fecha_pedido=pedido.fecha_pedido,
         mensaje="Pedido recibido. El precio final será confirmado manualmente por correo."
     )
-    return
\ No newline at end of file
+    try:
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"Error al confirmar pedido: {e}")
+
+    # el G-code de la cotización queda reservado para producción (no se lamina otra vez);
+    # solo con el pedido ya guardado: si el commit falla no queda reservado
+    if artifact and not gcode_store.pin(artifact):
+        logger.info("G-code artifact %s of cotizacion %s no longer stored", artifact, response.cotizacion_id)
+    return response
@@ -1,28 +1,78 @@
 # app/api/v1/custom/create.py
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from datetime import datetime, timedelta
+from datetime import datetime
+from typing import Dict, List, Optional
 
 import logging
 
 from app.schemas.custom import CustomCreateRequest, CustomCreateResponse, CotizacionRango, Desglose
 from app.db.session import get_db
-from app.crud.item_personalizado import create_item_personalizado
-from app.crud.cotizacion import create_cotizacion
-from app.crud.nfc import create_nfc_enlace
-from app.services.cotizacion_service import estimate_price_from_params
+from app.services.custom_quote_service import compute_quote, persist_custom_quote, persist_custom_quotes_bulk
+from app.services.catalog_warmup import get_catalog_metrics
 from app.models.modelo_catalogo import ModeloCatalogo
 from app.utils.slicing import download_3mf, run_prusaslicer_and_parse_metrics
+from app.utils.mesh3mf import estimate_metrics_from_3mf
+from app.utils.downloader import remove_quietly
+from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+
+def quote_metrics(db: Session, payload: CustomCreateRequest, modelo_catalogo_id=None,
+                  memo: Optional[Dict[tuple, Dict]] = None) -> Dict:
+    """Métricas para cotizar sin laminar: las precalculadas del catálogo o la
+    estimación por geometría del 3MF. {} si no hay (cotización solo por parámetros).
+
+    memo evita repetir la consulta del catálogo o la descarga de un mismo modelo
+    entre varias cotizaciones (create/batch).
+    Raises HTTPException 422 si el modelo no es imprimible.
+    """
+    # modelos de catálogo: métricas precalculadas (app/services/catalog_warmup.py)
+    if modelo_catalogo_id:
+        key = ("catalogo", modelo_catalogo_id)
+        if memo is not None and key in memo:
+            metrics = memo[key]
+        else:
+            metrics = get_catalog_metrics(db, modelo_catalogo_id)
+            if memo is not None:
+                memo[key] = metrics
+        if metrics:
+            return dict(metrics)
+
+    url = str(payload.modelo.model_url) if payload.modelo and getattr(payload.modelo, "model_url", None) else None
+    if not (settings.INSTANT_QUOTE_ENABLED and url):
+        return {}
+    if memo is not None and ("url", url) in memo:
+        return dict(memo[("url", url)])
+
+    metrics = {}
+    model_3mf_path = None
+    try:
+        model_3mf_path = download_3mf(url)
+        metrics = estimate_metrics_from_3mf(model_3mf_path)
+    except HTTPException as e:
+        if e.status_code == 422:
+            # modelo no imprimible: informar al cliente
+            raise
+        logger.warning("Geometry estimate failed, using params only: %s", e.detail)
+    except Exception as e:
+        # no fallar: continuar con la estimación por parámetros
+        logger.warning("Geometry estimate failed, using params only: %s", e)
+    finally:
+        if model_3mf_path:
+            remove_quietly(model_3mf_path)
+    if memo is not None:
+        memo[("url", url)] = metrics
+    return dict(metrics)
+
+
 @router.post("/create", response_model=CustomCreateResponse, status_code=status.HTTP_201_CREATED)
 def create_custom_quote(payload: CustomCreateRequest, db: Session = Depends(get_db)):
-    # 1) Definir validez de la cotización
+    # 1) Fecha de creación (la validez se define en persist_custom_quote)
     now = datetime.utcnow()
-    expires = now + timedelta(days=1000)
 
     # 2) buscar precio base del modelo en catálogo si provisto y si modelo_id es int/str que mapea
     modelo_precio_base = None
@@ -47,8 +97,12 @@ def create_custom_quote(payload: CustomCreateRequest, db: Session = Depends(get_
     # 3) si modelo.url existe, intenta descargar, slice y extraer métricas
     slicer_metrics = {}
     tmp_files = []
-    
+
     try:
+        # 3a) métricas precalculadas del catálogo o estimación instantánea por
+        # geometría (sin laminar); el laminado completo corre en POST /custom/slice-jobs
+        slicer_metrics = quote_metrics(db, payload, modelo_catalogo_id)
+
         '''
         file_url = None
         # new parameter: model_url inside payload.modelo
@@ -71,14 +125,8 @@ def create_custom_quote(payload: CustomCreateRequest, db: Session = Depends(get_
                 logger.exception("Error during slicing flow: %s", e)
                 raise HTTPException(status_code=500, detail=f"Slicer/processing error: {e}")
         '''
-        # 4) merge parametros and slicer metrics for pricing function
-        merged_params = payload.parametros.dict()
-        # include safe subset under 'slicer_metrics' to avoid polluting service contract
-        if slicer_metrics:
-            merged_params["slicer_metrics"] = slicer_metrics
-        
-        # 5) generar estimación
-        cot_min, cot_max, desglose_dict = estimate_price_from_params(merged_params)
+        # 4-5) merge parametros + slicer metrics y generar estimación
+        cot_min, cot_max, desglose_dict = compute_quote(payload, slicer_metrics)
     finally:
         # ensure temp cleanup
         for p in tmp_files:
@@ -98,50 +146,28 @@ def create_custom_quote(payload: CustomCreateRequest, db: Session = Depends(get_
         except Exception:
             logger.warning("Failed to remove gcode file %s", gpath)
 
-    # 6) persistir ItemPersonalizado (cotización se representa como item personalizado)
-    parametros_json = payload.parametros.dict()
-    item = create_item_personalizado(
-        db=db,
-        cliente_id=None,  
-        modelo_catalogo_id=None,
-        nombre_personalizado=payload.nombre_personalizado,
-        parametros=payload.parametros.dict(),
-        color=payload.parametros.color,
-        logo_url=None,
-        model_url=(str(payload.modelo.model_url) if payload.modelo and getattr(payload.modelo, "model_url", None) else None)
-    )
-
-    cotizacion_data = {
-        "item_personalizado_id": item.id,
-        "nombre_personalizado": payload.nombre_personalizado,
-        "fecha_creacion": now,
-        "moneda": "COP",
-        "cotizacion_min": cot_min,
-        "cotizacion_max": cot_max,
-        "desglose": desglose_dict,
-        "tiempo_entrega_dias": 5,
-        "valida_hasta": expires,
-        "notas": "Valores estimados sujetos a revisión técnica."
-    }
-
-    cotizacion_db = create_cotizacion(db=db, cotizacion=cotizacion_data)
-
-    # 7) Crear registro NFC si include_nfc es True
-    if payload.parametros.include_nfc and payload.parametros.nfc_url:
-        create_nfc_enlace(
-            db=db,
-            item_personalizado_id=item.id,
-            url_destino=payload.parametros.nfc_url
-        )
-
-    return {
-        "id": cotizacion_db.id,
-        "nombre_personalizado": item.nombre_personalizado,
-        "fecha_creacion": cotizacion_db.fecha_creacion,
-        "moneda": cotizacion_db.moneda,
-        "cotizacion_rango": {"cotizacion_min": cot_min, "cotizacion_max": cot_max},
-        "desglose": desglose_dict,
-        "tiempo_entrega_dias": cotizacion_db.tiempo_entrega_dias,
-        "valida_hasta": cotizacion_db.valida_hasta,
-        "notas": cotizacion_db.notas
-    }
+    # 6-7) persistir ItemPersonalizado, Cotizacion y NFC (si aplica)
+    return persist_custom_quote(db, payload, cot_min, cot_max, desglose_dict, now=now)
+
+
+@router.post("/create/batch", response_model=List[CustomCreateResponse], status_code=status.HTTP_201_CREATED)
+def create_custom_quotes_batch(payloads: List[CustomCreateRequest], db: Session = Depends(get_db)):
+    # N cotizaciones en una sola transacción (inserts multi-fila); respuesta en el mismo orden
+    if not payloads:
+        raise HTTPException(status_code=422, detail="La lista de cotizaciones está vacía")
+    if len(payloads) > settings.CUSTOM_BATCH_MAX:
+        raise HTTPException(status_code=422, detail=f"Máximo {settings.CUSTOM_BATCH_MAX} cotizaciones por lote")
+
+    memo: Dict[tuple, Dict] = {}
+    quotes = []
+    for i, payload in enumerate(payloads):
+        modelo_catalogo_id = payload.modelo.modelo_id if payload.modelo else None
+        try:
+            slicer_metrics = quote_metrics(db, payload, modelo_catalogo_id, memo)
+        except HTTPException as e:
+            # indicar cuál cotización del lote falló
+            raise HTTPException(status_code=e.status_code, detail={"indice": i, "detalle": e.detail})
+        cot_min, cot_max, desglose = compute_quote(payload, slicer_metrics)
+        quotes.append((payload, cot_min, cot_max, desglose))
+
+    return persist_custom_quotes_bulk(db, quotes)
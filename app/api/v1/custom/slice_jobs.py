@@ -0,0 +1,74 @@
+# app/api/v1/custom/slice_jobs.py
+import json
+import queue
+import asyncio
+
+from fastapi import APIRouter, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
+
+from app.schemas.custom import CustomCreateRequest, SliceJobResponse
+from app.services.slice_jobs import submit_slice_job, get_slice_job
+from app.utils.slice_progress import hub as progress_hub, ESTADO_FINAL
+
+router = APIRouter()
+
+# cada cuánto se revisa la cola del suscriptor y se envía un keep-alive
+SSE_POLL_SEC = 0.2
+SSE_KEEPALIVE_SEC = 15.0
+
+
+@router.post("/slice-jobs", response_model=SliceJobResponse, status_code=status.HTTP_202_ACCEPTED)
+def create_slice_job(payload: CustomCreateRequest):
+    # encola el laminado; la cotización se crea cuando las métricas estén listas
+    return submit_slice_job(payload)
+
+
+@router.get("/slice-jobs/{job_id}", response_model=SliceJobResponse)
+def read_slice_job(job_id: str):
+    job = get_slice_job(job_id)
+    if not job:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Trabajo de laminado no encontrado")
+    return job
+
+
+@router.get("/items/{item_id}/progress")
+async def stream_slice_progress(item_id: str, request: Request):
+    """Progreso del laminado en vivo (text/event-stream).
+
+    Eventos "progress" con {"estado", "progreso", "mensaje", ...}; el stream se
+    cierra tras el evento "end" (estado completado o fallido).
+    """
+    if progress_hub.last(item_id) is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No hay laminado en curso para este item")
+
+    subscription = progress_hub.subscribe(item_id)
+
+    async def _events():
+        idle = 0.0
+        try:
+            while True:
+                try:
+                    event = subscription.get_nowait()
+                except queue.Empty:
+                    if await request.is_disconnected():
+                        return
+                    await asyncio.sleep(SSE_POLL_SEC)
+                    idle += SSE_POLL_SEC
+                    if idle >= SSE_KEEPALIVE_SEC:
+                        idle = 0.0
+                        yield ": keep-alive\n\n"
+                    continue
+                idle = 0.0
+                final = event.get("estado") in ESTADO_FINAL
+                yield f"event: {'end' if final else 'progress'}\ndata: {json.dumps(event, default=str)}\n\n"
+                if final:
+                    return
+        finally:
+            progress_hub.unsubscribe(item_id, subscription)
+
+    return StreamingResponse(
+        _events(),
+        media_type="text/event-stream",
+        # sin buffering en proxies (nginx) para que los eventos lleguen al instante
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,25 @@
+from fastapi import APIRouter
+
+from app.core.config import settings
+from app.db import pool_metrics
+from app.utils import download_cache, gcode_store, slice_cache
+from app.utils.slicing import download_flight, slice_flight
+
+router = APIRouter()
+
+
+@router.get("")
+def obtener_metricas():
+    """Gauges y contadores en proceso (por worker): pools de conexiones, caches y coalescing."""
+    return {
+        "db_pool": {
+            "modo": "pgbouncer_nullpool" if settings.DB_PGBOUNCER else "queuepool",
+            "pool_size": settings.DB_POOL_SIZE,
+            "max_overflow": settings.DB_MAX_OVERFLOW,
+            "pools": pool_metrics.stats(),
+        },
+        "slice_cache": slice_cache.stats(),
+        "download_cache": download_cache.stats(),
+        "gcode_store": gcode_store.stats(),
+        "singleflight": {"download_3mf": download_flight.stats(), "slice": slice_flight.stats()},
+    }
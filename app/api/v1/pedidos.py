@@ -0,0 +1,40 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from app.db.session import get_db
+from app.models.pedido import Pedido
+from app.utils import gcode_store
+
+router = APIRouter()
+
+
+def _accepts_encoding(request: Request, encoding: str) -> bool:
+    accepted = request.headers.get("accept-encoding", "")
+    return any(token.split(";")[0].strip().lower() == encoding for token in accepted.split(","))
+
+
+@router.get("/{pedido_id}/gcode")
+def descargar_gcode(pedido_id: int, request: Request, db: Session = Depends(get_db)):
+    """G-code laminado al cotizar, en streaming.
+
+    Si el cliente acepta la codificación del artefacto (gzip o zstd) se envía tal
+    cual está almacenado, con Content-Encoding; si no, se descomprime al vuelo.
+    """
+    pedido = db.query(Pedido).filter(Pedido.id == pedido_id).first()
+    if not pedido:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+            detail={"error": {"codigo": "NOT_FOUND", "mensaje": "Pedido no encontrado"}})
+
+    artifact = (pedido.cotizacion.desglose or {}).get("gcode_artifact")
+    opened = gcode_store.open_artifact(artifact) if artifact else None
+    if opened is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+            detail={"error": {"codigo": "GCODE_NO_DISPONIBLE", "mensaje": "El pedido no tiene G-code almacenado, debe laminarse"}})
+
+    f, codec, size = opened
+    headers = {"Content-Disposition": f'attachment; filename="pedido_{pedido.id}.gcode"'}
+    if _accepts_encoding(request, codec):
+        headers.update({"Content-Encoding": codec, "Content-Length": str(size)})
+        return StreamingResponse(gcode_store.iter_compressed(f), media_type="text/x-gcode", headers=headers)
+    return StreamingResponse(gcode_store.iter_gcode(f, codec), media_type="text/x-gcode", headers=headers)
@@ -3,6 +3,17 @@ from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
     DATABASE_URL: str
+    # Engine async (asyncpg); vacío = derivado de DATABASE_URL
+    ASYNC_DATABASE_URL: str = ""
+    # Pool de conexiones (por engine: sync y async tienen cada uno el suyo)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SEC: int = 30
+    DB_POOL_RECYCLE_SEC: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    # Detrás de PgBouncer en modo transaction: NullPool (el pool es PgBouncer) y
+    # sin prepared statements en asyncpg
+    DB_PGBOUNCER: bool = False
     BASE_URL: str
     PRUSA_SLICER_BIN: str
     SLICER_PROFILE_PATH: str
@@ -10,6 +21,82 @@ class Settings(BaseSettings):
     MAX_UPLOAD_MB: int = 200
     TMP_DIR: str
 
+    # Cache de métricas del laminador (app/utils/slice_cache.py)
+    SLICE_CACHE_ENABLED: bool = True
+    SLICE_CACHE_MAX_MB: int = 256
+    SLICE_CACHE_MAX_AGE_SEC: int = 30 * 24 * 3600
+
+    # G-code laminado comprimido, para producción (app/utils/gcode_store.py)
+    GCODE_STORE_ENABLED: bool = True
+    GCODE_STORE_DIR: str = ""
+    GCODE_STORE_CODEC: str = "zstd"  # zstd (si está instalado) o gzip
+    GCODE_STORE_MAX_MB: int = 2048
+    GCODE_ANALYZER_ENABLED: bool = True
+    # Laminado por objeto en paralelo (suma de métricas) en lugar de --merge
+    SLICE_SPLIT_OBJECTS: bool = False
+    SLICE_SPLIT_WORKERS: int = 0  # 0 = número de CPUs
+    # Laminado por lotes: varias solicitudes en una sola invocación de PrusaSlicer
+    SLICE_BATCH_ENABLED: bool = False
+    SLICE_BATCH_WINDOW_MS: int = 200
+    SLICE_BATCH_MAX: int = 8
+    # Espera máxima de solicitudes coalescidas (descarga / laminado en curso)
+    SINGLEFLIGHT_WAIT_SEC: int = 600
+
+    # Descargas HTTP (app/utils/downloader.py)
+    DOWNLOAD_CHUNK_KB: int = 1024
+    DOWNLOAD_POOL_SIZE: int = 10
+    DOWNLOAD_TIMEOUT_SEC: int = 30
+    DOWNLOAD_MAX_RESUMES: int = 3
+    DOWNLOAD_CACHE_ENABLED: bool = True
+    DOWNLOAD_CACHE_MAX_MB: int = 1024
+    S3_PART_SIZE_MB: int = 8
+    S3_CONCURRENCY: int = 8
+
+    # Cotización instantánea por geometría del 3MF (app/utils/mesh3mf.py)
+    INSTANT_QUOTE_ENABLED: bool = True
+    GEOMETRY_DENSITY_G_CM3: float = 1.24
+    GEOMETRY_COST_PER_KG: float = 80000
+    GEOMETRY_WALL_MM: float = 1.2
+    GEOMETRY_INFILL: float = 0.15
+    GEOMETRY_THROUGHPUT_G_H: float = 12.0
+    # Huella geométrica del 3MF: la cache de laminado usa la malla canónica
+    # (cuantizada a esta resolución) en lugar del sha256 del archivo
+    MESH_FINGERPRINT_RESOLUTION_MM: float = 0.01
+    SLICE_CACHE_GEOMETRY_KEY: bool = True
+    # Validación de imprimibilidad antes de laminar (app/utils/mesh3mf.py)
+    MESH_CHECK_ENABLED: bool = True
+    BED_SIZE_X_MM: float = 250.0
+    BED_SIZE_Y_MM: float = 210.0
+    BED_SIZE_Z_MM: float = 210.0
+    MESH_MAX_BAD_EDGE_FRACTION: float = 0.01
+    MESH_MAX_DEGENERATE_FRACTION: float = 0.05
+
+    # Reglas de cotización versionadas (app/services/reglas_precio.py)
+    PRICING_RULES_REFRESH_SEC: int = 30
+
+    # Cotizaciones por lote (POST /custom/create/batch)
+    CUSTOM_BATCH_MAX: int = 1000
+
+    # Cotización masiva de variantes (POST /cotizaciones/bulk-estimate)
+    BULK_ESTIMATE_MAX_VARIANTS: int = 100000
+    # Listado paginado de cotizaciones (GET /cotizaciones?limit=)
+    COTIZACIONES_PAGE_DEFAULT: int = 50
+    COTIZACIONES_PAGE_MAX: int = 500
+
+    # Precálculo de métricas del catálogo (app/services/catalog_warmup.py)
+    CATALOG_WARMUP_ON_STARTUP: bool = False
+    CATALOG_WARMUP_CONCURRENCY: int = 2
+
+    # Cola de trabajos de laminado (app/services/slice_jobs.py)
+    SLICE_MAX_WORKERS: int = 2
+    SLICE_MAX_QUEUED: int = 100
+    SLICE_JOB_TTL_SEC: int = 3600
+
+    # Progreso del laminado en vivo (SSE) y laminados estancados
+    # 0 desactiva la detección; solo aplica cuando el laminador ya imprimió algo
+    SLICE_STALL_TIMEOUT_SEC: int = 120
+    SLICE_PROGRESS_TTL_SEC: int = 600
+
     class Config:
         env_file = ".env"
 
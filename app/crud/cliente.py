@@ -1,51 +1,42 @@
 # app/crud/cliente.py
 
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from fastapi import HTTPException
+from app.db.session import dialect_insert
 from app.models.cliente import Cliente
 
+# campos opcionales: solo se sobrescriben si vienen con valor
+CAMPOS_OPCIONALES = ("telefono", "rut", "direccion", "comentarios")
+
 
 def create_or_update_cliente(db: Session, *, nombre: str, email: str, telefono: str = None,
-                             rut: str = None, direccion: str = None, comentarios: str = None):
+                             rut: str = None, direccion: str = None, comentarios: str = None,
+                             commit: bool = True):
     """
-    Crea o actualiza un Cliente según email.
+    Crea o actualiza un Cliente según email, en una sola sentencia
+    (INSERT ... ON CONFLICT (email) DO UPDATE ... RETURNING).
     Retorna el objeto Cliente persistido.
+    Con commit=False el commit queda a cargo del llamador.
     """
+    valores = {"nombre": nombre, "email": email, "telefono": telefono, "rut": rut,
+               "direccion": direccion, "comentarios": comentarios}
+    stmt = dialect_insert(db)(Cliente).values(**valores)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Cliente.email],
+        set_={
+            "nombre": stmt.excluded.nombre,
+            **{c: func.coalesce(stmt.excluded[c], Cliente.__table__.c[c]) for c in CAMPOS_OPCIONALES},
+        },
+    ).returning(Cliente)
 
     try:
-        cliente = db.query(Cliente).filter(Cliente.email == email).first()
-
-        if cliente:
-            # Actualizar datos existentes
-            cliente.nombre = nombre
-            if telefono is not None:
-                cliente.telefono = telefono
-            if rut is not None:
-                cliente.rut = rut
-            if direccion is not None:
-                cliente.direccion = direccion
-            if comentarios is not None:
-                cliente.comentarios = comentarios
-
-            db.add(cliente)
+        # populate_existing: si el cliente ya estaba en la sesión, queda con los valores nuevos
+        cliente = db.scalars(stmt, execution_options={"populate_existing": True}).one()
+        if commit:
             db.commit()
             db.refresh(cliente)
-            return cliente
-        
-        # Crear nuevo cliente
-        nuevo_cliente = Cliente(
-            nombre=nombre,
-            email=email,
-            telefono=telefono,
-            rut=rut,
-            direccion=direccion,
-            comentarios=comentarios,
-        )
-
-        db.add(nuevo_cliente)
-        db.commit()
-        db.refresh(nuevo_cliente)
-        return nuevo_cliente
+        return cliente
 
     except Exception as e:
         db.rollback()
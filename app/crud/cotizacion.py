@@ -1,15 +1,25 @@
-from sqlalchemy.orm import Session
+from datetime import datetime
+from typing import Optional, Tuple
+
+from sqlalchemy import select, tuple_
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.cotizacion import Cotizacion
 from app.models.pedido import Pedido
 from http.client import HTTPException
 
-def create_cotizacion(db: Session, cotizacion: dict):
-    """Crea y persiste una nueva cotización en la DB."""
+def create_cotizacion(db: Session, cotizacion: dict, commit: bool = True):
+    """Crea y persiste una nueva cotización en la DB.
+    Con commit=False solo hace flush (el id vuelve vía RETURNING) y el commit
+    queda a cargo del llamador."""
     db_cotizacion = Cotizacion(**cotizacion)
     try:
         db.add(db_cotizacion)
-        db.commit()
-        db.refresh(db_cotizacion)
+        if commit:
+            db.commit()
+            db.refresh(db_cotizacion)
+        else:
+            db.flush()
         return db_cotizacion
     except Exception as e:
         db.rollback()
@@ -18,4 +28,34 @@ def create_cotizacion(db: Session, cotizacion: dict):
 
 def get_all_cotizaciones(db: Session):
     pedidos = db.query(Pedido).all()
-    return pedidos    
\ No newline at end of file
+    return pedidos
+
+
+async def get_cotizaciones_page_async(db: AsyncSession, *, limit: int, after: Optional[Tuple[datetime, int]] = None,
+                                      estado: Optional[str] = None, desde: Optional[datetime] = None,
+                                      hasta: Optional[datetime] = None):
+    """
+    Una página de pedidos, del más reciente al más antiguo por (fecha_pedido, id).
+    Paginación keyset: `after` es la clave del último pedido de la página anterior,
+    así el costo no depende de la profundidad (índices ix_pedido_fecha_pedido_id y
+    ix_pedido_estado_fecha_pedido_id). Cotización e item vienen en la misma consulta
+    (JOIN). Retorna hasta limit + 1 filas: la extra indica que hay otra página.
+    """
+    # sin fecha_pedido no hay posición en el orden (y el listado nunca los pudo mostrar)
+    stmt = select(Pedido).where(Pedido.fecha_pedido.is_not(None))
+    if estado is not None:
+        stmt = stmt.where(Pedido.estado == estado)
+    if desde is not None:
+        stmt = stmt.where(Pedido.fecha_pedido >= desde)
+    if hasta is not None:
+        stmt = stmt.where(Pedido.fecha_pedido < hasta)
+    if after is not None:
+        stmt = stmt.where(tuple_(Pedido.fecha_pedido, Pedido.id) < tuple_(*after))
+    # FKs NOT NULL: INNER JOIN
+    stmt = (
+        stmt.options(joinedload(Pedido.cotizacion, innerjoin=True)
+                     .joinedload(Cotizacion.item_personalizado, innerjoin=True))
+        .order_by(Pedido.fecha_pedido.desc(), Pedido.id.desc())
+        .limit(limit + 1)
+    )
+    return (await db.scalars(stmt)).all()
@@ -6,8 +6,9 @@ from datetime import datetime
 from app.utils.generate_item_id import generate_item_id
 
 
-def create_item_personalizado(db: Session, cliente_id: int | None, modelo_catalogo_id: int | None, nombre_personalizado: str, parametros: dict, color: str | None = None, logo_url: str | None = None, model_url: str | None = None):
-    item_id = generate_item_id()
+def create_item_personalizado(db: Session, cliente_id: int | None, modelo_catalogo_id: int | None, nombre_personalizado: str, parametros: dict, color: str | None = None, logo_url: str | None = None, model_url: str | None = None, item_id: str | None = None, commit: bool = True):
+    # item_id puede venir pre-generado (p.ej. el canal de progreso de un slice job)
+    item_id = item_id or generate_item_id()
     
     item = ItemPersonalizado(
         id=item_id,
@@ -22,8 +23,12 @@ def create_item_personalizado(db: Session, cliente_id: int | None, modelo_catalo
     )
     try:
         db.add(item)
-        db.commit()
-        db.refresh(item)
+        if commit:
+            db.commit()
+            db.refresh(item)
+        else:
+            # dentro de la transacción del llamador: solo flush, sin commit ni SELECT
+            db.flush()
         return item
     except Exception as e:
         db.rollback()
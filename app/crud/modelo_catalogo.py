@@ -0,0 +1,27 @@
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.models.modelo_catalogo import ModeloCatalogo
+
+
+def get_modelo_catalogo(db: Session, modelo_id: int) -> Optional[ModeloCatalogo]:
+    return db.query(ModeloCatalogo).filter(ModeloCatalogo.id == modelo_id).first()
+
+
+def get_modelos_con_url(db: Session, ids: Optional[List[int]] = None) -> List[ModeloCatalogo]:
+    """Modelos de catálogo con archivo descargable (candidatos a precalcular métricas)."""
+    query = db.query(ModeloCatalogo).filter(ModeloCatalogo.url.isnot(None))
+    if ids:
+        query = query.filter(ModeloCatalogo.id.in_(ids))
+    return query.order_by(ModeloCatalogo.id).all()
+
+
+def update_metricas_slicer(db: Session, modelo: ModeloCatalogo, hash_contenido: str, metricas: Dict) -> ModeloCatalogo:
+    modelo.hash_contenido = hash_contenido
+    modelo.metricas_slicer = metricas
+    modelo.fecha_metricas = datetime.utcnow()
+    db.commit()
+    db.refresh(modelo)
+    return modelo
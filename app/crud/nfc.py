@@ -1,21 +1,30 @@
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.session import dialect_insert
 from app.models.nfc_enlace import NfcEnlace
 from app.models.nfc_visita import NfcVisita
-from sqlalchemy import func
+from sqlalchemy import func, select
 from datetime import date, timedelta
 import uuid
 
 
-def create_nfc_enlace(db: Session, item_personalizado_id: str, url_destino: str):
-    short_code = str(uuid.uuid4())[:8].upper()
+def new_short_code() -> str:
+    return str(uuid.uuid4())[:8].upper()
+
+
+def create_nfc_enlace(db: Session, item_personalizado_id: str, url_destino: str, commit: bool = True):
+    short_code = new_short_code()
     nfc_enlace = NfcEnlace(
         item_personalizado_id=item_personalizado_id,
         short_code=short_code,
         url_destino_actual=url_destino
     )
     db.add(nfc_enlace)
-    db.commit()
-    db.refresh(nfc_enlace)
+    if commit:
+        db.commit()
+        db.refresh(nfc_enlace)
+    else:
+        db.flush()
     return nfc_enlace
 
 def get_nfc_by_item_id(db: Session, item_id: str):
@@ -66,3 +75,44 @@ def register_visit(db: Session, nfc_enlace_id: int):
     db.commit()
     db.refresh(visita)
     return visita
+
+
+# --- Versiones async (AsyncSession) para las rutas async def ---
+
+async def get_nfc_by_item_id_async(db: AsyncSession, item_id: str):
+    return (await db.scalars(select(NfcEnlace).where(NfcEnlace.item_personalizado_id == item_id).limit(1))).first()
+
+
+async def get_nfc_by_short_code_async(db: AsyncSession, short_code: str):
+    return (await db.scalars(select(NfcEnlace).where(NfcEnlace.short_code == short_code).limit(1))).first()
+
+
+async def update_nfc_url_async(db: AsyncSession, nfc: NfcEnlace, new_url: str):
+    nfc.url_destino_actual = str(new_url)
+    await db.commit()
+    await db.refresh(nfc)
+    return nfc
+
+
+async def get_click_stats_async(db: AsyncSession, nfc_id: int):
+    seven_days_ago = date.today() - timedelta(days=6)
+    registros = await db.execute(
+        select(NfcVisita.fecha_conteo, NfcVisita.conteo)
+        .where(NfcVisita.nfc_enlace_id == nfc_id)
+        .where(NfcVisita.fecha_conteo >= seven_days_ago)
+        .order_by(NfcVisita.fecha_conteo.asc())
+    )
+    return [{"dia": r.fecha_conteo, "clicks": r.conteo} for r in registros]
+
+
+async def register_visit_async(db: AsyncSession, nfc_enlace_id: int):
+    """Como register_visit, en una sola sentencia: INSERT ... ON CONFLICT
+    (uq_nfc_enlace_fecha) DO UPDATE conteo + 1. Sin carrera entre visitas simultáneas."""
+    stmt = dialect_insert(db)(NfcVisita).values(nfc_enlace_id=nfc_enlace_id, fecha_conteo=date.today(), conteo=1)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[NfcVisita.nfc_enlace_id, NfcVisita.fecha_conteo],
+        set_={"conteo": NfcVisita.__table__.c.conteo + 1},
+    ).returning(NfcVisita)
+    visita = (await db.scalars(stmt, execution_options={"populate_existing": True})).one()
+    await db.commit()
+    return visita
@@ -7,21 +7,27 @@ from datetime import datetime
 
 from app.models.pedido import Pedido
 from app.models.cotizacion import Cotizacion
+from app.services.cotizacion_service import precio_por_cantidad
 
 
-def create_pedido_from_cotizacion(db: Session, *, cotizacion: Cotizacion, cliente_id: int, cantidad: int):
+def create_pedido_from_cotizacion(db: Session, *, cotizacion: Cotizacion, cliente_id: int, cantidad: int,
+                                  commit: bool = True):
     """
     Crea un Pedido basado en una cotización.
-    Copia los valores de cotización (min/max/moneda) y deja los campos de precio_final y precio_total como NULL.
+    Copia el rango unitario del tramo de `cantidad` (matriz_cantidades de la cotización)
+    y la moneda, y deja los campos de precio_final y precio_total como NULL.
+    Con commit=False solo hace flush: el commit queda a cargo del llamador.
     """
 
     try:
+        precio = precio_por_cantidad(cotizacion.matriz_cantidades, cantidad,
+                                     cotizacion.cotizacion_min, cotizacion.cotizacion_max)
         pedido = Pedido(
             cliente_id=cliente_id,
             cotizacion_id=cotizacion.id,
             cantidad=cantidad,
-            cotizacion_min=Decimal(str(cotizacion.cotizacion_min)),
-            cotizacion_max=Decimal(str(cotizacion.cotizacion_max)),
+            cotizacion_min=Decimal(str(precio["unitario_min"])),
+            cotizacion_max=Decimal(str(precio["unitario_max"])),
             precio_final=None,
             precio_total=None,
             estado="Precotización",
@@ -34,8 +40,11 @@ def create_pedido_from_cotizacion(db: Session, *, cotizacion: Cotizacion, client
             setattr(pedido, "moneda", getattr(cotizacion, "moneda", None))
 
         db.add(pedido)
-        db.commit()
-        db.refresh(pedido)
+        if commit:
+            db.commit()
+            db.refresh(pedido)
+        else:
+            db.flush()
         return pedido
 
     except Exception as e:
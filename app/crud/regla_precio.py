@@ -0,0 +1,31 @@
+from typing import Dict, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.models.regla_precio import ReglaPrecio
+
+
+def get_version_vigente(db: Session) -> Optional[int]:
+    return db.query(func.max(ReglaPrecio.version)).scalar()
+
+
+def get_regla_precio(db: Session, version: Optional[int] = None) -> Optional[ReglaPrecio]:
+    """Reglas de una versión, o las vigentes (mayor versión) si version es None."""
+    query = db.query(ReglaPrecio)
+    if version is not None:
+        return query.filter(ReglaPrecio.version == version).first()
+    return query.order_by(ReglaPrecio.version.desc()).first()
+
+
+def create_regla_precio(db: Session, reglas: Dict, descripcion: Optional[str] = None) -> ReglaPrecio:
+    """Publica una nueva versión de reglas (versión vigente + 1)."""
+    regla = ReglaPrecio(version=(get_version_vigente(db) or 0) + 1, reglas=reglas, descripcion=descripcion)
+    try:
+        db.add(regla)
+        db.commit()
+        db.refresh(regla)
+        return regla
+    except Exception:
+        db.rollback()
+        raise
@@ -0,0 +1,129 @@
+import time
+import threading
+from collections import deque
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
+
+# Pools de conexiones instrumentados: cuánto espera cada checkout por una conexión
+# libre (pool agotado = espera hasta DB_POOL_TIMEOUT_SEC) y cuántas están en uso.
+# Abrir una conexión nueva (overflow: TCP/TLS/auth) se mide aparte: la espera es solo
+# el tiempo bloqueado en la cola, que es lo que indica si el pool es chico.
+# Las esperas recientes quedan en una ventana fija para p50/p99.
+
+WAIT_WINDOW = 2048
+
+_lock = threading.Lock()
+_stats: Dict[str, Dict] = {}
+_waits: Dict[str, deque] = {}
+_pools: Dict[str, Pool] = {}
+
+# tiempo de conexión dentro del checkout en curso; None = fuera de un checkout.
+# ContextVar y no threading.local: con el engine async varios checkouts comparten hilo (greenlets)
+_connect_in_checkout: ContextVar[Optional[float]] = ContextVar("pool_connect_in_checkout", default=None)
+
+
+def _new_stats() -> Dict:
+    return {"checkouts": 0, "timeouts": 0, "wait_total_s": 0.0, "wait_max_s": 0.0,
+            "connects": 0, "connect_total_s": 0.0, "connect_max_s": 0.0}
+
+
+def _record(name: str, wait: float, timed_out: bool) -> None:
+    with _lock:
+        s = _stats.setdefault(name, _new_stats())
+        s["checkouts"] += 1
+        s["timeouts"] += int(timed_out)
+        s["wait_total_s"] += wait
+        s["wait_max_s"] = max(s["wait_max_s"], wait)
+        _waits.setdefault(name, deque(maxlen=WAIT_WINDOW)).append(wait)
+
+
+def _record_connect(name: str, elapsed: float) -> None:
+    with _lock:
+        s = _stats.setdefault(name, _new_stats())
+        s["connects"] += 1
+        s["connect_total_s"] += elapsed
+        s["connect_max_s"] = max(s["connect_max_s"], elapsed)
+
+
+class _TimedCheckout:
+    metrics_name = "db"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # dispose()/recreate() crean un pool nuevo de la misma clase: se reporta el último
+        _pools[self.metrics_name] = self
+
+    def _do_get(self):
+        if _connect_in_checkout.get() is not None:
+            # QueuePool._do_get se llama a sí mismo al reintentar: se mide solo la llamada externa
+            return super()._do_get()
+        token = _connect_in_checkout.set(0.0)
+        start = time.perf_counter()
+        timed_out = False
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            timed_out = True
+            raise
+        finally:
+            connect = _connect_in_checkout.get()
+            _connect_in_checkout.reset(token)
+            _record(self.metrics_name, max(time.perf_counter() - start - connect, 0.0), timed_out)
+
+    def _create_connection(self):
+        start = time.perf_counter()
+        try:
+            return super()._create_connection()
+        finally:
+            elapsed = time.perf_counter() - start
+            in_checkout = _connect_in_checkout.get()
+            if in_checkout is not None:
+                _connect_in_checkout.set(in_checkout + elapsed)
+            _record_connect(self.metrics_name, elapsed)
+
+
+def instrumented_pool_class(name: str, async_: bool = False):
+    """Subclase de QueuePool (o AsyncAdaptedQueuePool) que mide las esperas de checkout."""
+    base = AsyncAdaptedQueuePool if async_ else QueuePool
+    return type(f"Instrumented{base.__name__}", (_TimedCheckout, base), {"metrics_name": name})
+
+
+def _percentile(values, q: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return round(ordered[min(len(ordered) - 1, int(len(ordered) * q))] * 1000, 3)
+
+
+def _avg_ms(total: float, count: int) -> Optional[float]:
+    return round(total / count * 1000, 3) if count else None
+
+
+def stats() -> Dict:
+    """Por pool: gauges (size, in_use, overflow, idle), esperas de checkout en cola
+    y tiempo de apertura de conexiones nuevas, en ms."""
+    with _lock:
+        snapshot = {name: (dict(s), list(_waits.get(name, ()))) for name, s in _stats.items()}
+        pools = dict(_pools)
+    result = {}
+    for name, pool in pools.items():
+        s, waits = snapshot.get(name, (_new_stats(), []))
+        result[name] = {
+            "size": pool.size(),
+            "in_use": pool.checkedout(),
+            "overflow": max(pool.overflow(), 0),
+            "idle": pool.checkedin(),
+            "checkouts": s["checkouts"],
+            "timeouts": s["timeouts"],
+            "wait_avg_ms": _avg_ms(s["wait_total_s"], s["checkouts"]),
+            "wait_p50_ms": _percentile(waits, 0.50),
+            "wait_p99_ms": _percentile(waits, 0.99),
+            "wait_max_ms": round(s["wait_max_s"] * 1000, 3),
+            "connects": s["connects"],
+            "connect_avg_ms": _avg_ms(s["connect_total_s"], s["connects"]),
+            "connect_max_ms": round(s["connect_max_s"] * 1000, 3),
+        }
+    return result
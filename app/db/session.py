@@ -1,8 +1,41 @@
+from uuid import uuid4
+
 from sqlalchemy import create_engine
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 from app.core.config import settings
+from app.db.pool_metrics import instrumented_pool_class
+
+
+def engine_options(name: str, url: str, async_: bool = False) -> dict:
+    """Opciones de pool desde Settings; con DB_PGBOUNCER, NullPool."""
+    if settings.DB_PGBOUNCER:
+        options = {"poolclass": NullPool}
+        if make_url(url).get_driver_name() == "asyncpg":
+            # asyncpg prepara y cachea sentencias por conexión; con PgBouncer la conexión
+            # del servidor cambia entre transacciones. Aun sin cache, asyncpg prepara con
+            # nombres __asyncpg_stmt_N__ que chocan (DuplicatePreparedStatementError) entre
+            # clientes que comparten conexión de servidor: nombres únicos
+            options["connect_args"] = {
+                "statement_cache_size": 0,
+                "prepared_statement_cache_size": 0,
+                "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+            }
+        return options
+    return {
+        "poolclass": instrumented_pool_class(name, async_),
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SEC,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SEC,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
 
-engine = create_engine(settings.DATABASE_URL)
+engine = create_engine(settings.DATABASE_URL, **engine_options("sync", settings.DATABASE_URL))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 def get_db():
@@ -10,4 +43,29 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+# Engine async para las rutas async def: la espera a Postgres no ocupa un hilo del threadpool.
+# Mismo servidor que DATABASE_URL, con el driver asyncpg (aiosqlite para bases SQLite locales).
+ASYNC_DRIVERS = {"postgresql": "postgresql+asyncpg", "sqlite": "sqlite+aiosqlite"}
+
+
+def async_database_url(url: str) -> str:
+    u = make_url(url)
+    return u.set(drivername=ASYNC_DRIVERS.get(u.get_backend_name(), u.drivername)).render_as_string(hide_password=False)
+
+
+ASYNC_DATABASE_URL = settings.ASYNC_DATABASE_URL or async_database_url(settings.DATABASE_URL)
+async_engine = create_async_engine(ASYNC_DATABASE_URL, **engine_options("async", ASYNC_DATABASE_URL, async_=True))
+# expire_on_commit=False: tras el commit los atributos se leen sin otra consulta (lazy load no existe en async)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def dialect_insert(db):
+    """insert() con ON CONFLICT del dialecto de la sesión (sync o async)."""
+    return sqlite.insert if db.get_bind().dialect.name == "sqlite" else postgresql.insert
@@ -1,20 +1,46 @@
 from fastapi import FastAPI
-from app.db.session import engine
+from app.db.session import engine, async_engine
 from app.db.base import Base
+from app.core.config import settings
+from app.services import slice_jobs, catalog_warmup, reglas_precio
 
 # Routers
 from app.api.v1.custom.create import router as custom_create_router
 from app.api.v1.custom.confirmation import router as custom_confirmation_router
+from app.api.v1.custom.slice_jobs import router as custom_slice_jobs_router
 from app.api.v1.cotizaciones import router as cotizaciones_router
+from app.api.v1.pedidos import router as pedidos_router
 from app.api.v1.nfc.config import router as nfc_config_router
+from app.api.v1.metrics import router as metrics_router
 
 app = FastAPI(title="Creamax API MVP")
 
 # Registrar routers con prefix y tags correctos
 app.include_router(custom_create_router, prefix="/api/v1/custom", tags=["custom"])
 app.include_router(custom_confirmation_router, prefix="/api/v1/custom", tags=["custom"])
+app.include_router(custom_slice_jobs_router, prefix="/api/v1/custom", tags=["custom"])
 app.include_router(cotizaciones_router, prefix="/api/v1/cotizaciones", tags=["cotizaciones"])
+app.include_router(pedidos_router, prefix="/api/v1/pedidos", tags=["pedidos"])
 app.include_router(nfc_config_router, prefix="/api/v1/nfc",tags=["NFC"])
+app.include_router(metrics_router, prefix="/api/v1/metrics", tags=["metrics"])
+
+@app.on_event("startup")
+def load_pricing_rules():
+    # compilar las reglas de cotización antes de la primera solicitud
+    reglas_precio.refresh(force=True)
+
+@app.on_event("startup")
+def warm_catalog_metrics():
+    if settings.CATALOG_WARMUP_ON_STARTUP:
+        catalog_warmup.start_background_warmup()
+
+@app.on_event("shutdown")
+def shutdown_slice_jobs():
+    slice_jobs.shutdown()
+
+@app.on_event("shutdown")
+async def dispose_async_engine():
+    await async_engine.dispose()
 
 # Health check
 @app.get("/")
@@ -4,4 +4,5 @@ from app.models.item_personalizado import ItemPersonalizado
 from app.models.pedido import Pedido
 from app.models.nfc_enlace import NfcEnlace
 from app.models.nfc_visita import NfcVisita
-from app.models.cotizacion import Cotizacion
\ No newline at end of file
+from app.models.cotizacion import Cotizacion
+from app.models.regla_precio import ReglaPrecio
\ No newline at end of file
@@ -6,7 +6,7 @@ class Cliente(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     nombre = Column(String, nullable=False)
-    email = Column(String, nullable=False)
+    email = Column(String, nullable=False, unique=True, index=True)
     telefono = Column(String, nullable=True)
     rut = Column(String, nullable=True)
     direccion = Column(String, nullable=True)
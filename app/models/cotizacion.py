@@ -18,6 +18,8 @@ class Cotizacion(Base):
     cotizacion_min = Column(Float, nullable=False)
     cotizacion_max = Column(Float, nullable=False)
     desglose = Column(JSON, nullable=False)
+    # precio unitario por tramo de cantidad (cotizacion_service.matriz_cantidades)
+    matriz_cantidades = Column(JSON, nullable=True)
 
     tiempo_entrega_dias = Column(Integer, nullable=False)
     valida_hasta = Column(DateTime, nullable=False)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Text, JSON
+from sqlalchemy import Column, Integer, String, Float, Text, JSON, DateTime
 from app.db.base import Base
 
 class ModeloCatalogo(Base):
@@ -13,4 +13,9 @@ class ModeloCatalogo(Base):
     svg = Column(Text, nullable=True)
     textura_imagen_id = Column(String, nullable=True)
     parametros_generacion_ai = Column(JSON, nullable=True)
-    thumbnail_url = Column(String, nullable=True)
\ No newline at end of file
+    thumbnail_url = Column(String, nullable=True)
+    # Métricas del laminador precalculadas (app/services/catalog_warmup.py);
+    # hash_contenido = clave de cache (malla + perfil) con la que se calcularon
+    hash_contenido = Column(String, nullable=True)
+    metricas_slicer = Column(JSON, nullable=True)
+    fecha_metricas = Column(DateTime, nullable=True)
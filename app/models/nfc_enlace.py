@@ -12,3 +12,7 @@ class NfcEnlace(Base):
     fecha_actualizacion = Column(DateTime, default=func.now(), onupdate=func.now())
 
     item_personalizado = relationship("ItemPersonalizado", backref="nfc_enlaces")
+
+    # fecha_actualizacion la calcula la base de datos: se trae en el mismo INSERT
+    # (RETURNING) en vez de un SELECT aparte al leerla tras un flush
+    __mapper_args__ = {"eager_defaults": True}
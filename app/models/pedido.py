@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Numeric, DateTime, Text
+from sqlalchemy import Column, Integer, String, ForeignKey, Numeric, DateTime, Text, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.db.base import Base
@@ -22,3 +22,9 @@ class Pedido(Base):
 
     cliente = relationship("Cliente", backref="pedidos")
     cotizacion = relationship("Cotizacion", back_populates="pedidos")
+
+    # listado keyset (fecha_pedido, id), con y sin filtro por estado
+    __table_args__ = (
+        Index("ix_pedido_fecha_pedido_id", "fecha_pedido", "id"),
+        Index("ix_pedido_estado_fecha_pedido_id", "estado", "fecha_pedido", "id"),
+    )
@@ -0,0 +1,14 @@
+from sqlalchemy import Column, Integer, String, JSON, DateTime
+from datetime import datetime
+from app.db.base import Base
+
+class ReglaPrecio(Base):
+    __tablename__ = "regla_precio"
+
+    # Reglas de cotización versionadas: cada cambio inserta una versión nueva,
+    # la vigente es la de mayor versión; las anteriores no se modifican.
+    id = Column(Integer, primary_key=True, index=True)
+    version = Column(Integer, nullable=False, unique=True, index=True)
+    reglas = Column(JSON, nullable=False)
+    descripcion = Column(String, nullable=True)
+    fecha_creacion = Column(DateTime, default=datetime.utcnow, nullable=False)
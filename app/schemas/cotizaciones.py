@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Optional
 
 class CotizacionListado(BaseModel):
     id: int
@@ -15,3 +15,56 @@ class CotizacionListado(BaseModel):
 
     class Config:
         orm_mode = True
+
+
+class DimensionesBase(BaseModel):
+    alto: float = Field(..., gt=0)
+    ancho: float = Field(..., gt=0)
+    profundidad: float = Field(..., gt=0)
+
+
+class MetricasColumnas(BaseModel):
+    # métricas del laminador por variante, una posición por fila
+    cost: List[float]
+    time: List[float]
+    tool_changes: Optional[List[float]] = None
+
+
+class VariantesBulk(BaseModel):
+    alto: Optional[List[float]] = None
+    ancho: Optional[List[float]] = None
+    profundidad: Optional[List[float]] = None
+    colores: Optional[List[int]] = None
+    include_nfc: Optional[List[bool]] = None
+    cantidad: Optional[List[int]] = None
+
+
+class BulkEstimateRequest(BaseModel):
+    # métricas del modelo base (cost, time, tool_changes), escaladas por variante...
+    slicer_metrics: Optional[Dict[str, Any]] = None
+    dimensiones_base: Optional[DimensionesBase] = None
+    colores_base: int = Field(1, ge=1)
+    # ...o métricas ya calculadas por variante
+    metricas: Optional[MetricasColumnas] = None
+    variantes: VariantesBulk = VariantesBulk()
+    # True: producto cartesiano de las listas de variantes; False: columnas de igual largo
+    combinar: bool = False
+
+
+class DesgloseColumnas(BaseModel):
+    material: List[float]
+    mano_obra: List[float]
+    energia: List[float]
+    acabado: List[float]
+
+
+class BulkEstimateResponse(BaseModel):
+    n: int
+    version_reglas: int
+    moneda: str = "COP"
+    variantes: Dict[str, List[Any]]
+    cotizacion_min: List[float]
+    cotizacion_max: List[float]
+    total_min: Optional[List[float]] = None
+    total_max: Optional[List[float]] = None
+    desglose: DesgloseColumnas
@@ -50,11 +50,19 @@ class Desglose(BaseModel):
     mano_obra: float
     energia: float
     acabado: float
+    version_reglas: Optional[int] = None
 
 class CotizacionRango(BaseModel):
     cotizacion_min: float
     cotizacion_max: float
 
+class MatrizCantidades(BaseModel):
+    version_reglas: int
+    cantidades: List[int]
+    descuentos: List[float]
+    unitario_min: List[float]
+    unitario_max: List[float]
+
 class CustomCreateResponse(BaseModel):
     id: int
     nombre_personalizado: str
@@ -62,6 +70,17 @@ class CustomCreateResponse(BaseModel):
     moneda: str = "COP"
     cotizacion_rango: CotizacionRango
     desglose: Desglose
+    matriz_cantidades: Optional[MatrizCantidades] = None
     tiempo_entrega_dias: int
     valida_hasta: datetime
-    notas: Optional[str] = None
\ No newline at end of file
+    notas: Optional[str] = None
+
+class SliceJobResponse(BaseModel):
+    job_id: str
+    item_id: str
+    estado: str
+    fecha_creacion: datetime
+    fecha_actualizacion: datetime
+    error: Optional[Dict[str, Any]] = None
+    slicer_metrics: Optional[Dict[str, Any]] = None
+    cotizacion: Optional[CustomCreateResponse] = None
@@ -0,0 +1,128 @@
+# app/services/catalog_warmup.py
+"""
+Precálculo de métricas del laminador para los modelos del catálogo.
+
+Recorre modelo_catalogo, descarga y lamina cada modelo con concurrencia acotada
+(CATALOG_WARMUP_CONCURRENCY) y guarda las métricas en la fila; las cotizaciones de
+modelos de catálogo quedan como una simple lectura. Es incremental: si la clave
+del laminado (malla + perfil, app.utils.slicing.slice_key) no cambió desde la
+última pasada, el modelo no se vuelve a laminar. Las descargas repetidas se
+revalidan con la cache de descargas (GET condicional).
+
+Se ejecuta al iniciar la app (CATALOG_WARMUP_ON_STARTUP) o con
+    python -m app.tools.warm_catalog
+"""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.crud.modelo_catalogo import get_modelos_con_url, get_modelo_catalogo, update_metricas_slicer
+from app.utils.slicing import download_3mf, run_prusaslicer_and_parse_metrics, slice_key
+from app.utils.downloader import remove_quietly
+
+logger = logging.getLogger(__name__)
+
+ACTUALIZADO = "actualizado"
+SIN_CAMBIOS = "sin_cambios"
+ERROR = "error"
+
+_running = threading.Lock()
+
+
+def _warm_one(modelo_id: int, url: str, hash_actual: Optional[str], force: bool) -> str:
+    model_path = download_3mf(url)
+    gcode_path = None
+    try:
+        key = slice_key(model_path)
+        if key == hash_actual and not force:
+            return SIN_CAMBIOS
+
+        metrics = run_prusaslicer_and_parse_metrics(model_path)
+        gcode_path = metrics.get("raw_gcode_path")
+        metricas = {k: v for k, v in metrics.items() if k not in ("raw_gcode_path", "cache_hit", "coalesced")}
+
+        db = SessionLocal()
+        try:
+            modelo = get_modelo_catalogo(db, modelo_id)
+            if modelo is None:
+                return ERROR
+            update_metricas_slicer(db, modelo, key, metricas)
+        finally:
+            db.close()
+        return ACTUALIZADO
+    finally:
+        remove_quietly(model_path)
+        if gcode_path:
+            remove_quietly(gcode_path)
+
+
+def warm_catalog(ids: Optional[List[int]] = None, force: bool = False,
+                 concurrency: Optional[int] = None) -> Dict:
+    """Precalcula las métricas de los modelos de catálogo con url.
+
+    Retorna un resumen {"actualizado": n, "sin_cambios": n, "error": n, "errores": [...]}.
+    Solo una pasada a la vez por proceso; una segunda llamada concurrente retorna
+    {"en_curso": True} sin hacer nada.
+    """
+    if not _running.acquire(blocking=False):
+        return {"en_curso": True}
+    try:
+        db = SessionLocal()
+        try:
+            # sólo lo necesario: cada worker usa su propia sesión para escribir
+            pendientes = [(m.id, m.url, m.hash_contenido) for m in get_modelos_con_url(db, ids)]
+        finally:
+            db.close()
+
+        resumen: Dict = {ACTUALIZADO: 0, SIN_CAMBIOS: 0, ERROR: 0, "errores": []}
+        resumen_lock = threading.Lock()
+
+        def _run(item) -> None:
+            modelo_id, url, hash_actual = item
+            error = None
+            try:
+                estado = _warm_one(modelo_id, url, hash_actual, force)
+            except HTTPException as e:
+                estado, error = ERROR, e.detail
+            except Exception as e:
+                logger.exception("Catalog warm-up failed for modelo %s: %s", modelo_id, e)
+                estado, error = ERROR, str(e)
+            with resumen_lock:
+                resumen[estado] += 1
+                if error is not None:
+                    resumen["errores"].append({"modelo_id": modelo_id, "detalle": error})
+
+        workers = max(1, concurrency or settings.CATALOG_WARMUP_CONCURRENCY)
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="catalog-warmup") as pool:
+            list(pool.map(_run, pendientes))
+
+        logger.info("Catalog warm-up: %s updated, %s unchanged, %s failed",
+                    resumen[ACTUALIZADO], resumen[SIN_CAMBIOS], resumen[ERROR])
+        return resumen
+    finally:
+        _running.release()
+
+
+def start_background_warmup() -> threading.Thread:
+    """Lanza warm_catalog en un hilo de fondo (no bloquea el arranque)."""
+    thread = threading.Thread(target=warm_catalog, name="catalog-warmup", daemon=True)
+    thread.start()
+    return thread
+
+
+def get_catalog_metrics(db: Session, modelo_id) -> Optional[Dict]:
+    """Métricas precalculadas de un modelo de catálogo, o None."""
+    try:
+        modelo = get_modelo_catalogo(db, int(modelo_id))
+    except (TypeError, ValueError):
+        # no es entero: puede ser identificador externo
+        return None
+    if modelo is None or not modelo.metricas_slicer:
+        return None
+    return dict(modelo.metricas_slicer, source="catalogo")
@@ -2,35 +2,72 @@
 from datetime import datetime, timedelta
 from decimal import Decimal
 import random
-from typing import Tuple, Dict
+from bisect import bisect_right
+from typing import Tuple, Dict, Optional
+
+import numpy as np
+
+# Los coeficientes de la cotización son reglas versionadas (app/services/reglas_precio.py)
+from app.services.reglas_precio import ReglasPrecio, get_reglas
+
+# variantes sin cambios de filamento medidos: uno por capa y color adicional
+ALTURA_CAPA_MM = 0.2
+# valores de muestra cuando no hay métricas del laminador
+MATERIAL_MUESTRA = (500, 1000)
+TIEMPO_MUESTRA_H = (0.34, 1.34)
+
+def redondear(valor, decimales: int = 2):
+    """Redondeo de montos común a la versión escalar y a la vectorizada (np.round
+    en ambas: el round() de Python redondea el decimal exacto del float y a veces
+    difiere en el último centavo). Escalar -> float, array -> array."""
+    r = np.round(valor, decimales)
+    return float(r) if np.ndim(r) == 0 else r
+
 
 #TODO: se puso un placeholder de simulación de cotización. Se debe aplicar lógica real que se vaya a utilizar.
-def estimate_price_from_params(parametros: dict) -> Tuple[float, float, Dict]:
+def estimate_price_from_params(parametros: dict, reglas: Optional[ReglasPrecio] = None) -> Tuple[float, float, Dict]:
     """
     Retorna (min, max, desglose)
     - parámetros: dict con costo de material, tiempo de impresión y cambios de filamento.
+    - reglas: versión de reglas a usar (por defecto la vigente); queda en desglose["version_reglas"].
     """
+    reglas = reglas or get_reglas()
     
     material_cost = parametros.get("slicer_metrics", {}).get("cost", 0)  # costo del material estimado
     print_time = parametros.get("slicer_metrics", {}).get("time", 0)    # tiempo de impresión en horas
     filament_changes = parametros.get("slicer_metrics", {}).get("tool_changes", 0)  # cambios de herramienta
+    per_tool = parametros.get("slicer_metrics", {}).get("per_tool") or []  # filamento por extrusor
+
+    # Costo de material por color: cada extrusor T<i> imprime el color i de parametros.color
+    colores = parametros.get("color") or []
+    material_por_color = []
+    for t in per_tool:
+        i = t.get("tool", 0)
+        material_por_color.append({
+            "color": colores[i] if i < len(colores) else t.get("filament_colour"),
+            "gramos": t.get("filament_g", 0),
+            "costo": t.get("cost", 0),
+        })
+    costo_por_color = sum(c["costo"] or 0 for c in material_por_color)
+    if costo_por_color > 0:
+        material_cost = costo_por_color
 
     # Simulación de cálculo de cotización basado en métricas
 
     # Si falla conexión con laminador o no se obtienen métricas, usar valores de muestra basados en rangos típicos
     
     if material_cost == 0:
-        material_cost = round(random.uniform(500, 1000), 2)
+        material_cost = redondear(random.uniform(*MATERIAL_MUESTRA))
     
     if print_time == 0:
-        print_time = round(random.uniform(0.34, 1.34), 2)
+        print_time = redondear(random.uniform(*TIEMPO_MUESTRA_H))
     
-    gasto_energía = print_time * 0.12  # consumo energético estimado
-    costo_energía = gasto_energía * 600  # costo energético
-    mantenimiento_impresora = print_time * 769  # mantenimiento de la impresora
-    mano_obra = 1000
-    costo_cambios_filamento = (723 + 120) * filament_changes / 12  # costo por cambios de filamento
-    herraje_llavero = 160
+    gasto_energía = print_time * reglas.consumo_kwh_por_hora  # consumo energético estimado
+    costo_energía = gasto_energía * reglas.costo_kwh  # costo energético
+    mantenimiento_impresora = print_time * reglas.mantenimiento_por_hora  # mantenimiento de la impresora
+    mano_obra = reglas.mano_obra
+    costo_cambios_filamento = reglas.costo_cambio_filamento * filament_changes  # costo por cambios de filamento
+    herraje_llavero = reglas.herraje_llavero
 
     subtotal = (
         material_cost +
@@ -41,10 +78,10 @@ def estimate_price_from_params(parametros: dict) -> Tuple[float, float, Dict]:
         herraje_llavero
     )
 
-    gastos_generales = subtotal * 0.10  # gastos generales
+    gastos_generales = subtotal * reglas.gastos_generales  # gastos generales
 
     if parametros.get("include_nfc", False):
-        nfc_cost = 1000  # costo adicional por NFC
+        nfc_cost = reglas.costo_nfc  # costo adicional por NFC
     else:
         nfc_cost = 0
 
@@ -52,14 +89,211 @@ def estimate_price_from_params(parametros: dict) -> Tuple[float, float, Dict]:
 
     acabado = 0
 
-    cot_min = round(unidad * 1.5, 2)
-    cot_max = round(unidad * 2, 2)
+    cot_min = redondear(unidad * reglas.factor_min)
+    cot_max = redondear(unidad * reglas.factor_max)
 
     desglose = {
-        "material": round(material_cost, 2),
-        "mano_obra": round(mano_obra, 2),
-        "energia": round(costo_energía, 2),
-        "acabado": round(acabado, 2)
+        "material": redondear(material_cost),
+        "mano_obra": redondear(mano_obra),
+        "energia": redondear(costo_energía),
+        "acabado": redondear(acabado),
+        "version_reglas": reglas.version
     }
+    if material_por_color:
+        desglose["material_por_color"] = material_por_color
+    fuente = parametros.get("slicer_metrics", {}).get("source")
+    if fuente:
+        # origen de las métricas: "geometry" = estimación instantánea sin laminar
+        desglose["fuente_metricas"] = fuente
+    artifact = parametros.get("slicer_metrics", {}).get("gcode_artifact")
+    if artifact:
+        # G-code ya laminado para producción (app/utils/gcode_store.py)
+        desglose["gcode_artifact"] = artifact
 
     return cot_min, cot_max, desglose
+
+
+def estimate_prices_bulk(cost, time, tool_changes=None, include_nfc=None, cantidad=None,
+                         rng: Optional[np.random.Generator] = None,
+                         reglas: Optional[ReglasPrecio] = None) -> Dict[str, np.ndarray]:
+    """Versión vectorizada de estimate_price_from_params para muchas variantes.
+
+    Recibe columnas (arrays o listas de igual largo): costo de material, tiempo de
+    impresión (h), cambios de filamento, NFC y cantidad. Retorna columnas
+    cotizacion_min/max, material, mano_obra, energia, acabado y, con cantidad,
+    total_min/total_max. Misma fórmula y redondeo (redondear) que la versión escalar.
+    """
+    reglas = reglas or get_reglas()
+    cost = np.asarray(cost, dtype=np.float64)
+    n = cost.shape[0]
+    time = np.asarray(time, dtype=np.float64)
+    tool_changes = np.zeros(n) if tool_changes is None else np.asarray(tool_changes, dtype=np.float64)
+    include_nfc = np.zeros(n, dtype=bool) if include_nfc is None else np.asarray(include_nfc, dtype=bool)
+    if any(col.shape != (n,) for col in (time, tool_changes, include_nfc)):
+        raise ValueError("Todas las columnas deben tener el mismo largo")
+
+    # valores de muestra donde no hay métricas, como en la versión escalar
+    sin_costo, sin_tiempo = cost == 0, time == 0
+    if sin_costo.any() or sin_tiempo.any():
+        rng = rng or np.random.default_rng()
+        cost = np.where(sin_costo, redondear(rng.uniform(*MATERIAL_MUESTRA, n)), cost)
+        time = np.where(sin_tiempo, redondear(rng.uniform(*TIEMPO_MUESTRA_H, n)), time)
+
+    costo_energia = time * reglas.consumo_kwh_por_hora * reglas.costo_kwh
+    subtotal = (
+        cost +
+        costo_energia +
+        time * reglas.mantenimiento_por_hora +
+        reglas.mano_obra +
+        reglas.costo_cambio_filamento * tool_changes +
+        reglas.herraje_llavero
+    )
+    unidad = subtotal + subtotal * reglas.gastos_generales + np.where(include_nfc, reglas.costo_nfc, 0)
+
+    result = {
+        "cotizacion_min": redondear(unidad * reglas.factor_min),
+        "cotizacion_max": redondear(unidad * reglas.factor_max),
+        "material": redondear(cost),
+        "mano_obra": np.full(n, float(reglas.mano_obra)),
+        "energia": redondear(costo_energia),
+        "acabado": np.zeros(n),
+    }
+    if cantidad is not None:
+        cantidad = np.asarray(cantidad, dtype=np.int64)
+        if cantidad.shape != (n,):
+            raise ValueError("Todas las columnas deben tener el mismo largo")
+        result["total_min"] = redondear(result["cotizacion_min"] * cantidad)
+        result["total_max"] = redondear(result["cotizacion_max"] * cantidad)
+    return result
+
+
+def metrics_for_variants(base_metrics: Dict, base_dims: Tuple[float, float, float],
+                         alto, ancho, profundidad, colores=None, base_colores: int = 1) -> Dict[str, np.ndarray]:
+    """Métricas por variante a partir de las del modelo base (columnas).
+
+    Aproximación sin laminar: material y tiempo escalan con el volumen
+    (alto*ancho*profundidad / volumen base); los cambios de filamento con la
+    altura y los colores adicionales, calibrados con los del modelo base si tiene
+    más de un color, o uno por capa y color adicional si no.
+    """
+    alto, ancho, profundidad = (np.asarray(c, dtype=np.float64) for c in (alto, ancho, profundidad))
+    base_alto, base_ancho, base_prof = (float(d) for d in base_dims)
+    if min(base_alto, base_ancho, base_prof) <= 0:
+        raise ValueError("Las dimensiones base deben ser positivas")
+    escala = (alto * ancho * profundidad) / (base_alto * base_ancho * base_prof)
+
+    colores = np.full(alto.shape, base_colores) if colores is None else np.asarray(colores, dtype=np.float64)
+    base_cambios = float(base_metrics.get("tool_changes") or 0)
+    if base_colores > 1 and base_cambios > 0:
+        cambios_por_mm = base_cambios / ((base_colores - 1) * base_alto)
+    else:
+        cambios_por_mm = 1.0 / ALTURA_CAPA_MM
+    return {
+        "cost": float(base_metrics.get("cost") or 0) * escala,
+        "time": float(base_metrics.get("time") or 0) * escala,
+        "tool_changes": np.round(cambios_por_mm * alto * np.maximum(colores - 1, 0)),
+    }
+
+
+def _variant_columns(variantes: Dict[str, list], combinar: bool, max_variantes: int) -> Tuple[int, Dict[str, np.ndarray]]:
+    columnas = {k: np.asarray(v) for k, v in variantes.items() if v is not None}
+    if not columnas:
+        return 1, {}
+    if combinar:
+        n = int(np.prod([len(c) for c in columnas.values()], dtype=np.float64))
+        if n > max_variantes:
+            raise ValueError(f"Demasiadas variantes ({n}), máximo {max_variantes}")
+        grids = np.meshgrid(*columnas.values(), indexing="ij")
+        return n, {k: g.ravel() for k, g in zip(columnas, grids)}
+    largos = {len(c) for c in columnas.values()}
+    if len(largos) != 1:
+        raise ValueError("Las listas de variantes deben tener el mismo largo (o usar combinar)")
+    n = largos.pop()
+    if n > max_variantes:
+        raise ValueError(f"Demasiadas variantes ({n}), máximo {max_variantes}")
+    return n, columnas
+
+
+def bulk_estimate(variantes: Dict[str, list], combinar: bool = False, slicer_metrics: Optional[Dict] = None,
+                  dimensiones_base: Optional[Dict] = None, colores_base: int = 1,
+                  metricas: Optional[Dict[str, list]] = None, max_variantes: int = 100000) -> Dict:
+    """Tabla de precios por variante (respuesta de POST /cotizaciones/bulk-estimate).
+
+    Las métricas vienen por variante (metricas) o se derivan de las del modelo
+    base con metrics_for_variants. Raises ValueError si las entradas no cuadran.
+    """
+    n, columnas = _variant_columns(variantes, combinar, max_variantes)
+
+    if metricas is not None:
+        cols = {k: np.asarray(v, dtype=np.float64) for k, v in metricas.items() if v is not None}
+        if columnas and any(c.shape != (n,) for c in cols.values()):
+            raise ValueError("metricas y variantes deben tener el mismo largo")
+        n = len(cols["cost"])
+    else:
+        if not slicer_metrics:
+            raise ValueError("Se requiere slicer_metrics (modelo base) o metricas por variante")
+        dims = dimensiones_base or {}
+        base = (dims.get("alto"), dims.get("ancho"), dims.get("profundidad"))
+        medidas = [columnas.get(k) for k in ("alto", "ancho", "profundidad")]
+        if any(m is not None for m in medidas) or "colores" in columnas:
+            if None in base:
+                raise ValueError("dimensiones_base es requerido para escalar por tamaño")
+            medidas = [np.full(n, b, dtype=np.float64) if m is None else m for m, b in zip(medidas, base)]
+            cols = metrics_for_variants(slicer_metrics, base, *medidas,
+                                        colores=columnas.get("colores"), base_colores=colores_base)
+        else:
+            cols = {k: np.full(n, float(slicer_metrics.get(k) or 0)) for k in ("cost", "time", "tool_changes")}
+
+    reglas = get_reglas()
+    precios = estimate_prices_bulk(cols["cost"], cols["time"], cols.get("tool_changes"),
+                                   columnas.get("include_nfc"), columnas.get("cantidad"), reglas=reglas)
+    respuesta = {
+        "n": n,
+        "version_reglas": reglas.version,
+        "variantes": {k: v.tolist() for k, v in columnas.items()},
+        "cotizacion_min": precios["cotizacion_min"].tolist(),
+        "cotizacion_max": precios["cotizacion_max"].tolist(),
+        "desglose": {k: precios[k].tolist() for k in ("material", "mano_obra", "energia", "acabado")},
+    }
+    if "total_min" in precios:
+        respuesta["total_min"] = precios["total_min"].tolist()
+        respuesta["total_max"] = precios["total_max"].tolist()
+    return respuesta
+
+
+def matriz_cantidades(cot_min: float, cot_max: float, reglas: Optional[ReglasPrecio] = None) -> Dict:
+    """Precio unitario por tramo de cantidad (descuento por volumen de las reglas),
+    calculado de una vez al crear la cotización y guardado con ella.
+
+    {"version_reglas", "cantidades": [...], "descuentos": [...],
+     "unitario_min": [...], "unitario_max": [...]}, columnas alineadas por tramo.
+    """
+    reglas = reglas or get_reglas()
+    cantidades = np.array([c for c, _ in reglas.tramos_cantidad], dtype=np.int64)
+    factor = 1.0 - np.array([d for _, d in reglas.tramos_cantidad], dtype=np.float64)
+    return {
+        "version_reglas": reglas.version,
+        "cantidades": cantidades.tolist(),
+        "descuentos": [d for _, d in reglas.tramos_cantidad],
+        "unitario_min": redondear(cot_min * factor).tolist(),
+        "unitario_max": redondear(cot_max * factor).tolist(),
+    }
+
+
+def precio_por_cantidad(matriz: Optional[Dict], cantidad: int, cot_min: float, cot_max: float) -> Dict:
+    """Busca el tramo de `cantidad` en la matriz (sin volver a cotizar).
+    Sin matriz (cotizaciones anteriores) aplica el precio unitario sin descuento."""
+    if matriz and matriz.get("cantidades"):
+        i = max(bisect_right(matriz["cantidades"], cantidad) - 1, 0)
+        unit_min, unit_max = matriz["unitario_min"][i], matriz["unitario_max"][i]
+        descuento = matriz["descuentos"][i]
+    else:
+        unit_min, unit_max, descuento = cot_min, cot_max, 0.0
+    return {
+        "cantidad": cantidad,
+        "descuento": descuento,
+        "unitario_min": unit_min,
+        "unitario_max": unit_max,
+        "total_min": redondear(unit_min * cantidad),
+        "total_max": redondear(unit_max * cantidad),
+    }
@@ -0,0 +1,177 @@
+# app/services/custom_quote_service.py
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from app.schemas.custom import CustomCreateRequest
+from app.crud.item_personalizado import create_item_personalizado
+from app.crud.cotizacion import create_cotizacion
+from app.crud.nfc import create_nfc_enlace, new_short_code
+from app.models.item_personalizado import ItemPersonalizado
+from app.models.cotizacion import Cotizacion
+from app.models.nfc_enlace import NfcEnlace
+from app.utils.generate_item_id import generate_item_id
+from app.services.cotizacion_service import estimate_price_from_params, matriz_cantidades
+from app.services.reglas_precio import get_reglas_version
+
+# Validez de la cotización
+QUOTE_VALIDITY_DAYS = 1000
+
+
+def compute_quote(payload: CustomCreateRequest, slicer_metrics: Optional[Dict] = None) -> Tuple[float, float, Dict]:
+    """Merge parametros and slicer metrics and run the pricing function.
+    Returns (cot_min, cot_max, desglose).
+    """
+    merged_params = payload.parametros.dict()
+    # include safe subset under 'slicer_metrics' to avoid polluting service contract
+    if slicer_metrics:
+        merged_params["slicer_metrics"] = slicer_metrics
+    return estimate_price_from_params(merged_params)
+
+
+def _model_url(payload: CustomCreateRequest) -> Optional[str]:
+    return str(payload.modelo.model_url) if payload.modelo and getattr(payload.modelo, "model_url", None) else None
+
+
+def _cotizacion_data(payload: CustomCreateRequest, item_id: str, cot_min: float, cot_max: float,
+                     desglose: Dict, now: datetime) -> Dict:
+    # tramos de cantidad con las mismas reglas que el precio unitario
+    version = desglose.get("version_reglas")
+    reglas = get_reglas_version(version) if version is not None else None
+    return {
+        "item_personalizado_id": item_id,
+        "nombre_personalizado": payload.nombre_personalizado,
+        "fecha_creacion": now,
+        "moneda": "COP",
+        "cotizacion_min": cot_min,
+        "cotizacion_max": cot_max,
+        "desglose": desglose,
+        "matriz_cantidades": matriz_cantidades(cot_min, cot_max, reglas),
+        "tiempo_entrega_dias": 5,
+        "valida_hasta": now + timedelta(days=QUOTE_VALIDITY_DAYS),
+        "notas": "Valores estimados sujetos a revisión técnica."
+    }
+
+
+def _quote_response(cotizacion_id: int, data: Dict) -> Dict:
+    """Dict con la forma de CustomCreateResponse."""
+    return {
+        "id": cotizacion_id,
+        "nombre_personalizado": data["nombre_personalizado"],
+        "fecha_creacion": data["fecha_creacion"],
+        "moneda": data["moneda"],
+        "cotizacion_rango": {"cotizacion_min": data["cotizacion_min"], "cotizacion_max": data["cotizacion_max"]},
+        "desglose": data["desglose"],
+        "matriz_cantidades": data["matriz_cantidades"],
+        "tiempo_entrega_dias": data["tiempo_entrega_dias"],
+        "valida_hasta": data["valida_hasta"],
+        "notas": data["notas"]
+    }
+
+
+def persist_custom_quote(db: Session, payload: CustomCreateRequest, cot_min: float, cot_max: float,
+                         desglose: Dict, now: Optional[datetime] = None, item_id: Optional[str] = None) -> Dict:
+    """
+    Persiste ItemPersonalizado + Cotizacion (+ NfcEnlace si aplica) en una sola
+    transacción (un commit) y retorna el dict de respuesta con la forma de
+    CustomCreateResponse.
+    """
+    now = now or datetime.utcnow()
+
+    try:
+        # cotización se representa como item personalizado
+        item = create_item_personalizado(
+            db=db,
+            cliente_id=None,
+            modelo_catalogo_id=None,
+            nombre_personalizado=payload.nombre_personalizado,
+            parametros=payload.parametros.dict(),
+            color=payload.parametros.color,
+            logo_url=None,
+            model_url=_model_url(payload),
+            item_id=item_id,
+            commit=False
+        )
+
+        cotizacion_data = _cotizacion_data(payload, item.id, cot_min, cot_max, desglose, now)
+        cotizacion_db = create_cotizacion(db=db, cotizacion=cotizacion_data, commit=False)
+        # antes del commit: después el objeto expira y leer el id sería otro SELECT
+        cotizacion_id = cotizacion_db.id
+
+        # Crear registro NFC si include_nfc es True
+        if payload.parametros.include_nfc and payload.parametros.nfc_url:
+            create_nfc_enlace(
+                db=db,
+                item_personalizado_id=item.id,
+                url_destino=payload.parametros.nfc_url,
+                commit=False
+            )
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"Error al crear cotización: {e}")
+
+    return _quote_response(cotizacion_id, cotizacion_data)
+
+
+def persist_custom_quotes_bulk(db: Session, quotes: List[Tuple[CustomCreateRequest, float, float, Dict]],
+                               now: Optional[datetime] = None) -> List[Dict]:
+    """
+    Persiste varias cotizaciones (payload, cot_min, cot_max, desglose) en una sola
+    transacción: un INSERT multi-fila por tabla, ids de cotizacion vía RETURNING.
+    Retorna las respuestas en el mismo orden. Todo o nada.
+    """
+    now = now or datetime.utcnow()
+
+    # ids cortos: en un lote grande una colisión (con el lote o con filas existentes)
+    # es probable y haría fallar todo el lote; se descartan con una sola consulta
+    item_ids: List[str] = []
+    vistos = set()
+    while len(item_ids) < len(quotes):
+        nuevos = set()
+        while len(nuevos) < len(quotes) - len(item_ids):
+            item_id = generate_item_id()
+            if item_id not in vistos:
+                vistos.add(item_id)
+                nuevos.add(item_id)
+        existentes = set(db.scalars(select(ItemPersonalizado.id).where(ItemPersonalizado.id.in_(nuevos))))
+        item_ids.extend(nuevos - existentes)
+
+    items, cotizaciones, enlaces = [], [], []
+    for item_id, (payload, cot_min, cot_max, desglose) in zip(item_ids, quotes):
+        items.append({
+            "id": item_id,
+            "cliente_id": None,
+            "modelo_catalogo_id": None,
+            "nombre_personalizado": payload.nombre_personalizado,
+            "color": payload.parametros.color,
+            "logo_url": None,
+            "model_url": _model_url(payload),
+            "parametros": payload.parametros.dict(),
+            "fecha_creacion": now,
+        })
+        cotizaciones.append(_cotizacion_data(payload, item_id, cot_min, cot_max, desglose, now))
+        if payload.parametros.include_nfc and payload.parametros.nfc_url:
+            enlaces.append({
+                "item_personalizado_id": item_id,
+                "short_code": new_short_code(),
+                "url_destino_actual": payload.parametros.nfc_url,
+            })
+
+    try:
+        db.execute(insert(ItemPersonalizado), items)
+        # item_personalizado_id es único por cotización: emparejar por él no depende
+        # del orden de RETURNING (y no obliga a insertar fila por fila)
+        result = db.execute(insert(Cotizacion).returning(Cotizacion.item_personalizado_id, Cotizacion.id), cotizaciones)
+        cotizacion_ids = dict(result.all())
+        if enlaces:
+            db.execute(insert(NfcEnlace), enlaces)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"Error al crear cotizaciones: {e}")
+
+    return [_quote_response(cotizacion_ids[data["item_personalizado_id"]], data) for data in cotizaciones]
@@ -0,0 +1,138 @@
+# app/services/reglas_precio.py
+"""
+Reglas de cotización compiladas en memoria.
+
+Las reglas viven en la tabla versionada regla_precio; get_reglas() retorna un
+objeto inmutable ya compilado, sin ir a la base de datos por solicitud. A lo
+sumo cada PRICING_RULES_REFRESH_SEC una llamada revisa la versión vigente
+(SELECT max(version)) y, si cambió, carga y compila la nueva; las demás siguen
+usando la anterior mientras tanto. Sin tabla o sin filas se usan las reglas por
+defecto (versión 0).
+"""
+import time
+import logging
+import threading
+from typing import Dict, NamedTuple, Optional, Tuple
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.crud.regla_precio import get_regla_precio, get_version_vigente
+
+logger = logging.getLogger(__name__)
+
+
+class ReglasPrecio(NamedTuple):
+    version: int
+    consumo_kwh_por_hora: float = 0.12
+    costo_kwh: float = 600
+    mantenimiento_por_hora: float = 769
+    mano_obra: float = 1000
+    costo_cambio_filamento: float = (723 + 120) / 12
+    herraje_llavero: float = 160
+    gastos_generales: float = 0.10
+    costo_nfc: float = 1000
+    factor_min: float = 1.5
+    factor_max: float = 2
+    # descuento por volumen: (cantidad mínima, descuento sobre el precio unitario)
+    tramos_cantidad: Tuple[Tuple[int, float], ...] = ((1, 0.0), (10, 0.05), (50, 0.10), (100, 0.15), (500, 0.20))
+
+
+REGLAS_POR_DEFECTO = ReglasPrecio(version=0)
+
+_current: Optional[ReglasPrecio] = None
+_checked_at = 0.0
+_refresh_lock = threading.Lock()
+# las versiones publicadas no cambian: se compilan una vez
+_por_version: Dict[int, ReglasPrecio] = {}
+
+
+def _compile_tramos(tramos) -> Tuple[Tuple[int, float], ...]:
+    compilados = tuple(sorted((int(cantidad), float(descuento)) for cantidad, descuento in tramos))
+    if not compilados or compilados[0][0] != 1:
+        raise ValueError("tramos_cantidad debe empezar en cantidad 1")
+    if len({c for c, _ in compilados}) != len(compilados):
+        raise ValueError("tramos_cantidad tiene cantidades repetidas")
+    if any(not 0 <= d < 1 for _, d in compilados):
+        raise ValueError("Los descuentos de tramos_cantidad deben estar en [0, 1)")
+    return compilados
+
+
+def compile_reglas(version: int, reglas: Dict) -> ReglasPrecio:
+    """Valida el JSON de una versión y lo convierte en ReglasPrecio.
+    Claves faltantes toman el valor por defecto; las desconocidas se ignoran."""
+    campos = set(ReglasPrecio._fields) - {"version"}
+    desconocidas = set(reglas) - campos
+    if desconocidas:
+        logger.warning("Pricing rules v%s: ignoring unknown keys %s", version, sorted(desconocidas))
+    valores = {}
+    if "tramos_cantidad" in reglas:
+        valores["tramos_cantidad"] = _compile_tramos(reglas["tramos_cantidad"])
+    for k in (campos & set(reglas)) - {"tramos_cantidad"}:
+        valor = float(reglas[k])
+        if valor < 0:
+            raise ValueError(f"Regla {k} no puede ser negativa")
+        valores[k] = valor
+    return ReglasPrecio(version=version, **valores)
+
+
+def _load(version: Optional[int] = None) -> Optional[ReglasPrecio]:
+    db = SessionLocal()
+    try:
+        regla = get_regla_precio(db, version)
+        return compile_reglas(regla.version, regla.reglas) if regla else None
+    finally:
+        db.close()
+
+
+def refresh(force: bool = False) -> ReglasPrecio:
+    """Revisa la versión vigente y recompila si cambió (o siempre con force)."""
+    global _current, _checked_at
+    try:
+        if force or _current is None:
+            reglas = _load() or REGLAS_POR_DEFECTO
+        else:
+            db = SessionLocal()
+            try:
+                version = get_version_vigente(db)
+            finally:
+                db.close()
+            reglas = _current if version in (None, _current.version) else (_load(version) or _current)
+        if _current is None or reglas.version != _current.version:
+            logger.info("Pricing rules version %s loaded", reglas.version)
+            _por_version[reglas.version] = reglas
+        _current = reglas
+    except Exception as e:
+        # sin base de datos o sin tabla: seguir con las reglas que había
+        logger.warning("Could not refresh pricing rules, keeping version %s: %s",
+                       _current.version if _current else REGLAS_POR_DEFECTO.version, e)
+        if _current is None:
+            _current = REGLAS_POR_DEFECTO
+    _checked_at = time.monotonic()
+    return _current
+
+
+def get_reglas() -> ReglasPrecio:
+    """Reglas vigentes, compiladas. Sin acceso a la base de datos salvo la
+    revisión periódica de versión, que hace un solo llamador a la vez."""
+    reglas = _current
+    if reglas is None:
+        with _refresh_lock:
+            return _current or refresh()
+    if time.monotonic() - _checked_at >= settings.PRICING_RULES_REFRESH_SEC and _refresh_lock.acquire(blocking=False):
+        try:
+            return refresh()
+        finally:
+            _refresh_lock.release()
+    return reglas
+
+
+def get_reglas_version(version: int) -> Optional[ReglasPrecio]:
+    """Reglas de una versión concreta (p.ej. la registrada en una cotización)."""
+    if version == REGLAS_POR_DEFECTO.version:
+        return REGLAS_POR_DEFECTO
+    reglas = _por_version.get(version)
+    if reglas is None:
+        reglas = _load(version)
+        if reglas is not None:
+            _por_version[version] = reglas
+    return reglas
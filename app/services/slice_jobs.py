@@ -0,0 +1,151 @@
+# app/services/slice_jobs.py
+"""
+Cola de trabajos de laminado en proceso.
+
+POST /custom/slice-jobs encola un trabajo y retorna de inmediato; un pool acotado
+de workers (SLICE_MAX_WORKERS) descarga el 3MF, ejecuta PrusaSlicer y, cuando las
+métricas están listas, finaliza la cotización (precio + persistencia). El estado se
+consulta con GET /custom/slice-jobs/{id}; el progreso en vivo del laminado se
+sigue por SSE en GET /custom/items/{item_id}/progress (el item_id se reserva al
+encolar y es el id del item personalizado que se crea al final).
+"""
+import os
+import time
+import uuid
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, Optional
+
+from fastapi import HTTPException
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.schemas.custom import CustomCreateRequest
+from app.services.custom_quote_service import compute_quote, persist_custom_quote
+from app.utils.slicing import download_3mf, run_prusaslicer_and_parse_metrics
+from app.utils.slice_progress import hub as progress_hub
+from app.utils.generate_item_id import generate_item_id
+
+logger = logging.getLogger(__name__)
+
+ESTADO_PENDIENTE = "pendiente"
+ESTADO_PROCESANDO = "procesando"
+ESTADO_COMPLETADO = "completado"
+ESTADO_FALLIDO = "fallido"
+
+# Each worker thread only waits on its PrusaSlicer subprocess, so the thread
+# pool size is the bound on concurrent slicer processes.
+_executor = ThreadPoolExecutor(max_workers=max(1, settings.SLICE_MAX_WORKERS), thread_name_prefix="slice-job")
+_jobs: Dict[str, Dict] = {}
+_lock = threading.Lock()
+
+
+def _prune_finished_jobs() -> None:
+    """Drop finished jobs older than SLICE_JOB_TTL_SEC. Caller holds _lock."""
+    ttl = settings.SLICE_JOB_TTL_SEC
+    now = time.monotonic()
+    expired = [
+        job_id for job_id, job in _jobs.items()
+        if job["estado"] in (ESTADO_COMPLETADO, ESTADO_FALLIDO) and now - job["_finished_at"] > ttl
+    ]
+    for job_id in expired:
+        del _jobs[job_id]
+
+
+def submit_slice_job(payload: CustomCreateRequest) -> Dict:
+    """Encola un trabajo de laminado + cotización. Retorna la vista pública del job."""
+    if not (payload.modelo and getattr(payload.modelo, "model_url", None)):
+        raise HTTPException(status_code=422, detail="modelo.model_url es requerido para laminar")
+
+    with _lock:
+        _prune_finished_jobs()
+        pending = sum(1 for j in _jobs.values() if j["estado"] in (ESTADO_PENDIENTE, ESTADO_PROCESANDO))
+        if pending >= settings.SLICE_MAX_QUEUED:
+            raise HTTPException(status_code=503, detail="Cola de laminado llena, intente más tarde")
+
+        now = datetime.utcnow()
+        job = {
+            "job_id": uuid.uuid4().hex,
+            "item_id": generate_item_id(),
+            "estado": ESTADO_PENDIENTE,
+            "fecha_creacion": now,
+            "fecha_actualizacion": now,
+            "error": None,
+            "slicer_metrics": None,
+            "cotizacion": None,
+            "_finished_at": None,
+        }
+        _jobs[job["job_id"]] = job
+
+    progress_hub.publish(job["item_id"], {"estado": ESTADO_PENDIENTE})
+    _executor.submit(_run_job, job["job_id"], job["item_id"], payload)
+    return get_slice_job(job["job_id"])
+
+
+def get_slice_job(job_id: str) -> Optional[Dict]:
+    """Retorna una copia del estado del job (sin campos internos) o None."""
+    with _lock:
+        job = _jobs.get(job_id)
+        if job is None:
+            return None
+        return {k: v for k, v in job.items() if not k.startswith("_")}
+
+
+def _update(job_id: str, **fields) -> None:
+    with _lock:
+        job = _jobs.get(job_id)
+        if job is None:
+            return
+        job.update(fields)
+        job["fecha_actualizacion"] = datetime.utcnow()
+        if job["estado"] in (ESTADO_COMPLETADO, ESTADO_FALLIDO):
+            job["_finished_at"] = time.monotonic()
+
+
+def _run_job(job_id: str, item_id: str, payload: CustomCreateRequest) -> None:
+    _update(job_id, estado=ESTADO_PROCESANDO)
+    tmp_files = []
+    slicer_metrics: Dict = {}
+    try:
+        progress_hub.publish(item_id, {"estado": "descargando"})
+        model_3mf_path = download_3mf(str(payload.modelo.model_url))
+        tmp_files.append(model_3mf_path)
+        progress_hub.publish(item_id, {"estado": "laminando", "progreso": 0, "mensaje": None})
+        slicer_metrics = run_prusaslicer_and_parse_metrics(model_3mf_path, progress_key=item_id)
+        if slicer_metrics.get("raw_gcode_path"):
+            tmp_files.append(slicer_metrics["raw_gcode_path"])
+        _update(job_id, slicer_metrics={k: v for k, v in slicer_metrics.items() if k != "raw_gcode_path"})
+
+        # finalizar cotización con las métricas del laminador
+        progress_hub.publish(item_id, {"estado": "cotizando", "progreso": 100})
+        cot_min, cot_max, desglose = compute_quote(payload, slicer_metrics)
+        db = SessionLocal()
+        try:
+            cotizacion = persist_custom_quote(db, payload, cot_min, cot_max, desglose, item_id=item_id)
+        finally:
+            db.close()
+        _update(job_id, estado=ESTADO_COMPLETADO, cotizacion=cotizacion)
+        progress_hub.publish(item_id, {"estado": ESTADO_COMPLETADO, "cotizacion_id": cotizacion["id"]})
+    except HTTPException as e:
+        error = {"status_code": e.status_code, "detalle": e.detail}
+        _update(job_id, estado=ESTADO_FALLIDO, error=error)
+        progress_hub.publish(item_id, {"estado": ESTADO_FALLIDO, "error": error})
+    except Exception as e:
+        logger.exception("Slice job %s failed: %s", job_id, e)
+        error = {"status_code": 500, "detalle": str(e)}
+        _update(job_id, estado=ESTADO_FALLIDO, error=error)
+        progress_hub.publish(item_id, {"estado": ESTADO_FALLIDO, "error": error})
+    finally:
+        for p in tmp_files:
+            try:
+                if os.path.exists(p):
+                    os.remove(p)
+            except Exception:
+                logger.warning("Failed to remove temp file %s", p)
+
+
+def shutdown() -> None:
+    """Stop accepting work; running slices are left to finish in the background."""
+    _executor.shutdown(wait=False, cancel_futures=True)
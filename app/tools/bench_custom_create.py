@@ -0,0 +1,114 @@
+"""
+Benchmark de creación de cotizaciones: N llamadas a POST /custom/create vs una
+llamada a POST /custom/create/batch con las mismas N cotizaciones, y N llamadas
+a POST /custom/confirmation. Muestra sentencias SQL y commits por modo.
+
+    python -m app.tools.bench_custom_create --cotizaciones 500
+
+Escribe filas reales (item_personalizado, cotizacion, nfc_enlace) en la base de
+datos de DATABASE_URL: usar contra una base de datos de prueba.
+"""
+import sys
+import time
+import argparse
+from typing import Dict, List, Optional
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app.main import app
+from app.db.session import engine
+
+
+def _payload(i: int, nfc: bool) -> Dict:
+    payload = {
+        "fuente_modelo": "svg",
+        "nombre_personalizado": f"Llavero {i}",
+        "modelo": {},
+        "parametros": {"alto": 5, "ancho": 40, "profundidad": 4, "include_nfc": nfc},
+    }
+    if nfc:
+        payload["parametros"]["nfc_url"] = f"https://example.com/{i}"
+    return payload
+
+
+class _Counter:
+    """Sentencias SQL y commits emitidos contra el engine."""
+
+    def __init__(self):
+        self.statements = 0
+        self.commits = 0
+        event.listen(engine, "before_cursor_execute", self._statement)
+        event.listen(engine, "commit", self._commit)
+
+    def _statement(self, *args):
+        self.statements += 1
+
+    def _commit(self, *args):
+        self.commits += 1
+
+    def reset(self):
+        self.statements = self.commits = 0
+
+
+def bench(n: int, nfc_ratio: float) -> List[Dict]:
+    client = TestClient(app)
+    payloads = [_payload(i, i < n * nfc_ratio) for i in range(n)]
+    counter = _Counter()
+    rows = []
+
+    counter.reset()
+    start = time.perf_counter()
+    cotizacion_ids = []
+    for p in payloads:
+        r = client.post("/api/v1/custom/create", json=p)
+        r.raise_for_status()
+        cotizacion_ids.append(r.json()["id"])
+    elapsed = time.perf_counter() - start
+    rows.append({"modo": "una_a_una", "cotizaciones": n, "segundos": round(elapsed, 3),
+                 "cotizaciones_s": round(n / elapsed, 1), "sentencias": counter.statements, "commits": counter.commits})
+
+    counter.reset()
+    start = time.perf_counter()
+    r = client.post("/api/v1/custom/create/batch", json=payloads)
+    r.raise_for_status()
+    elapsed = time.perf_counter() - start
+    rows.append({"modo": "lote", "cotizaciones": len(r.json()), "segundos": round(elapsed, 3),
+                 "cotizaciones_s": round(n / elapsed, 1), "sentencias": counter.statements, "commits": counter.commits})
+
+    counter.reset()
+    start = time.perf_counter()
+    for i, cotizacion_id in enumerate(cotizacion_ids):
+        r = client.post("/api/v1/custom/confirmation", json={
+            "cotizacion_id": cotizacion_id, "nombre": f"Cliente {i % 50}",
+            "email": f"cliente{i % 50}@example.com", "cantidad": 1 + i % 120,
+        })
+        r.raise_for_status()
+    elapsed = time.perf_counter() - start
+    rows.append({"modo": "confirmacion", "cotizaciones": n, "segundos": round(elapsed, 3),
+                 "cotizaciones_s": round(n / elapsed, 1), "sentencias": counter.statements, "commits": counter.commits})
+    return rows
+
+
+def _print_table(rows: List[Dict]) -> None:
+    columns = list(rows[0].keys())
+    widths = {c: max(len(c), *(len(str(r[c])) for r in rows)) for c in columns}
+    print("  ".join(c.ljust(widths[c]) for c in columns))
+    for r in rows:
+        print("  ".join(str(r[c]).ljust(widths[c]) for c in columns))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.tools.bench_custom_create", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cotizaciones", type=int, default=500)
+    parser.add_argument("--nfc", type=float, default=0.5, help="fraction of quotes with NFC")
+    args = parser.parse_args(argv)
+    rows = bench(args.cotizaciones, args.nfc)
+    _print_table(rows)
+    print(f"\nspeedup lote: {rows[1]['cotizaciones_s'] / rows[0]['cotizaciones_s']:.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
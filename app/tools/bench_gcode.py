@@ -0,0 +1,154 @@
+"""
+Benchmark del procesamiento de G-code sobre archivos sintéticos del tamaño de una
+bandeja grande (formato de PrusaSlicer: cuerpo, resumen y bloque de config al final).
+
+    python -m app.tools.bench_gcode resumen --mb 100 300
+    python -m app.tools.bench_gcode analizador --mb 100 300 --chunk-mb 4 16
+
+
+resumen: métricas del resumen (costo, tiempo, cambios de herramienta) leyendo el
+archivo completo + regex (camino anterior) vs parse_gcode_metrics_file (lectura
+desde el final). Verifica que ambos den el mismo resultado.
+
+analizador: throughput (MB/s) de analyze_gcode (filamento por extrusor, capas,
+tiempo por tipo de línea) por tamaño de chunk. Verifica que el resultado no
+dependa del tamaño de chunk.
+
+Los archivos se generan en un directorio temporal (o --dir) y se borran al final.
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+from typing import Dict, List, Optional
+
+from app.utils import slicing
+from app.utils.gcode_analyzer import analyze_gcode
+
+SUMMARY = (
+    "; filament used [mm] = 81234.56, 4321.00\n"
+    "; filament used [g] = 242.31, 12.89\n"
+    "; total filament used [g] = 255.20\n"
+    "; total filament cost = 5104.00\n"
+    "; total toolchanges = 42\n"
+    "; estimated printing time (normal mode) = 1d 3h 12m 5s\n"
+)
+CONFIG = (
+    "; prusaslicer_config = begin\n"
+    "; filament_colour = #FF0000;#00FF00\n"
+    "; filament_cost = 20000,25000\n"
+    "; filament_density = 1.24,1.24\n"
+    "; filament_diameter = 1.75,1.75\n"
+    "; use_relative_e_distances = 1\n"
+    "; prusaslicer_config = end\n"
+)
+
+
+def _layer(n: int) -> str:
+    lines = [";LAYER_CHANGE", f";Z:{0.2 * (n + 1):.2f}", f"M73 P{n % 100} R{max(0, 600 - n)}",
+             f"T{n % 2}" if n % 50 == 0 else "", ";TYPE:Perimeter"]
+    for i in range(200):
+        lines.append(f"G1 X{100 + i % 50:.3f} Y{80 + i % 30:.3f} E.{3000 + i % 900:04d}")
+    lines.append(";TYPE:Solid infill")
+    for i in range(200):
+        lines.append(f"G1 X{120 - i % 40:.3f} Y{90 + i % 20:.3f} E{1 + i % 3}.{i % 97:02d}")
+    return "\n".join(l for l in lines if l) + "\n"
+
+
+def write_synthetic_gcode(path: str, size_mb: float) -> int:
+    """Escribe un G-code sintético de ~size_mb MB; retorna el tamaño en bytes."""
+    target = int(size_mb * 1024 * 1024)
+    block = "".join(_layer(n) for n in range(100)).encode()
+    with open(path, "wb") as f:
+        f.write(b"; generated by PrusaSlicer (synthetic)\nM83\nG21\n")
+        written = 0
+        while written < target:
+            f.write(block)
+            written += len(block)
+        f.write(SUMMARY.encode() + b"\n" + CONFIG.encode())
+    return os.path.getsize(path)
+
+
+def _full_read(path: str) -> Dict:
+    # camino anterior: el archivo completo en memoria y regex sobre el texto
+    with open(path, "r", errors="ignore") as f:
+        return slicing.parse_gcode_metrics(f.read())
+
+
+def _best(fn, path: str, repeat: int):
+    times, result = [], None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(path)
+        times.append(time.perf_counter() - start)
+    return result, min(times)
+
+
+def bench_resumen(path: str, repeat: int) -> Dict:
+    full, full_s = _best(_full_read, path, repeat)
+    tail, tail_s = _best(slicing.parse_gcode_metrics_file, path, repeat)
+    return {
+        "mb": round(os.path.getsize(path) / (1024 * 1024), 1),
+        "lectura_completa_s": round(full_s, 4),
+        "desde_el_final_s": round(tail_s, 5),
+        "speedup": round(full_s / tail_s) if tail_s else None,
+        "mismo_resultado": full == tail,
+    }
+
+
+def bench_analizador(path: str, repeat: int, chunk_mbs: List[float]) -> List[Dict]:
+    mb = os.path.getsize(path) / (1024 * 1024)
+    rows, results = [], []
+    for chunk_mb in chunk_mbs:
+        chunk_size = int(chunk_mb * 1024 * 1024)
+        result, seconds = _best(lambda p: analyze_gcode(p, chunk_size=chunk_size), path, repeat)
+        results.append(result)
+        rows.append({
+            "mb": round(mb, 1),
+            "chunk_mb": chunk_mb,
+            "segundos": round(seconds, 3),
+            "mb_s": round(mb / seconds, 1),
+            "capas": result["layers"],
+            "mismo_resultado": result == results[0],
+        })
+    return rows
+
+
+def _print_table(rows: List[Dict]) -> None:
+    columns = list(rows[0].keys())
+    widths = {c: max(len(c), *(len(str(r[c])) for r in rows)) for c in columns}
+    print("  ".join(c.ljust(widths[c]) for c in columns))
+    for r in rows:
+        print("  ".join(str(r[c]).ljust(widths[c]) for c in columns))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.tools.bench_gcode", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="modo", required=True)
+    resumen = sub.add_parser("resumen", help="full read + regex vs tail scan of the summary")
+    analizador = sub.add_parser("analizador", help="analyze_gcode throughput")
+    analizador.add_argument("--chunk-mb", type=float, nargs="+", default=[4, 16], help="chunk sizes")
+    for p in (resumen, analizador):
+        p.add_argument("--mb", type=float, nargs="+", default=[100, 300], help="synthetic file sizes")
+        p.add_argument("--repeat", type=int, default=3, help="runs per size (best time is reported)")
+        p.add_argument("--dir", default=None, help="where to write the synthetic files")
+    args = parser.parse_args(argv)
+
+    rows = []
+    with tempfile.TemporaryDirectory(dir=args.dir) as tmp:
+        for mb in args.mb:
+            path = os.path.join(tmp, f"synthetic_{mb:g}mb.gcode")
+            write_synthetic_gcode(path, mb)
+            if args.modo == "resumen":
+                rows.append(bench_resumen(path, args.repeat))
+            else:
+                rows.extend(bench_analizador(path, args.repeat, args.chunk_mb))
+            os.remove(path)
+    _print_table(rows)
+    return 0 if all(r["mismo_resultado"] for r in rows) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
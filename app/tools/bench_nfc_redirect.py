@@ -0,0 +1,137 @@
+"""
+Prueba de carga de la redirección NFC (GET /api/v1/nfc/{short_code}): handler
+sync (sesión sync en el threadpool, como antes) vs el handler async actual
+(AsyncSession), con el mismo número de solicitudes concurrentes.
+
+    python -m app.tools.bench_nfc_redirect --solicitudes 5000 --concurrencia 100 200 500
+
+Levanta uvicorn en un puerto local y registra visitas reales en la base de datos
+de DATABASE_URL (crea un enlace NFC de prueba si no se pasa --short-code).
+"""
+import sys
+import time
+import socket
+import asyncio
+import argparse
+import threading
+from typing import Dict, List, Optional
+
+import httpx
+import uvicorn
+from fastapi import Depends, FastAPI, HTTPException, status
+from fastapi.responses import RedirectResponse
+from sqlalchemy.orm import Session
+
+from app.db.session import SessionLocal, get_db
+from app.crud.item_personalizado import create_item_personalizado
+from app.crud.nfc import create_nfc_enlace, get_nfc_by_short_code, register_visit
+from app.api.v1.nfc.config import router as nfc_router
+
+
+def _app() -> FastAPI:
+    app = FastAPI()
+
+    # handler anterior a las rutas async, como referencia
+    @app.get("/sync/{short_code}")
+    def redirect_sync(short_code: str, db: Session = Depends(get_db)):
+        nfc = get_nfc_by_short_code(db, short_code)
+        if not nfc:
+            raise HTTPException(status_code=404, detail="NFC no encontrado")
+        register_visit(db, nfc.id)
+        return RedirectResponse(url=nfc.url_destino_actual, status_code=status.HTTP_307_TEMPORARY_REDIRECT)
+
+    app.include_router(nfc_router, prefix="/async")
+    return app
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _short_code() -> str:
+    db = SessionLocal()
+    try:
+        item = create_item_personalizado(db, None, None, "bench nfc", {})
+        return create_nfc_enlace(db, item.id, "https://example.com/bench").short_code
+    finally:
+        db.close()
+
+
+async def _load(url: str, n: int, concurrency: int) -> Dict:
+    latencies: List[float] = []
+    errors = 0
+    pending = iter(range(n))
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=60) as client:
+
+        async def worker():
+            nonlocal errors
+            for _ in pending:
+                start = time.perf_counter()
+                try:
+                    r = await client.get(url)
+                    if r.status_code != status.HTTP_307_TEMPORARY_REDIRECT:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "rps": round(n / elapsed, 1),
+        "p50_ms": round(latencies[len(latencies) // 2] * 1000, 1),
+        "p99_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000, 1),
+        "errores": errors,
+    }
+
+
+def bench(n: int, concurrencies: List[int], short_code: str) -> List[Dict]:
+    port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(_app(), host="127.0.0.1", port=port, log_level="warning",
+                                           access_log=False))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+
+    rows = []
+    try:
+        for concurrency in concurrencies:
+            for modo in ("sync", "async"):
+                url = f"http://127.0.0.1:{port}/{modo}/{short_code}"
+                row = {"modo": modo, "concurrencia": concurrency, "solicitudes": n}
+                row.update(asyncio.run(_load(url, n, concurrency)))
+                rows.append(row)
+    finally:
+        server.should_exit = True
+        thread.join()
+    return rows
+
+
+def _print_table(rows: List[Dict]) -> None:
+    columns = list(rows[0].keys())
+    widths = {c: max(len(c), *(len(str(r[c])) for r in rows)) for c in columns}
+    print("  ".join(c.ljust(widths[c]) for c in columns))
+    for r in rows:
+        print("  ".join(str(r[c]).ljust(widths[c]) for c in columns))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.tools.bench_nfc_redirect", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--solicitudes", type=int, default=5000)
+    parser.add_argument("--concurrencia", type=int, nargs="+", default=[100, 200, 500])
+    parser.add_argument("--short-code", default=None, help="existing NFC short code (default: create one)")
+    args = parser.parse_args(argv)
+    _print_table(bench(args.solicitudes, args.concurrencia, args.short_code or _short_code()))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,80 @@
+"""
+Benchmark de la cotización masiva: estimate_price_from_params en un bucle vs
+estimate_prices_bulk (NumPy) sobre las mismas variantes. Falla si algún precio
+mínimo o máximo difiere entre ambas.
+
+    python -m app.tools.bench_pricing --variantes 1000 10000 100000
+"""
+import sys
+import time
+import argparse
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from app.services.cotizacion_service import estimate_price_from_params, estimate_prices_bulk
+
+
+def _variants(n: int, seed: int = 0) -> Dict[str, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    return {
+        "cost": np.round(rng.uniform(50, 5000, n), 2),
+        "time": np.round(rng.uniform(0.2, 30, n), 2),
+        "tool_changes": rng.integers(0, 300, n),
+        "include_nfc": rng.random(n) < 0.5,
+        "cantidad": rng.integers(1, 1000, n),
+    }
+
+
+def bench(n: int, repeat: int = 3) -> Dict:
+    v = _variants(n)
+    rows = [
+        {"slicer_metrics": {"cost": float(c), "time": float(t), "tool_changes": int(tc)}, "include_nfc": bool(nfc)}
+        for c, t, tc, nfc in zip(v["cost"], v["time"], v["tool_changes"], v["include_nfc"])
+    ]
+
+    scalar_s, bulk_s = [], []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        scalar = [estimate_price_from_params(r) for r in rows]
+        scalar_s.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        bulk = estimate_prices_bulk(v["cost"], v["time"], v["tool_changes"], v["include_nfc"], v["cantidad"])
+        bulk_s.append(time.perf_counter() - start)
+
+    # mismo redondeo en ambas versiones: los precios deben ser idénticos, no solo cercanos
+    max_diff = max((max(abs(s[0] - b_min), abs(s[1] - b_max))
+                    for s, b_min, b_max in zip(scalar, bulk["cotizacion_min"], bulk["cotizacion_max"])),
+                   default=0.0)
+    assert max_diff == 0, f"estimate_prices_bulk difiere de estimate_price_from_params en {max_diff}"
+    return {
+        "variantes": n,
+        "escalar_s": round(min(scalar_s), 4),
+        "bulk_s": round(min(bulk_s), 4),
+        "speedup": round(min(scalar_s) / min(bulk_s), 1) if min(bulk_s) else None,
+        "variantes_s": int(n / min(bulk_s)) if min(bulk_s) else None,
+        "max_dif": float(max_diff),
+    }
+
+
+def _print_table(rows: List[Dict]) -> None:
+    columns = list(rows[0].keys())
+    widths = {c: max(len(c), *(len(str(r[c])) for r in rows)) for c in columns}
+    print("  ".join(c.ljust(widths[c]) for c in columns))
+    for r in rows:
+        print("  ".join(str(r[c]).ljust(widths[c]) for c in columns))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.tools.bench_pricing", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--variantes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=3, help="runs per size (best time is reported)")
+    args = parser.parse_args(argv)
+    _print_table([bench(n, args.repeat) for n in args.variantes])
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,161 @@
+"""
+Benchmark de modos de laminado sobre un conjunto de 3MF.
+
+    python -m app.tools.bench_slicing split modelos/*.3mf
+
+    python -m app.tools.bench_slicing batch modelos/*.3mf --cotizaciones 40 --concurrencia 8
+
+split: para cada modelo lamina la bandeja completa (--merge) y por objeto en
+paralelo (SLICE_SPLIT_OBJECTS), y muestra latencia y error de costo/tiempo.
+batch: cotizaciones por minuto laminando una a una vs por lotes (SLICE_BATCH_*),
+con el mismo número de solicitudes concurrentes.
+No usa la cache de laminado.
+"""
+import os
+import sys
+import time
+import argparse
+import shutil
+import zipfile
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from app.core.config import settings
+from app.utils import slicing, slice_split
+from app.utils.slice_batcher import SliceBatcher
+
+
+def _timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def _drop_gcode(metrics: Dict) -> None:
+    if metrics.get("raw_gcode_path"):
+        slicing.remove_quietly(metrics["raw_gcode_path"])
+
+
+def _error_pct(value: Optional[float], reference: Optional[float]) -> Optional[float]:
+    if not value or not reference:
+        return None
+    return round(100.0 * (value - reference) / reference, 2)
+
+
+def bench_split(paths: List[str], repeat: int = 1) -> List[Dict]:
+    rows = []
+    for path in paths:
+        with zipfile.ZipFile(path) as z:
+            objects = len(slice_split.build_items(z.read(slice_split.MODEL_PATH)))
+
+        merged_s, split_s = [], []
+        for _ in range(repeat):
+            merged, t = _timed(slicing._run_prusaslicer, path)
+            _drop_gcode(merged)
+            merged_s.append(t)
+            split, t = _timed(slicing._run_prusaslicer_split, path)
+            split_s.append(t)
+
+        rows.append({
+            "modelo": os.path.basename(path),
+            "objetos": objects,
+            "merge_s": round(min(merged_s), 2),
+            "split_s": round(min(split_s), 2),
+            "speedup": round(min(merged_s) / min(split_s), 2) if min(split_s) else None,
+            "costo_merge": merged.get("cost"),
+            "costo_split": split.get("cost"),
+            "error_costo_pct": _error_pct(split.get("cost"), merged.get("cost")),
+            "tiempo_merge_h": merged.get("time"),
+            "tiempo_split_h": split.get("time"),
+            "error_tiempo_pct": _error_pct(split.get("time"), merged.get("time")),
+        })
+    return rows
+
+
+def bench_batch(paths: List[str], quotes: int, concurrency: int, window_ms: int, max_batch: int) -> List[Dict]:
+    """Quotes per minute for `quotes` requests (cycling over paths, each one a
+    distinct file) issued by `concurrency` callers, unbatched vs batched."""
+    work_dir = tempfile.mkdtemp(prefix="bench_", dir=settings.TMP_DIR or None)
+    try:
+        inputs = []
+        for i in range(quotes):
+            src = paths[i % len(paths)]
+            dest = os.path.join(work_dir, f"q{i}_{os.path.basename(src)}")
+            shutil.copyfile(src, dest)
+            inputs.append(dest)
+
+        batcher = SliceBatcher(slicing._run_prusaslicer_batch, window_sec=window_ms / 1000.0,
+                               max_batch=max_batch, concurrency=settings.SLICE_MAX_WORKERS)
+        rows = []
+        for mode, fn in (("unbatched", slicing._run_prusaslicer), ("batched", batcher.slice)):
+            # same bound on concurrent slicer processes in both modes
+            slots = ThreadPoolExecutor(max_workers=settings.SLICE_MAX_WORKERS) if mode == "unbatched" else None
+
+            def _quote(path: str) -> Dict:
+                metrics = slots.submit(fn, path).result() if slots else fn(path)
+                _drop_gcode(metrics)
+                return metrics
+
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=concurrency) as callers:
+                results = list(callers.map(_quote, inputs))
+            elapsed = time.perf_counter() - start
+            if slots:
+                slots.shutdown()
+            rows.append({
+                "modo": mode,
+                "cotizaciones": len(results),
+                "segundos": round(elapsed, 2),
+                "cotizaciones_min": round(60.0 * len(results) / elapsed, 1),
+            })
+        stats = batcher.stats()
+        rows[-1]["lotes"] = stats["batches"]
+        rows[0]["lotes"] = len(inputs)
+        return rows
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def _print_table(rows: List[Dict]) -> None:
+    if not rows:
+        return
+    columns = list(rows[0].keys())
+    widths = {c: max(len(c), *(len(str(r[c])) for r in rows)) for c in columns}
+    print("  ".join(c.ljust(widths[c]) for c in columns))
+    for r in rows:
+        print("  ".join(str(r[c]).ljust(widths[c]) for c in columns))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.tools.bench_slicing", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="modo", required=True)
+    split = sub.add_parser("split", help="merged vs parallel per-object slicing")
+    split.add_argument("modelos", nargs="+", help=".3mf files")
+    split.add_argument("--repeat", type=int, default=1, help="runs per model (best time is reported)")
+    batch = sub.add_parser("batch", help="quotes per minute, one slicer run per quote vs batched runs")
+    batch.add_argument("modelos", nargs="+", help=".3mf files")
+    batch.add_argument("--cotizaciones", type=int, default=20, help="number of quotes to run")
+    batch.add_argument("--concurrencia", type=int, default=8, help="concurrent callers")
+    batch.add_argument("--ventana-ms", type=int, default=settings.SLICE_BATCH_WINDOW_MS)
+    batch.add_argument("--max-lote", type=int, default=settings.SLICE_BATCH_MAX)
+    args = parser.parse_args(argv)
+
+    if args.modo == "split":
+        rows = bench_split(args.modelos, repeat=args.repeat)
+        _print_table(rows)
+        speedups = [r["speedup"] for r in rows if r["speedup"]]
+        errors = [abs(r["error_tiempo_pct"]) for r in rows if r["error_tiempo_pct"] is not None]
+        if speedups:
+            print(f"\nspeedup medio: {sum(speedups) / len(speedups):.2f}x", end="")
+        if errors:
+            print(f"  error medio de tiempo: {sum(errors) / len(errors):.2f}%", end="")
+        print()
+    elif args.modo == "batch":
+        _print_table(bench_batch(args.modelos, args.cotizaciones, args.concurrencia, args.ventana_ms, args.max_lote))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,60 @@
+"""
+Consulta y publica versiones de las reglas de cotización (tabla regla_precio).
+
+    python -m app.tools.reglas_precio mostrar             # versión vigente
+    python -m app.tools.reglas_precio mostrar --version 3
+    python -m app.tools.reglas_precio publicar costo_kwh=650 mano_obra=1200 --descripcion "Tarifa 2027"
+    python -m app.tools.reglas_precio publicar 'tramos_cantidad=[[1, 0], [20, 0.07], [200, 0.15]]'
+
+publicar crea una versión nueva a partir de la vigente con los valores dados;
+los procesos la toman en su próxima revisión (PRICING_RULES_REFRESH_SEC).
+"""
+import sys
+import json
+import argparse
+from typing import List, Optional
+
+from app.db.session import SessionLocal
+from app.crud.regla_precio import create_regla_precio, get_regla_precio
+from app.services.reglas_precio import REGLAS_POR_DEFECTO, compile_reglas
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.tools.reglas_precio", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="accion", required=True)
+    mostrar = sub.add_parser("mostrar", help="print a rules version")
+    mostrar.add_argument("--version", type=int, default=None)
+    publicar = sub.add_parser("publicar", help="publish a new version")
+    publicar.add_argument("valores", nargs="+", help="clave=valor")
+    publicar.add_argument("--descripcion", default=None)
+    args = parser.parse_args(argv)
+
+    db = SessionLocal()
+    try:
+        regla = get_regla_precio(db, getattr(args, "version", None))
+        if args.accion == "mostrar":
+            if regla is None:
+                print("No hay reglas publicadas; se usan las reglas por defecto (versión 0)", file=sys.stderr)
+                return 1
+            print(json.dumps({"version": regla.version, "descripcion": regla.descripcion,
+                              "reglas": regla.reglas}, indent=2, ensure_ascii=False))
+            return 0
+
+        reglas = dict(regla.reglas) if regla else REGLAS_POR_DEFECTO._asdict()
+        reglas.pop("version", None)
+        for item in args.valores:
+            clave, _, valor = item.partition("=")
+            if clave not in REGLAS_POR_DEFECTO._fields or clave == "version":
+                parser.error(f"regla desconocida: {clave}")
+            reglas[clave] = json.loads(valor)
+        compile_reglas(0, reglas)  # valida antes de publicar
+        nueva = create_regla_precio(db, reglas, args.descripcion)
+        print(f"Publicada versión {nueva.version}")
+        return 0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,32 @@
+"""
+Precalcula las métricas del laminador de los modelos del catálogo.
+
+    python -m app.tools.warm_catalog                 # incremental
+    python -m app.tools.warm_catalog --force         # relaminar todo
+    python -m app.tools.warm_catalog --ids 3 7 --concurrencia 4
+"""
+import sys
+import json
+import logging
+import argparse
+from typing import List, Optional
+
+from app.services.catalog_warmup import warm_catalog
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.tools.warm_catalog", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ids", type=int, nargs="+", help="only these modelo_catalogo ids")
+    parser.add_argument("--force", action="store_true", help="re-slice even if the model did not change")
+    parser.add_argument("--concurrencia", type=int, default=None, help="models sliced at the same time")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    resumen = warm_catalog(ids=args.ids, force=args.force, concurrency=args.concurrencia)
+    print(json.dumps(resumen, indent=2, ensure_ascii=False, default=str))
+    return 1 if resumen.get("error") else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
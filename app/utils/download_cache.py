@@ -0,0 +1,152 @@
+import os
+import json
+import hashlib
+import logging
+import tempfile
+import threading
+from typing import Dict, Optional
+
+from app.core.config import settings
+from app.utils.downloader import link_or_copy
+
+logger = logging.getLogger(__name__)
+
+# Local cache of downloaded models keyed by the normalized URL.
+# Each entry is <key>.3mf plus <key>.json with the validators (ETag, Last-Modified)
+# used to revalidate with a conditional GET (or S3 head_object). Entries are
+# hard-linked into the caller's temp file, so callers can delete their copy freely.
+# Total size is bounded by DOWNLOAD_CACHE_MAX_MB with LRU eviction (mtime of the .json).
+
+_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0, "revalidated": 0, "evictions": 0}
+
+
+def _cache_dir() -> str:
+    base = settings.TMP_DIR or tempfile.gettempdir()
+    path = os.path.join(base, "download_cache")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def _paths(url: str):
+    key = hashlib.sha256(url.encode()).hexdigest()
+    directory = _cache_dir()
+    return os.path.join(directory, f"{key}.json"), os.path.join(directory, f"{key}.3mf")
+
+
+def lookup(url: str) -> Optional[Dict]:
+    """Return the cached entry metadata for url (without counting a hit) or None."""
+    if not settings.DOWNLOAD_CACHE_ENABLED:
+        return None
+    meta_path, data_path = _paths(url)
+    try:
+        with open(meta_path, "r") as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not os.path.exists(data_path):
+        return None
+    entry["data_path"] = data_path
+    return entry
+
+
+def conditional_headers(entry: Optional[Dict]) -> Dict[str, str]:
+    """If-None-Match / If-Modified-Since headers for a cached entry."""
+    headers: Dict[str, str] = {}
+    if entry:
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+    return headers
+
+
+def materialize(entry: Dict, dest_path: str) -> bool:
+    """Place the cached file at dest_path and mark the entry as recently used.
+
+    Returns False if the entry is gone (evicted after lookup); the caller then
+    treats it as a miss and fetches the body.
+    """
+    try:
+        link_or_copy(entry["data_path"], dest_path)
+    except OSError as e:
+        logger.info("Download cache entry for %s vanished before use: %s", entry.get("url"), e)
+        return False
+    meta_path, _ = _paths(entry["url"])
+    try:
+        os.utime(meta_path, None)
+    except OSError:
+        pass
+    with _lock:
+        _stats["hits"] += 1
+    return True
+
+
+def store(url: str, src_path: str, sha256: str, size: int, etag: Optional[str] = None,
+          last_modified: Optional[str] = None) -> None:
+    """Add/replace the entry for url with the file at src_path, then evict."""
+    with _lock:
+        _stats["misses"] += 1
+    if not settings.DOWNLOAD_CACHE_ENABLED or not (etag or last_modified):
+        # without validators the entry could never be revalidated
+        return
+    meta_path, data_path = _paths(url)
+    try:
+        link_or_copy(src_path, data_path)
+        fd, tmp = tempfile.mkstemp(suffix=".tmp", dir=os.path.dirname(meta_path))
+        with os.fdopen(fd, "w") as f:
+            json.dump({"url": url, "sha256": sha256, "size": size, "etag": etag, "last_modified": last_modified}, f)
+        os.replace(tmp, meta_path)
+    except Exception as e:
+        logger.warning("Failed to store download cache entry for %s: %s", url, e)
+        return
+    evict()
+
+
+def record_revalidation() -> None:
+    with _lock:
+        _stats["revalidated"] += 1
+
+
+def evict() -> int:
+    """Drop least recently used entries until the cache fits in DOWNLOAD_CACHE_MAX_MB."""
+    max_bytes = int(settings.DOWNLOAD_CACHE_MAX_MB or 0) * 1024 * 1024
+    if not max_bytes:
+        return 0
+    directory = _cache_dir()
+    entries = []
+    total = 0
+    for name in os.listdir(directory):
+        if not name.endswith(".json"):
+            continue
+        meta_path = os.path.join(directory, name)
+        data_path = meta_path[:-len(".json")] + ".3mf"
+        try:
+            mtime = os.stat(meta_path).st_mtime
+            size = os.stat(data_path).st_size
+        except OSError:
+            continue
+        entries.append((mtime, size, meta_path, data_path))
+        total += size
+
+    removed = 0
+    for mtime, size, meta_path, data_path in sorted(entries):
+        if total <= max_bytes:
+            break
+        for path in (meta_path, data_path):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        total -= size
+        removed += 1
+
+    if removed:
+        with _lock:
+            _stats["evictions"] += removed
+    return removed
+
+
+def stats() -> Dict:
+    with _lock:
+        return dict(_stats)
@@ -0,0 +1,220 @@
+import os
+import shutil
+import hashlib
+import logging
+import threading
+from typing import Dict, NamedTuple, Optional
+from urllib.parse import urlparse
+
+from fastapi import HTTPException
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# HTTP downloader used by download_3mf:
+# - one requests.Session (keep-alive connection pool) per scheme+host
+# - large configurable chunks (DOWNLOAD_CHUNK_KB)
+# - early rejection from the Content-Length header
+# - resume with a Range request after a dropped connection (DOWNLOAD_MAX_RESUMES)
+# - sha256 computed while streaming, so the slice cache does not read the file again
+
+
+class DownloadResult(NamedTuple):
+    path: str
+    size: int
+    sha256: str
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+
+_sessions: Dict[str, object] = {}
+_sessions_lock = threading.Lock()
+
+
+def get_session(url: str):
+    """Return the shared requests.Session for the url's scheme+host."""
+    import requests  # type: ignore
+    from requests.adapters import HTTPAdapter  # type: ignore
+
+    parsed = urlparse(url)
+    key = f"{parsed.scheme}://{parsed.netloc}"
+    with _sessions_lock:
+        session = _sessions.get(key)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=settings.DOWNLOAD_POOL_SIZE)
+            session.mount(key, adapter)
+            _sessions[key] = session
+        return session
+
+
+def _too_large() -> HTTPException:
+    return HTTPException(status_code=400, detail="File exceeds maximum allowed size")
+
+
+def _content_range_start(resp) -> Optional[int]:
+    # "bytes 1000-1999/2000"
+    value = resp.headers.get("Content-Range", "")
+    try:
+        return int(value.split()[1].split("-")[0])
+    except (IndexError, ValueError):
+        return None
+
+
+def fetch_to_file(url: str, dest_path: str, max_bytes: int, headers: Optional[Dict[str, str]] = None,
+                  chunk_size: Optional[int] = None, session=None) -> Optional[DownloadResult]:
+    """Stream url into dest_path. Raises HTTPException (400) on failure or size limit.
+
+    With conditional headers (If-None-Match / If-Modified-Since) returns None when
+    the server answers 304, or answers 200 with the same ETag as If-None-Match;
+    the caller's cached copy is then still valid and no body is read.
+
+    If the connection drops mid-body, the download is resumed with
+    'Range: bytes=<written>-' (guarded by If-Range when the server sent an ETag or
+    Last-Modified). A server that ignores the range (200) restarts the file.
+    """
+    import requests  # type: ignore
+
+    session = session or get_session(url)
+    chunk_size = chunk_size or settings.DOWNLOAD_CHUNK_KB * 1024
+    timeout = settings.DOWNLOAD_TIMEOUT_SEC
+    resumes_left = settings.DOWNLOAD_MAX_RESUMES
+
+    hasher = hashlib.sha256()
+    written = 0
+    validator = None
+    etag = last_modified = None
+    transient = (requests.ConnectionError, requests.exceptions.ChunkedEncodingError, requests.Timeout)
+
+    with open(dest_path, "wb") as f:
+        while True:
+            req_headers = dict(headers or {})
+            if written:
+                req_headers["Range"] = f"bytes={written}-"
+                if validator:
+                    req_headers["If-Range"] = validator
+
+            try:
+                resp = session.get(url, stream=True, timeout=timeout, allow_redirects=True, headers=req_headers)
+            except transient as e:
+                if written and resumes_left > 0:
+                    resumes_left -= 1
+                    logger.warning("Retrying download of %s after error: %s", url, e)
+                    continue
+                logger.exception("Failed to GET file URL: %s", e)
+                raise HTTPException(status_code=400, detail=f"Failed to download file: {e}")
+
+            with resp:
+                if not written and resp.status_code == 304 and headers:
+                    return None
+                if written and resp.status_code == 206 and _content_range_start(resp) == written:
+                    pass  # resume accepted, keep appending
+                elif resp.status_code == 200:
+                    if written:
+                        # server ignored the range: start over
+                        logger.info("Server ignored Range for %s, restarting download", url)
+                        f.seek(0)
+                        f.truncate()
+                        hasher = hashlib.sha256()
+                        written = 0
+                    length = resp.headers.get("Content-Length")
+                    if length and length.isdigit() and int(length) > max_bytes:
+                        raise _too_large()
+                    etag = resp.headers.get("ETag")
+                    last_modified = resp.headers.get("Last-Modified")
+                    if not written and etag and headers and headers.get("If-None-Match") == etag:
+                        return None
+                    # weak ETags are not valid for If-Range
+                    validator = etag if etag and not etag.startswith("W/") else last_modified
+                else:
+                    raise HTTPException(status_code=400, detail=f"Failed to download file: status {resp.status_code}")
+
+                try:
+                    for chunk in resp.iter_content(chunk_size=chunk_size):
+                        if not chunk:
+                            continue
+                        written += len(chunk)
+                        if written > max_bytes:
+                            raise _too_large()
+                        f.write(chunk)
+                        hasher.update(chunk)
+                except transient as e:
+                    if resumes_left > 0:
+                        resumes_left -= 1
+                        logger.warning("Download of %s interrupted at %s bytes, resuming: %s", url, written, e)
+                        continue
+                    logger.exception("Download of %s failed: %s", url, e)
+                    raise HTTPException(status_code=400, detail=f"Failed to download file: {e}")
+            break
+
+    return DownloadResult(dest_path, written, hasher.hexdigest(), etag, last_modified)
+
+
+def link_or_copy(src: str, dest: str) -> None:
+    """Make dest a hard link of src (copy when linking is not possible), atomically."""
+    tmp = f"{dest}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        os.link(src, tmp)
+    except OSError:
+        shutil.copyfile(src, tmp)
+    os.replace(tmp, dest)
+
+
+def remove_quietly(path: str) -> None:
+    try:
+        if os.path.exists(path):
+            os.remove(path)
+    except OSError:
+        logger.warning("Failed to remove temp file %s", path)
+
+
+def fetch_s3_to_file(s3, bucket: str, key: str, dest_path: str, size: int, etag: Optional[str] = None,
+                     part_size: Optional[int] = None, concurrency: Optional[int] = None) -> None:
+    """Download an S3 object of known size with concurrent ranged GETs.
+
+    The destination file is preallocated to `size` and each part is written at its
+    offset with os.pwrite, so parts can complete in any order. IfMatch=etag makes
+    every part fail if the object changes mid-download.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    part_size = part_size or settings.S3_PART_SIZE_MB * 1024 * 1024
+    concurrency = concurrency or settings.S3_CONCURRENCY
+    chunk_size = settings.DOWNLOAD_CHUNK_KB * 1024
+    ranges = [(start, min(start + part_size, size) - 1) for start in range(0, size, part_size)]
+
+    fd = os.open(dest_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    try:
+        if size:
+            if hasattr(os, "posix_fallocate"):
+                os.posix_fallocate(fd, 0, size)
+            else:
+                os.ftruncate(fd, size)
+
+        def _fetch_part(byte_range) -> int:
+            start, end = byte_range
+            kwargs = {"Bucket": bucket, "Key": key, "Range": f"bytes={start}-{end}"}
+            if etag:
+                kwargs["IfMatch"] = etag
+            body = s3.get_object(**kwargs)["Body"]
+            offset = start
+            try:
+                for chunk in iter(lambda: body.read(chunk_size), b""):
+                    os.pwrite(fd, chunk, offset)
+                    offset += len(chunk)
+            finally:
+                body.close()
+            if offset != end + 1:
+                raise IOError(f"Incomplete S3 part {start}-{end}: got {offset - start} bytes")
+            return offset - start
+
+        if len(ranges) <= 1:
+            for r in ranges:
+                _fetch_part(r)
+        else:
+            with ThreadPoolExecutor(max_workers=min(concurrency, len(ranges))) as pool:
+                # list() re-raises the first failed part
+                list(pool.map(_fetch_part, ranges))
+    finally:
+        os.close(fd)
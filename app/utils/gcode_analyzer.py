@@ -0,0 +1,350 @@
+import re
+import math
+import mmap
+import logging
+from typing import Dict, Iterator, List, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Streaming G-code analyzer.
+#
+# One pass over the G-code body through mmap, in line-aligned chunks, so memory
+# stays constant whatever the file size. It accumulates:
+#   - filament extruded per tool (T0..Tn), converted to grams and cost with the
+#     filament_diameter / filament_density / filament_cost of the profile
+#     (PrusaSlicer appends its full config at the end of the file)
+#   - layer count (;LAYER_CHANGE)
+#   - print time per feature type (;TYPE:...), from the M73 remaining-time lines
+#
+# E values are decoded with numpy: the 8 bytes following each " E" are read as a
+# little-endian uint64 and parsed with SWAR arithmetic, so no Python object is
+# created per move. Sparse markers (T, M73, ;TYPE, ;LAYER_CHANGE) are located with
+# single-byte finds (memchr) and handled in Python.
+
+CHUNK_SIZE = 16 * 1024 * 1024
+
+CONFIG_BEGIN = b"; prusaslicer_config = begin"
+SUMMARY_BEGIN = b"; filament used [mm]"
+LAYER_CHANGE = b";LAYER_CHANGE"
+TYPE_PREFIX = b";TYPE:"
+
+M73_RE = re.compile(rb"M73 P\d+ R(\d+)")
+G92_E_RE = re.compile(rb"G92 E(-?[\d.]+)")
+CONFIG_LINE_RE = re.compile(rb"^; (filament_diameter|filament_density|filament_cost|filament_colour|use_relative_e_distances) = ([^\r\n]*)$", re.M)
+
+# Defaults for PLA when the config block is missing
+DEFAULT_FILAMENT_DIAMETER = 1.75
+DEFAULT_FILAMENT_DENSITY = 1.24
+
+_U = np.uint64
+
+
+def _rep(byte: int) -> np.uint64:
+    return _U(int.from_bytes(bytes([byte]) * 8, "little"))
+
+
+_H80 = _rep(0x80)
+_L7F = _rep(0x7F)
+_X30 = _rep(0x30)
+_A76 = _rep(0x76)
+_X2E = _rep(0x2E)
+_ONE = _U(1)
+_EIGHT = _U(8)
+_NEG_POW10 = 10.0 ** -np.arange(0, 9)
+
+
+def _first_byte_index(bits: np.ndarray) -> np.ndarray:
+    """Index (0-7) of the lowest byte whose bit 7 is set; undefined where bits == 0."""
+    lowbit = bits & (~bits + _ONE)
+    return (np.frexp(lowbit.astype(np.float64))[1] - 8) // 8
+
+
+def parse_e_words(words: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Decode numbers like '.03412', '-.8', '12.5' from uint64 words (byte 0 = first char).
+
+    Returns (values, ok). ok is False where the number does not fit in the word
+    (more than 7 chars, sign included); those must be parsed by the caller.
+    """
+    neg = (words & _U(0xFF)) == _U(0x2D)
+    x = np.where(neg, words >> _EIGHT, words)
+
+    # per-byte classification, result in bit 7 of each byte
+    low = x ^ _X30
+    dig = ~(((low & _L7F) + _A76) | low) & _H80
+    eq = x ^ _X2E
+    dot = ~(((eq & _L7F) + _L7F) | eq) & _H80
+    invalid = ~(dig | dot) & _H80
+
+    ok = invalid != 0
+    length = np.where(ok, _first_byte_index(invalid), 0).astype(np.uint64)
+    # a negative number loses its 8th byte in the shift: 7 chars after '-' may be truncated
+    ok &= ~(neg & (length >= _U(7)))
+    mask = (_ONE << (length * _EIGHT)) - _ONE
+    dot &= mask
+    has_dot = dot != 0
+    p = np.where(has_dot, _first_byte_index(dot), length.astype(np.int64)).astype(np.uint64)
+    low &= mask
+
+    # drop the dot byte, then left-pad with zero digits to exactly 8 digits
+    below = (_ONE << (p * _EIGHT)) - _ONE
+    low = np.where(has_dot, (low & below) | ((low >> ((p + _ONE) * _EIGHT)) << (p * _EIGHT)), low)
+    n = np.where(has_dot, length - _ONE, length)
+    low = np.where(n > 0, low << ((_EIGHT - n) * _EIGHT), _U(0))
+
+    # classic 8-digit SWAR decimal parse (wrapping uint64 arithmetic)
+    v = low * _U(10) + (low >> _EIGHT)
+    v = ((v & _U(0x000000FF000000FF)) * _U(100 + (1000000 << 32))
+         + ((v >> _U(16)) & _U(0x000000FF000000FF)) * _U(1 + (10000 << 32))) >> _U(32)
+
+    values = v.astype(np.float64) * _NEG_POW10[np.minimum((n - p).astype(np.int64), 8)]
+    values[neg] = -values[neg]
+    return values, ok
+
+
+def _float_list(raw: bytes) -> List[float]:
+    out = []
+    for part in re.split(rb"[,;]", raw):
+        try:
+            out.append(float(part))
+        except ValueError:
+            pass
+    return out
+
+
+def _read_config(mm) -> Tuple[int, Dict]:
+    """Return (end of the G-code body, relevant config values) from the trailing block."""
+    size = len(mm)
+    cfg_start = mm.rfind(CONFIG_BEGIN)
+    config: Dict = {}
+    if cfg_start != -1:
+        for m in CONFIG_LINE_RE.finditer(mm, cfg_start):
+            key, raw = m.group(1).decode(), m.group(2)
+            if key == "filament_colour":
+                config[key] = [c.decode(errors="ignore") for c in raw.split(b";")]
+            elif key == "use_relative_e_distances":
+                config[key] = raw.strip() == b"1"
+            else:
+                config[key] = _float_list(raw)
+    body_end = cfg_start if cfg_start != -1 else size
+    summary = mm.rfind(SUMMARY_BEGIN, 0, body_end)
+    if summary != -1:
+        body_end = summary
+    return body_end, config
+
+
+def _iter_chunks(mm, start: int, end: int, chunk_size: int) -> Iterator[Tuple[int, int]]:
+    """Yield line-aligned (lo, hi) byte ranges covering [start, end)."""
+    lo = start
+    while lo < end:
+        hi = min(end, lo + chunk_size)
+        if hi < end:
+            nl = mm.rfind(b"\n", lo, hi)
+            if nl == -1:
+                # line longer than chunk_size: the chunk runs to its end
+                nl = mm.find(b"\n", hi, end)
+            hi = nl + 1 if nl != -1 else end
+        yield lo, hi
+        lo = hi
+
+
+def _line_starts(mm, byte: bytes, lo: int, hi: int) -> Iterator[int]:
+    """Positions in [lo, hi) where a line starts with byte."""
+    p = mm.find(byte, lo, hi)
+    while p != -1:
+        if p == 0 or mm[p - 1] == 0x0A:
+            yield p
+        p = mm.find(byte, p + 1, hi)
+
+
+def _scan_markers(mm, lo: int, hi: int) -> Dict[str, list]:
+    """Collect the sparse markers of a chunk, each as a list of (pos, value)."""
+    markers: Dict[str, list] = {"tool": [], "type": [], "layer": [], "m73": [], "mode": [], "skip_e": []}
+
+    for p in _line_starts(mm, b"T", lo, hi):
+        end = mm.find(b"\n", p, hi)
+        line = mm[p:end if end != -1 else hi].strip()
+        if line[1:].isdigit():
+            markers["tool"].append((p, int(line[1:])))
+
+    for p in _line_starts(mm, b";", lo, hi):
+        if mm[p:p + len(TYPE_PREFIX)] == TYPE_PREFIX:
+            end = mm.find(b"\n", p, hi)
+            name = mm[p + len(TYPE_PREFIX):end if end != -1 else hi].strip()
+            markers["type"].append((p, name.decode(errors="ignore")))
+        elif mm[p:p + len(LAYER_CHANGE)] == LAYER_CHANGE:
+            markers["layer"].append((p, None))
+
+    for p in _line_starts(mm, b"M", lo, hi):
+        end = mm.find(b"\n", p, hi)
+        line = mm[p:end if end != -1 else hi]
+        m = M73_RE.match(line)
+        if m:
+            markers["m73"].append((p, int(m.group(1))))
+        elif line[:3] in (b"M82", b"M83") and not line[3:4].isdigit():
+            markers["mode"].append((p, line[:3] == b"M83"))
+        # E words of M-codes (M201/M203/M907...) are not extrusion
+        e = line.find(b" E")
+        if e != -1:
+            markers["skip_e"].append((p + e + 2, None))
+
+    return markers
+
+
+def _extrusion_words(buf: np.ndarray, words: np.ndarray, lo: int, hi: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Positions (start of the number) and decoded values of the ' E' words in [lo, hi)."""
+    seg = buf[lo:hi]
+    idx = np.flatnonzero(seg == 0x45)
+    if idx.size and idx[0] == 0:
+        idx = idx[1:]
+    idx = idx[seg[idx - 1] == 0x20] + (lo + 1)
+    idx = idx[idx < words.size]
+    # keep only numbers (" Emboss" in an object name is not an E word)
+    first = buf[idx]
+    idx = idx[((first >= 0x30) & (first <= 0x39)) | (first == 0x2E) | (first == 0x2D)]
+    values, ok = parse_e_words(words[idx])
+    if not ok.all():
+        # numbers longer than 7 chars: rare, parse them one by one
+        for i in np.flatnonzero(~ok):
+            start = int(idx[i])
+            m = re.match(rb"-?[\d.]+", buf[start:start + 32].tobytes())
+            values[i] = float(m.group(0)) if m else 0.0
+    return idx, values
+
+
+def _e_deltas(values: np.ndarray, rel_mask: np.ndarray, is_reset: np.ndarray,
+              position: float) -> Tuple[np.ndarray, float]:
+    """Filament extruded by each E word, and the axis position after the last one.
+
+    Relative words add their value to the position; absolute words and G92 resets
+    set it. The position before each word is the last absolute value (or reset)
+    plus the relative values since then, computed with a cumulative sum.
+    """
+    if not values.size:
+        return values, position
+    if rel_mask.all() and not is_reset.any():
+        return values, position + float(values.sum())
+    anchor = ~rel_mask | is_reset
+    steps = np.cumsum(np.where(anchor, 0.0, values))
+    last = np.maximum.accumulate(np.where(anchor, np.arange(values.size), -1))
+    has_anchor = last >= 0
+    last = np.maximum(last, 0)
+    after = np.where(has_anchor, values[last] + steps - steps[last], position + steps)
+    before = np.concatenate(([position], after[:-1]))
+    deltas = np.where(is_reset, 0.0, np.where(rel_mask, values, values - before))
+    return deltas, float(after[-1])
+
+
+def _finalize(state: Dict, config: Dict) -> Dict:
+    diameters = config.get("filament_diameter") or [DEFAULT_FILAMENT_DIAMETER]
+    densities = config.get("filament_density") or [DEFAULT_FILAMENT_DENSITY]
+    costs = config.get("filament_cost") or [0.0]
+    colours = config.get("filament_colour") or []
+
+    def _at(values: list, i: int):
+        return values[i] if i < len(values) else values[-1]
+
+    per_tool = []
+    for tool, length_mm in enumerate(state["extruded"]):
+        if length_mm <= 0:
+            continue
+        area = math.pi * (_at(diameters, tool) / 2.0) ** 2
+        grams = length_mm * area / 1000.0 * _at(densities, tool)
+        per_tool.append({
+            "tool": tool,
+            "filament_mm": round(float(length_mm), 2),
+            "filament_g": round(grams, 3),
+            "cost": round(grams / 1000.0 * _at(costs, tool), 3),
+            "filament_colour": colours[tool] if tool < len(colours) else None,
+        })
+
+    return {
+        "layers": state["layers"],
+        "per_tool": per_tool,
+        "feature_time": {k: round(v / 60.0, 3) for k, v in state["feature_minutes"].items()},
+    }
+
+
+def analyze_gcode(gcode_path: str, chunk_size: int = CHUNK_SIZE) -> Dict:
+    """Analyze a PrusaSlicer G-code file in one streaming pass.
+
+    Returns {"layers": int, "per_tool": [{tool, filament_mm, filament_g, cost,
+    filament_colour}], "feature_time": {feature: hours}}. Feature times come from
+    M73 remaining-time lines, so they have minute resolution.
+    """
+    with open(gcode_path, "rb") as f:
+        if f.seek(0, 2) == 0:
+            return _finalize({"extruded": [], "layers": 0, "feature_minutes": {}}, {})
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    try:
+        return _analyze_mmap(mm, chunk_size)
+    finally:
+        mm.close()
+
+
+def _analyze_mmap(mm, chunk_size: int) -> Dict:
+    body_end, config = _read_config(mm)
+    relative = config.get("use_relative_e_distances", False)
+
+    buf = np.frombuffer(mm, dtype=np.uint8)
+    # overlapping unaligned uint64 view: words[i] = bytes i..i+7
+    words = np.ndarray((max(len(mm) - 7, 0),), dtype="<u8", buffer=mm, strides=(1,))
+
+    state = {"extruded": [], "layers": 0, "feature_minutes": {}}
+    tool, feature, last_remaining = 0, None, None
+    position = 0.0  # E axis position, carried across chunks
+
+    try:
+        for lo, hi in _iter_chunks(mm, 0, body_end, chunk_size):
+            markers = _scan_markers(mm, lo, hi)
+            idx, values = _extrusion_words(buf, words, lo, hi)
+
+            if markers["skip_e"]:
+                skip = np.array([p for p, _ in markers["skip_e"]], dtype=idx.dtype)
+                idx_keep = ~np.isin(idx, skip)
+                idx, values = idx[idx_keep], values[idx_keep]
+
+            # relative / absolute extrusion mode per E word
+            mode_pos = np.array([p for p, _ in markers["mode"]], dtype=np.int64)
+            modes = np.array([relative] + [m for _, m in markers["mode"]], dtype=bool)
+            rel_mask = modes[np.searchsorted(mode_pos, idx)]
+            if markers["mode"]:
+                relative = markers["mode"][-1][1]
+
+            # G92 E<v> sets the axis position: not an extrusion, but the new baseline
+            resets = np.array([m.start(1) for m in G92_E_RE.finditer(mm, lo, hi)], dtype=idx.dtype)
+            is_reset = np.isin(idx, resets)
+            values, position = _e_deltas(values, rel_mask, is_reset, position)
+
+            # tool per E word
+            tool_pos = np.array([p for p, _ in markers["tool"]], dtype=np.int64)
+            tools = np.array([tool] + [t for _, t in markers["tool"]], dtype=np.int64)
+            per_word_tool = tools[np.searchsorted(tool_pos, idx)]
+            if markers["tool"]:
+                tool = markers["tool"][-1][1]
+            sums = np.bincount(per_word_tool, weights=values)
+            extruded = state["extruded"]
+            if len(sums) > len(extruded):
+                extruded.extend([0.0] * (len(sums) - len(extruded)))
+            for t, total in enumerate(sums):
+                extruded[t] += float(total)
+
+            state["layers"] += len(markers["layer"])
+
+            # feature time: minutes elapsed between M73 lines go to the current feature
+            events = sorted(markers["type"] + markers["m73"], key=lambda e: e[0])
+            for pos, value in events:
+                if isinstance(value, str):
+                    feature = value
+                    continue
+                if last_remaining is not None and value <= last_remaining and feature:
+                    fm = state["feature_minutes"]
+                    fm[feature] = fm.get(feature, 0) + (last_remaining - value)
+                last_remaining = value
+    finally:
+        # release the buffer exports before the mmap is closed
+        del buf, words
+
+    return _finalize(state, config)
@@ -0,0 +1,213 @@
+import os
+import gzip
+import shutil
+import logging
+import tempfile
+import threading
+from typing import BinaryIO, Dict, Iterator, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Persistent store of sliced G-code, compressed (zstd when available, else gzip).
+# Key = slice key (sha256 of mesh fingerprint + profile contents, see
+# app.utils.slicing.slice_key): identical slices share one file. Files live under
+# GCODE_STORE_DIR (default <TMP_DIR>/gcode_store) as <key>.gcode.zst|.gcode.gz;
+# mtime is the last access for LRU eviction down to GCODE_STORE_MAX_MB.
+# Artifacts referenced by an order are pinned (<key>.pin) and never evicted.
+
+COPY_CHUNK_SIZE = 1024 * 1024
+# fast levels: compression runs right after the slice, in the request path
+_EXTENSIONS = {"zstd": ".gcode.zst", "gzip": ".gcode.gz"}
+_GZIP_LEVEL = 1
+_ZSTD_LEVEL = 3
+
+_lock = threading.Lock()
+_stats = {"stores": 0, "dedup": 0, "hits": 0, "misses": 0, "evictions": 0,
+          "bytes_in": 0, "bytes_stored": 0}
+_warned_no_zstd = False
+
+
+def _store_dir() -> str:
+    path = settings.GCODE_STORE_DIR or os.path.join(settings.TMP_DIR or tempfile.gettempdir(), "gcode_store")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def _zstd():
+    try:
+        import zstandard  # type: ignore
+        return zstandard
+    except ImportError:
+        return None
+
+
+def _codec() -> str:
+    global _warned_no_zstd
+    if (settings.GCODE_STORE_CODEC or "").lower() == "zstd":
+        if _zstd() is not None:
+            return "zstd"
+        if not _warned_no_zstd:
+            logger.warning("zstandard not installed, G-code artifacts are stored with gzip")
+            _warned_no_zstd = True
+    return "gzip"
+
+
+def _find(key: str) -> Optional[Tuple[str, str]]:
+    # either codec: GCODE_STORE_CODEC may have changed since the artifact was stored
+    directory = _store_dir()
+    for codec, ext in _EXTENSIONS.items():
+        path = os.path.join(directory, key + ext)
+        if os.path.exists(path):
+            return path, codec
+    return None
+
+
+def exists(key: str) -> bool:
+    return _find(key) is not None
+
+
+def put(key: str, gcode_path: str) -> str:
+    """Store the G-code file under key (streaming compression, atomic write).
+
+    If the key is already stored, the existing artifact is kept and touched.
+    The source file is left in place. Returns the key.
+    """
+    found = _find(key)
+    if found:
+        os.utime(found[0], None)
+        with _lock:
+            _stats["dedup"] += 1
+        return key
+
+    codec = _codec()
+    directory = _store_dir()
+    fd, tmp_path = tempfile.mkstemp(suffix=".tmp", dir=directory)
+    try:
+        with open(gcode_path, "rb") as src, os.fdopen(fd, "wb") as raw:
+            if codec == "zstd":
+                compressor = _zstd().ZstdCompressor(level=_ZSTD_LEVEL)
+                with compressor.stream_writer(raw, closefd=False) as dst:
+                    shutil.copyfileobj(src, dst, COPY_CHUNK_SIZE)
+            else:
+                with gzip.GzipFile(filename="", mode="wb", fileobj=raw, compresslevel=_GZIP_LEVEL, mtime=0) as dst:
+                    shutil.copyfileobj(src, dst, COPY_CHUNK_SIZE)
+        os.replace(tmp_path, os.path.join(directory, key + _EXTENSIONS[codec]))
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+    with _lock:
+        _stats["stores"] += 1
+        _stats["bytes_in"] += os.path.getsize(gcode_path)
+        _stats["bytes_stored"] += os.path.getsize(os.path.join(directory, key + _EXTENSIONS[codec]))
+    evict(keep=key)
+    return key
+
+
+def open_artifact(key: str) -> Optional[Tuple[BinaryIO, str, int]]:
+    """Open a stored artifact: (compressed file object, codec, compressed size),
+    or None. The caller closes the file; eviction cannot break an open read."""
+    found = _find(key) if key else None
+    if found:
+        path, codec = found
+        try:
+            f = open(path, "rb")
+            os.utime(path, None)
+            with _lock:
+                _stats["hits"] += 1
+            return f, codec, os.fstat(f.fileno()).st_size
+        except OSError:
+            pass
+    with _lock:
+        _stats["misses"] += 1
+    return None
+
+
+def iter_compressed(f: BinaryIO, chunk_size: int = COPY_CHUNK_SIZE) -> Iterator[bytes]:
+    """Stream the stored bytes as they are (for clients accepting the encoding)."""
+    try:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            yield chunk
+    finally:
+        f.close()
+
+
+def iter_gcode(f: BinaryIO, codec: str, chunk_size: int = COPY_CHUNK_SIZE) -> Iterator[bytes]:
+    """Stream the decompressed G-code."""
+    try:
+        if codec == "zstd":
+            reader = _zstd().ZstdDecompressor().stream_reader(f)
+        else:
+            reader = gzip.GzipFile(fileobj=f, mode="rb")
+        with reader:
+            for chunk in iter(lambda: reader.read(chunk_size), b""):
+                yield chunk
+    finally:
+        f.close()
+
+
+def pin(key: str) -> bool:
+    """Keep the artifact out of eviction (e.g. referenced by an order).
+    Returns False if the artifact is not stored."""
+    if not key or not exists(key):
+        return False
+    with open(os.path.join(_store_dir(), key + ".pin"), "a"):
+        pass
+    return True
+
+
+def evict(keep: Optional[str] = None) -> int:
+    """Remove least recently used unpinned artifacts (other than `keep`, the one
+    just stored) until the store fits in GCODE_STORE_MAX_MB. Returns the number
+    of removed artifacts."""
+    max_bytes = int(settings.GCODE_STORE_MAX_MB or 0) * 1024 * 1024
+    if not max_bytes:
+        return 0
+    directory = _store_dir()
+
+    entries, pinned, total = [], set(), 0
+    for name in os.listdir(directory):
+        if name.endswith(".pin"):
+            pinned.add(name[:-len(".pin")])
+            continue
+        if not name.endswith(tuple(_EXTENSIONS.values())):
+            continue
+        path = os.path.join(directory, name)
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        total += st.st_size
+        entries.append((st.st_mtime, st.st_size, name.split(".", 1)[0], path))
+
+    removed = 0
+    entries.sort()  # oldest access first
+    for mtime, size, key, path in entries:
+        if total <= max_bytes:
+            break
+        if key in pinned or key == keep:
+            continue
+        try:
+            os.remove(path)
+            removed += 1
+            total -= size
+        except OSError:
+            pass
+
+    if removed:
+        with _lock:
+            _stats["evictions"] += removed
+    return removed
+
+
+def stats() -> Dict:
+    """Snapshot of counters; ratio = stored / original bytes."""
+    with _lock:
+        snapshot = dict(_stats)
+    snapshot["ratio"] = round(snapshot["bytes_stored"] / snapshot["bytes_in"], 3) if snapshot["bytes_in"] else None
+    return snapshot
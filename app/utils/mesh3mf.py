@@ -0,0 +1,551 @@
+import os
+import re
+import hashlib
+import logging
+import threading
+import zipfile
+import xml.etree.ElementTree as ET
+from collections import OrderedDict
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Geometry of a 3MF without slicing:
+# 3D/3dmodel.model is stream-parsed in chunks (vertices/triangles go straight into
+# NumPy arrays), components and build items are resolved with their transforms,
+# and volume / area / bounding box are computed with vectorized NumPy over the
+# whole triangle soup.
+
+MODEL_PATH = "3D/3dmodel.model"
+PARSE_CHUNK_SIZE = 4 * 1024 * 1024
+
+
+class Mesh(NamedTuple):
+    vertices: np.ndarray   # (N, 3) float64, build coordinates (mm)
+    triangles: np.ndarray  # (M, 3) int64, indices into vertices
+    objects: np.ndarray    # (M,) int32, build item index of each triangle
+    # (M,) bytes: other triangle attributes (paint / MMU segmentation, property
+    # indices) as sorted key=value pairs, None when the model has none
+    extras: Optional[np.ndarray] = None
+
+
+class _Object:
+    __slots__ = ("vertices", "triangles", "extras", "components")
+
+    def __init__(self):
+        self.vertices: Optional[np.ndarray] = None
+        self.triangles: Optional[np.ndarray] = None
+        self.extras: Optional[np.ndarray] = None
+        # (path or None, objectid, 4x3 transform)
+        self.components: List[Tuple[Optional[str], str, Optional[np.ndarray]]] = []
+
+
+# Structural tags are few; vertex/triangle tags are decoded in bulk per chunk.
+# Comments and CDATA sections are matched too (and skipped) so tags inside them
+# are not taken as structure.
+_STRUCT_RE = re.compile(rb'<!--.*?-->|<!\[CDATA\[.*?\]\]>'
+                        rb'|<(/?)(?:[\w.-]+:)?(object|mesh|vertices|triangles|component|item)\b([^>]*)>', re.S)
+_ATTR_RE = re.compile(rb'(?:[\w.-]+:)?([\w.-]+)\s*=\s*(?:"([^"]*)"|\'([^\']*)\')')
+_COORD_RES = [re.compile(rb'\b%s\s*=\s*["\']([^"\']*)["\']' % name) for name in (b"x", b"y", b"z")]
+_INDEX_RES = [re.compile(rb'\b%s\s*=\s*["\']([^"\']*)["\']' % name) for name in (b"v1", b"v2", b"v3")]
+_VERTEX_TAG_RE = re.compile(rb'<(?:[\w.-]+:)?vertex\b')
+_TRIANGLE_TAG_RE = re.compile(rb'<(?:[\w.-]+:)?triangle\b([^>]*)>')
+_PREFIX_RE = re.compile(rb'[<\s/]([A-Za-z_][\w.-]*):[\w.-]')
+# markup the bulk decoders do not understand; segments with it go to ElementTree
+_SPECIAL_MARKUP = (b"<!--", b"<![CDATA[")
+
+
+def _attrs(raw: bytes) -> Dict[str, str]:
+    """Attributes of a tag by local name (p:path -> path)."""
+    return {m.group(1).decode(): (m.group(2) if m.group(2) is not None else m.group(3)).decode()
+            for m in _ATTR_RE.finditer(raw)}
+
+
+_NUMERIC_BYTES = b"0123456789.-+eE \t\r\n"
+
+
+def _canonical_columns(segment: bytes, tag: bytes, names, dtype) -> Optional[np.ndarray]:
+    """Fast path for the layout every common writer emits, e.g.
+    <vertex x="1" y="2" z="3"/>: strip the fixed markup with bytes.replace and
+    parse the remaining numbers in one call. None when the segment has any other
+    layout (extra attributes, other order, single quotes).
+    """
+    count = segment.count(b"<" + tag)
+    text = segment.replace(b'<%s %s="' % (tag, names[0]), b" ")
+    for name in names[1:]:
+        text = text.replace(b'" %s="' % name, b" ")
+    text = text.replace(b'"/>', b" ")
+    if text.translate(None, _NUMERIC_BYTES):
+        return None
+    values = np.fromstring(text, dtype=dtype, sep=" ")
+    if values.size != 3 * count:
+        return None
+    return values.reshape(-1, 3)
+
+
+def _columns(regexes, tag_re, segment: bytes, dtype) -> Optional[np.ndarray]:
+    """Attribute regexes over the segment; None when there are no tags or the
+    matches do not line up one per tag (the caller falls back to ElementTree)."""
+    cols = [r.findall(segment) for r in regexes]
+    n = len(tag_re.findall(segment))
+    if not n or any(len(c) != n for c in cols):
+        return None
+    return np.stack([np.array(c).astype(dtype) for c in cols], axis=1)
+
+
+def _etree_columns(segment: bytes, tag: str, names, dtype) -> Tuple[Optional[np.ndarray], Optional[np.ndarray]]:
+    """Slow path: parse the segment as XML. Returns (rows, extras) like the bulk
+    decoders; extras is None when no element has attributes besides `names`."""
+    # the namespace declarations live on <model>; any URI works for local names
+    prefixes = {p.decode() for p in _PREFIX_RE.findall(segment)} - {"xml", "xmlns"}
+    decl = "".join(f' xmlns:{p}="urn:{p}"' for p in sorted(prefixes))
+    try:
+        root = ET.fromstring(f"<r{decl}>".encode() + segment + b"</r>")
+    except ET.ParseError as e:
+        raise ValueError(f"Malformed 3MF mesh: {e}") from None
+    rows, extras = [], []
+    for el in root.iter():
+        if not isinstance(el.tag, str) or el.tag.rsplit("}", 1)[-1] != tag:
+            continue
+        a = {k.rsplit("}", 1)[-1]: v for k, v in el.attrib.items()}
+        if any(n not in a for n in names):
+            raise ValueError("Malformed 3MF mesh: inconsistent vertex/triangle attributes")
+        rows.append([a[n] for n in names])
+        extras.append(b" ".join(f"{k}={v}".encode() for k, v in sorted(a.items()) if k not in names))
+    if not rows:
+        return None, None
+    return np.array(rows).astype(dtype), (np.array(extras, dtype=object) if any(extras) else None)
+
+
+def _triangle_extras(segment: bytes) -> np.ndarray:
+    """Non-index attributes of each triangle, normalized (sorted key=value)."""
+    out = []
+    for raw in _TRIANGLE_TAG_RE.findall(segment):
+        a = _attrs(raw)
+        out.append(b" ".join(f"{k}={v}".encode() for k, v in sorted(a.items()) if k not in ("v1", "v2", "v3")))
+    return np.array(out, dtype=object)
+
+
+def _parse_transform(value: Optional[str]) -> Optional[np.ndarray]:
+    # 3MF transforms are 12 numbers, a 4x3 matrix applied to row vectors
+    if not value:
+        return None
+    m = np.array(value.split(), dtype=np.float64)
+    if m.size != 12:
+        raise ValueError(f"Invalid 3MF transform: {value!r}")
+    return m.reshape(4, 3)
+
+
+def _apply(transform: Optional[np.ndarray], vertices: np.ndarray) -> np.ndarray:
+    if transform is None:
+        return vertices
+    return vertices @ transform[:3] + transform[3]
+
+
+def _compose(outer: Optional[np.ndarray], inner: Optional[np.ndarray]) -> Optional[np.ndarray]:
+    # applying inner then outer
+    if inner is None:
+        return outer
+    if outer is None:
+        return inner
+    return np.vstack([inner[:3] @ outer[:3], inner[3] @ outer[:3] + outer[3]])
+
+
+def _parse_model(stream) -> Tuple[Dict[str, _Object], List[Tuple[str, Optional[np.ndarray]]]]:
+    """Parse one model part. Returns (objects by id, build items).
+
+    The XML is read in chunks cut at the last '>' so no tag is split; only the
+    structural tags are walked one by one, and the payload between them
+    (<vertex>/<triangle> runs) is decoded in bulk (iterparse building one
+    Element per vertex was ~8x slower on large meshes).
+    """
+    objects: Dict[str, _Object] = {}
+    build: List[Tuple[str, Optional[np.ndarray]]] = []
+    current: Optional[_Object] = None
+    state = None  # b"vertices" | b"triangles" while inside those elements
+    verts: List[np.ndarray] = []
+    tris: List[np.ndarray] = []
+    extras: List[Optional[np.ndarray]] = []  # parallel to tris
+
+    def _payload(segment: bytes) -> None:
+        if state == b"vertices":
+            block = None
+            if not any(t in segment for t in _SPECIAL_MARKUP):
+                block = _canonical_columns(segment, b"vertex", (b"x", b"y", b"z"), np.float64)
+                if block is None:
+                    block = _columns(_COORD_RES, _VERTEX_TAG_RE, segment, np.float64)
+            if block is None and _VERTEX_TAG_RE.search(segment):
+                block = _etree_columns(segment, "vertex", ("x", "y", "z"), np.float64)[0]
+            if block is not None and len(block):
+                verts.append(block)
+        elif state == b"triangles":
+            block, extra = None, None
+            if not any(t in segment for t in _SPECIAL_MARKUP):
+                block = _canonical_columns(segment, b"triangle", (b"v1", b"v2", b"v3"), np.int64)
+                if block is None:
+                    block = _columns(_INDEX_RES, _TRIANGLE_TAG_RE, segment, np.int64)
+                    # anything besides v1/v2/v3 (e.g. slic3rpe:mmu_segmentation)
+                    if block is not None and segment.count(b"=") > 3 * len(block):
+                        extra = _triangle_extras(segment)
+            if block is None and _TRIANGLE_TAG_RE.search(segment):
+                block, extra = _etree_columns(segment, "triangle", ("v1", "v2", "v3"), np.int64)
+            if block is not None and len(block):
+                tris.append(block)
+                extras.append(extra)
+
+    leftover = b""
+    while True:
+        chunk = stream.read(PARSE_CHUNK_SIZE)
+        buf = leftover + chunk
+        cut = buf.rfind(b">") + 1 if chunk else len(buf)
+        if chunk:
+            # never cut inside a comment or CDATA section ('>' may appear in them)
+            for start_mark, end_mark in ((b"<!--", b"-->"), (b"<![CDATA[", b"]]>")):
+                start = buf.rfind(start_mark, 0, cut)
+                if start != -1 and buf.find(end_mark, start + len(start_mark), cut) == -1:
+                    cut = min(cut, start)
+        buf, leftover = buf[:cut], buf[cut:]
+
+        pos = 0
+        for m in _STRUCT_RE.finditer(buf):
+            if m.group(2) is None:
+                continue  # comment / CDATA: stays in the payload segment
+            if state:
+                _payload(buf[pos:m.start()])
+            pos = m.end()
+            closing, name, raw = m.group(1), m.group(2), m.group(3)
+            opening = not closing
+            self_closing = raw.endswith(b"/")
+
+            if name in (b"vertices", b"triangles"):
+                state = name if opening and not self_closing else None
+            elif name == b"object":
+                if opening:
+                    current = objects[_attrs(raw).get("id")] = _Object()
+                if closing or self_closing:
+                    current = None
+            elif name == b"mesh" and current is not None and (closing or self_closing):
+                current.vertices = np.concatenate(verts) if verts else np.zeros((0, 3))
+                current.triangles = np.concatenate(tris) if tris else np.zeros((0, 3), dtype=np.int64)
+                if any(e is not None for e in extras):
+                    current.extras = np.concatenate([
+                        e if e is not None else np.full(len(t), b"", dtype=object) for t, e in zip(tris, extras)])
+                verts, tris, extras = [], [], []
+            elif name == b"component" and opening and current is not None:
+                a = _attrs(raw)
+                current.components.append((a.get("path"), a.get("objectid"), _parse_transform(a.get("transform"))))
+            elif name == b"item" and opening:
+                a = _attrs(raw)
+                build.append((a.get("objectid"), _parse_transform(a.get("transform"))))
+        if state:
+            _payload(buf[pos:])
+        if not chunk:
+            break
+    return objects, build
+
+
+def parse_3mf(path: str) -> Mesh:
+    """Load all build items of a 3MF as one triangle mesh in build coordinates."""
+    with zipfile.ZipFile(path, "r") as z:
+        parts: Dict[str, Dict[str, _Object]] = {}
+
+        def _objects(part: str) -> Dict[str, _Object]:
+            if part not in parts:
+                with z.open(part.lstrip("/")) as f:
+                    parts[part] = _parse_model(f)[0]
+            return parts[part]
+
+        with z.open(MODEL_PATH) as f:
+            objects, build = _parse_model(f)
+        parts["/" + MODEL_PATH] = objects
+
+        all_verts: List[np.ndarray] = []
+        all_tris: List[np.ndarray] = []
+        all_ids: List[np.ndarray] = []
+        all_extras: List[Optional[np.ndarray]] = []
+        offset = 0
+
+        def _emit(part: str, object_id: str, transform: Optional[np.ndarray], item: int, depth: int) -> None:
+            nonlocal offset
+            if depth > 16:
+                raise ValueError("3MF component nesting too deep")
+            obj = _objects(part).get(object_id)
+            if obj is None:
+                raise ValueError(f"3MF build references missing object {object_id}")
+            if obj.vertices is not None and len(obj.triangles):
+                all_verts.append(_apply(transform, obj.vertices))
+                all_tris.append(obj.triangles + offset)
+                all_ids.append(np.full(len(obj.triangles), item, dtype=np.int32))
+                all_extras.append(obj.extras)
+                offset += len(obj.vertices)
+            for comp_path, comp_id, comp_transform in obj.components:
+                _emit(comp_path or part, comp_id, _compose(transform, comp_transform), item, depth + 1)
+
+        for i, (object_id, transform) in enumerate(build):
+            _emit("/" + MODEL_PATH, object_id, transform, i, 0)
+
+    if not all_tris:
+        return Mesh(np.zeros((0, 3)), np.zeros((0, 3), dtype=np.int64), np.zeros(0, dtype=np.int32))
+    extras = None
+    if any(e is not None for e in all_extras):
+        extras = np.concatenate([
+            e if e is not None else np.full(len(t), b"", dtype=object) for t, e in zip(all_tris, all_extras)])
+    return Mesh(np.concatenate(all_verts), np.concatenate(all_tris), np.concatenate(all_ids), extras)
+
+
+def _file_identity(path: str) -> tuple:
+    st = os.stat(path)
+    return (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns)
+
+
+# file identity -> Mesh, so the same downloaded file is parsed once
+_mesh_memo: "OrderedDict[tuple, Mesh]" = OrderedDict()
+_MESH_MEMO_MAX = 4
+_lock = threading.Lock()
+
+
+def load_mesh(path: str) -> Mesh:
+    """parse_3mf memoized by file identity (inode), so hard-linked copies of a
+    download (single-flight, download cache) are parsed once."""
+    sig = _file_identity(path)
+    with _lock:
+        mesh = _mesh_memo.get(sig)
+        if mesh is not None:
+            _mesh_memo.move_to_end(sig)
+            return mesh
+    mesh = parse_3mf(path)
+    with _lock:
+        _mesh_memo[sig] = mesh
+        while len(_mesh_memo) > _MESH_MEMO_MAX:
+            _mesh_memo.popitem(last=False)
+    return mesh
+
+
+def mesh_stats(mesh: Mesh) -> Dict:
+    """Volume (mm3), surface area (mm2) and bounding box of a closed mesh."""
+    if not len(mesh.triangles):
+        return {"volume_mm3": 0.0, "area_mm2": 0.0, "bbox_min": [0.0] * 3, "bbox_max": [0.0] * 3,
+                "size_mm": [0.0] * 3, "triangles": 0, "vertices": 0}
+    v0 = mesh.vertices[mesh.triangles[:, 0]]
+    v1 = mesh.vertices[mesh.triangles[:, 1]]
+    v2 = mesh.vertices[mesh.triangles[:, 2]]
+    cross = np.cross(v1 - v0, v2 - v0)
+    area = 0.5 * np.linalg.norm(cross, axis=1).sum()
+    # divergence theorem: sum of signed tetrahedra against the origin
+    volume = abs(np.einsum("ij,ij->", v0, np.cross(v1, v2))) / 6.0
+
+    used = np.zeros(len(mesh.vertices), dtype=bool)
+    used[mesh.triangles.ravel()] = True
+    bbox_min = mesh.vertices[used].min(axis=0)
+    bbox_max = mesh.vertices[used].max(axis=0)
+    return {
+        "volume_mm3": float(volume),
+        "area_mm2": float(area),
+        "bbox_min": bbox_min.round(3).tolist(),
+        "bbox_max": bbox_max.round(3).tolist(),
+        "size_mm": (bbox_max - bbox_min).round(3).tolist(),
+        "triangles": int(len(mesh.triangles)),
+        "vertices": int(used.sum()),
+    }
+
+
+def _unique_rows(rows: np.ndarray) -> np.ndarray:
+    """Inverse index of np.unique(rows, axis=0), via one lexsort."""
+    order = np.lexsort(rows.T[::-1])
+    sorted_rows = rows[order]
+    new = np.ones(len(rows), dtype=bool)
+    new[1:] = (sorted_rows[1:] != sorted_rows[:-1]).any(axis=1)
+    inverse = np.empty(len(rows), dtype=np.int64)
+    inverse[order] = np.cumsum(new) - 1
+    return inverse
+
+
+def check_printability(mesh: Mesh, bed_mm: Tuple[float, float, float],
+                       max_bad_edge_fraction: float = 0.0, max_degenerate_fraction: float = 0.0) -> List[Dict]:
+    """Cheap checks that make a slice pointless. Returns a list of problems
+    ({"tipo", "mensaje", ...}); empty when the mesh looks printable.
+
+    - empty plate (no triangles)
+    - degenerate triangles (repeated vertex or zero area)
+    - edges not shared by exactly two triangles (open or non-manifold), after
+      welding coincident vertices of each build item
+    - build item larger than the bed (XY may be rotated 90 degrees)
+    """
+    if not len(mesh.triangles):
+        return [{"tipo": "vacio", "mensaje": "The model has no printable geometry"}]
+
+    problems: List[Dict] = []
+    total = len(mesh.triangles)
+
+    v0 = mesh.vertices[mesh.triangles[:, 0]]
+    v1 = mesh.vertices[mesh.triangles[:, 1]]
+    v2 = mesh.vertices[mesh.triangles[:, 2]]
+    area2 = np.linalg.norm(np.cross(v1 - v0, v2 - v0), axis=1)
+    degenerate = int(np.count_nonzero(area2 <= 1e-12))
+    if degenerate > max_degenerate_fraction * total:
+        problems.append({"tipo": "triangulos_degenerados", "cantidad": degenerate,
+                         "mensaje": f"{degenerate} of {total} triangles have zero area"})
+
+    # weld per build item so touching parts do not share edges
+    vertex_item = np.full(len(mesh.vertices), -1.0)
+    vertex_item[mesh.triangles] = mesh.objects[:, None]
+    welded = _unique_rows(np.column_stack([vertex_item, mesh.vertices]))
+    tris = welded[mesh.triangles]
+    edges = np.sort(np.concatenate([tris[:, [0, 1]], tris[:, [1, 2]], tris[:, [2, 0]]]), axis=1)
+    edges = edges[edges[:, 0] != edges[:, 1]]
+    _, counts = np.unique(edges[:, 0] * (int(welded.max()) + 1) + edges[:, 1], return_counts=True)
+    open_edges = int(np.count_nonzero(counts == 1))
+    nonmanifold_edges = int(np.count_nonzero(counts > 2))
+    if open_edges + nonmanifold_edges > max_bad_edge_fraction * len(counts):
+        problems.append({"tipo": "no_manifold", "bordes_abiertos": open_edges,
+                         "bordes_no_manifold": nonmanifold_edges, "bordes": int(len(counts)),
+                         "mensaje": "The mesh is not closed/manifold"})
+
+    bed_xy = sorted(bed_mm[:2])
+    for item in np.unique(mesh.objects):
+        used = mesh.triangles[mesh.objects == item].ravel()
+        size = mesh.vertices[used].max(axis=0) - mesh.vertices[used].min(axis=0)
+        xy = sorted(size[:2])
+        if xy[0] > bed_xy[0] or xy[1] > bed_xy[1] or size[2] > bed_mm[2]:
+            problems.append({"tipo": "excede_cama", "objeto": int(item), "tamano_mm": size.round(2).tolist(),
+                             "cama_mm": list(bed_mm), "mensaje": "Object does not fit on the build plate"})
+    return problems
+
+
+# Embedded slicer settings: names, source files and comments do not change the print
+_CONFIG_IGNORE_RE = re.compile(rb'generated by|key="(?:name|source_\w*)"|^\s*<\?xml')
+FINGERPRINT_VERSION = b"mesh-fp-1"
+
+
+def _config_digest(path: str) -> bytes:
+    """Digest of the slicer settings embedded in the 3MF (Metadata/*.config),
+    order-insensitive and without names, comments or timestamps."""
+    h = hashlib.sha256()
+    with zipfile.ZipFile(path, "r") as z:
+        for name in sorted(n for n in z.namelist() if n.startswith("Metadata/") and n.endswith(".config")):
+            lines = sorted(set(
+                line.strip() for line in z.read(name).splitlines()
+                if line.strip() and not _CONFIG_IGNORE_RE.search(line)))
+            h.update(name.encode() + b"\0" + b"\n".join(lines) + b"\0")
+    return h.digest()
+
+
+def mesh_fingerprint(mesh: Mesh, resolution: float) -> bytes:
+    """Digest of the mesh invariant to object/vertex/triangle order, start vertex of
+    each triangle, global translation and float noise below `resolution` (mm)."""
+    h = hashlib.sha256(FINGERPRINT_VERSION)
+    h.update(repr(resolution).encode())
+    if not len(mesh.triangles):
+        return h.digest()
+
+    q = np.rint((mesh.vertices - mesh.vertices.min(axis=0)) / resolution).astype(np.int64)
+    # coincident vertices (after quantization) collapse to one, numbered in sorted
+    # order; packing x|y|z into one int64 makes that a 1-D sort
+    if q.max() < 1 << 21:
+        packed = (q[:, 0] << 42) | (q[:, 1] << 21) | q[:, 2]
+        uniq, inverse = np.unique(packed, return_inverse=True)
+    else:
+        uniq, inverse = np.unique(q, axis=0, return_inverse=True)
+    tris = inverse.reshape(-1)[mesh.triangles]
+    # rotate each triangle to start at its lowest index (keeps the winding)
+    start = tris.argmin(axis=1)
+    tris = np.take_along_axis(tris, (start[:, None] + np.arange(3)) % 3, axis=1)
+
+    keys = [tris[:, 2], tris[:, 1], tris[:, 0]]
+    if mesh.extras is not None:
+        _, extra_rank = np.unique(mesh.extras, return_inverse=True)
+        keys.insert(0, extra_rank.reshape(-1))
+    order = np.lexsort(keys)
+
+    h.update(np.ascontiguousarray(uniq).tobytes())
+    h.update(np.ascontiguousarray(tris[order]).tobytes())
+    if mesh.extras is not None:
+        h.update(b"\0".join(mesh.extras[order]))
+    return h.digest()
+
+
+_fingerprint_memo: "OrderedDict[tuple, str]" = OrderedDict()
+
+
+def fingerprint(path: str, resolution: Optional[float] = None) -> str:
+    """Canonical fingerprint of a 3MF: geometry (quantized to the printer
+    resolution) + per-triangle paint/properties + embedded slicer settings.
+    Re-exports of the same model (zip timestamps, metadata, object order)
+    get the same value, unlike the file sha256.
+    """
+    resolution = resolution or settings.MESH_FINGERPRINT_RESOLUTION_MM
+    sig = _file_identity(path) + (resolution,)
+    with _lock:
+        cached = _fingerprint_memo.get(sig)
+    if cached:
+        return cached
+    h = hashlib.sha256(mesh_fingerprint(load_mesh(path), resolution))
+    h.update(_config_digest(path))
+    digest = h.hexdigest()
+    with _lock:
+        _fingerprint_memo[sig] = digest
+        while len(_fingerprint_memo) > 256:
+            _fingerprint_memo.popitem(last=False)
+    return digest
+
+
+_profile_memo: Dict[tuple, Dict[str, str]] = {}
+
+
+def _profile_value(key: str) -> Optional[float]:
+    """First value of a key in the slicer profile .ini (e.g. filament_density)."""
+    path = settings.SLICER_PROFILE_PATH
+    try:
+        st = os.stat(path)
+    except (OSError, TypeError):
+        return None
+    sig = (path, st.st_size, st.st_mtime_ns)
+    values = _profile_memo.get(sig)
+    if values is None:
+        values = {}
+        with open(path, "r", encoding="utf-8", errors="ignore") as f:
+            for line in f:
+                k, sep, v = line.partition("=")
+                if sep:
+                    values[k.strip()] = v.strip()
+        _profile_memo.clear()
+        _profile_memo[sig] = values
+    try:
+        return float(values[key].split(";")[0].split(",")[0])
+    except (KeyError, ValueError):
+        return None
+
+
+def estimate_metrics(stats: Dict) -> Dict:
+    """Estimated material cost and print time from mesh_stats, in the same shape
+    as the slicer metrics (cost, time in hours, tool_changes) plus source="geometry".
+
+    Material = perimeter shell (area * wall) + infill fraction of the rest.
+    Density and cost/kg come from the slicer profile when it defines them.
+    """
+    volume = stats["volume_mm3"]
+    shell = min(volume, stats["area_mm2"] * settings.GEOMETRY_WALL_MM)
+    material_mm3 = shell + (volume - shell) * settings.GEOMETRY_INFILL
+
+    density = _profile_value("filament_density") or settings.GEOMETRY_DENSITY_G_CM3
+    cost_per_kg = _profile_value("filament_cost") or settings.GEOMETRY_COST_PER_KG
+    grams = material_mm3 / 1000.0 * density
+    hours = grams / settings.GEOMETRY_THROUGHPUT_G_H
+
+    return {
+        "cost": round(grams / 1000.0 * cost_per_kg, 3),
+        "time": round(hours, 3),
+        "tool_changes": 0,
+        "filament_g": round(grams, 2),
+        "geometry": stats,
+        "source": "geometry",
+    }
+
+
+def estimate_metrics_from_3mf(path: str) -> Dict:
+    """Instant estimate for a 3MF: parse mesh, measure it, estimate cost/time."""
+    return estimate_metrics(mesh_stats(load_mesh(path)))
@@ -0,0 +1,74 @@
+import threading
+from concurrent.futures import Future
+from typing import Callable, Dict, Hashable, Optional
+
+# In-flight deduplication: concurrent calls with the same key share one execution.
+# The first caller (leader) runs fn; the others wait on the same Future and get
+# the same result, or the same exception.
+
+
+class _Call:
+    __slots__ = ("future", "waiters")
+
+    def __init__(self):
+        self.future: Future = Future()
+        self.waiters = 0
+
+
+class SingleFlight:
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+        self._stats = {"executed": 0, "coalesced": 0, "failed": 0, "timeouts": 0}
+
+    def do(self, key: Hashable, fn: Callable, timeout: Optional[float] = None,
+           share: Optional[Callable] = None, release: Optional[Callable] = None):
+        """Run fn() once for all concurrent callers of key and return its result.
+
+        - timeout: max seconds a follower waits (TimeoutError); the leader is not bounded.
+        - share(result, is_leader): maps the shared result to what each caller gets.
+        - release(result): called once by the last caller to leave, after a success.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self._stats["executed"] += 1
+            else:
+                self._stats["coalesced"] += 1
+            call.waiters += 1
+
+        if leader:
+            try:
+                call.future.set_result(fn())
+            except BaseException as e:
+                call.future.set_exception(e)
+            finally:
+                with self._lock:
+                    self._calls.pop(key, None)
+
+        try:
+            try:
+                result = call.future.result(timeout=None if leader else timeout)
+            except TimeoutError:
+                with self._lock:
+                    self._stats["timeouts"] += 1
+                raise
+            except BaseException:
+                if leader:
+                    with self._lock:
+                        self._stats["failed"] += 1
+                raise
+            return share(result, leader) if share else result
+        finally:
+            with self._lock:
+                call.waiters -= 1
+                last = call.waiters == 0 and call.future.done()
+            if last and release and not call.future.cancelled() and call.future.exception() is None:
+                release(call.future.result())
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return dict(self._stats, in_flight=len(self._calls))
@@ -0,0 +1,86 @@
+import time
+import queue
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+# Micro-batching of slicer runs: requests arriving within `window_sec` of the first
+# one are handed together to run_batch(paths), so N quotes pay PrusaSlicer's
+# startup and profile load once. A new batch is only collected when one of the
+# `concurrency` runners is free, so batches grow by themselves under load, and a
+# collected batch is split across all idle runners.
+
+BatchResult = Union[Dict, BaseException]
+
+
+class SliceBatcher:
+    def __init__(self, run_batch: Callable[[List[str]], List[BatchResult]], window_sec: float,
+                 max_batch: int, concurrency: int = 1, name: str = "slice-batch"):
+        self._run_batch = run_batch
+        self.window_sec = window_sec
+        self.max_batch = max(1, max_batch)
+        self._queue: "queue.Queue[tuple]" = queue.Queue()
+        self._slots = threading.Semaphore(max(1, concurrency))
+        self._executor = ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix=name)
+        self._name = name
+        self._thread = None
+        self._lock = threading.Lock()
+        self._stats = {"batches": 0, "items": 0, "max_batch_seen": 0}
+
+    def submit(self, path: str) -> Future:
+        """Queue one model; the Future resolves to its metrics dict."""
+        future: Future = Future()
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._collect, name=f"{self._name}-collector", daemon=True)
+                self._thread.start()
+        self._queue.put((path, future))
+        return future
+
+    def slice(self, path: str, timeout: Optional[float] = None) -> Dict:
+        return self.submit(path).result(timeout=timeout)
+
+    def _collect(self) -> None:
+        while True:
+            self._slots.acquire()
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.window_sec
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                try:
+                    batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            # spread the batch over every idle runner: batching must not cost parallelism
+            runners = 1
+            while runners < len(batch) and self._slots.acquire(blocking=False):
+                runners += 1
+            for i in range(runners):
+                self._executor.submit(self._execute, batch[i::runners])
+
+    def _execute(self, batch: List[tuple]) -> None:
+        try:
+            with self._lock:
+                self._stats["batches"] += 1
+                self._stats["items"] += len(batch)
+                self._stats["max_batch_seen"] = max(self._stats["max_batch_seen"], len(batch))
+            try:
+                results = self._run_batch([path for path, _ in batch])
+                if len(results) != len(batch):
+                    raise RuntimeError(f"run_batch returned {len(results)} results for {len(batch)} models")
+            except BaseException as e:
+                results = [e] * len(batch)
+            for (_, future), result in zip(batch, results):
+                if isinstance(result, BaseException):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+        finally:
+            self._slots.release()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return dict(self._stats, queued=self._queue.qsize())
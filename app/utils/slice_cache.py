@@ -0,0 +1,168 @@
+import os
+import json
+import time
+import hashlib
+import logging
+import tempfile
+import threading
+from typing import Dict, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Persistent on-disk cache of slicer metrics.
+# Key = sha256(3mf bytes) + sha256(profile contents), one JSON file per entry under
+# <TMP_DIR>/slice_cache. Entry mtime is used as "last access" for LRU eviction.
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+# (path, size, mtime_ns) -> sha256 hex, avoids rehashing the same file/profile
+_digest_memo: Dict[tuple, str] = {}
+_DIGEST_MEMO_MAX = 256
+
+
+def _cache_dir() -> str:
+    base = settings.TMP_DIR or tempfile.gettempdir()
+    path = os.path.join(base, "slice_cache")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def _file_signature(path: str) -> tuple:
+    st = os.stat(path)
+    return (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+
+
+def file_digest(path: str) -> str:
+    """Return the sha256 hex digest of a file, reading it in 1 MB chunks.
+    Results are memoized by (path, size, mtime) so repeated lookups are free.
+    """
+    sig = _file_signature(path)
+    with _lock:
+        cached = _digest_memo.get(sig)
+    if cached:
+        return cached
+
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            h.update(chunk)
+    digest = h.hexdigest()
+    remember_digest(path, digest, sig=sig)
+    return digest
+
+
+def remember_digest(path: str, digest: str, sig: Optional[tuple] = None) -> None:
+    """Register a digest already computed elsewhere (e.g. while downloading)."""
+    try:
+        sig = sig or _file_signature(path)
+    except OSError:
+        return
+    with _lock:
+        if len(_digest_memo) >= _DIGEST_MEMO_MAX:
+            _digest_memo.pop(next(iter(_digest_memo)))
+        _digest_memo[sig] = digest
+
+
+def make_key(model_digest: str, profile_path: Optional[str]) -> str:
+    """Combine the model digest and the slicer profile digest into a cache key."""
+    profile_digest = "noprofile"
+    if profile_path and os.path.exists(profile_path):
+        profile_digest = file_digest(profile_path)
+    return hashlib.sha256(f"{model_digest}:{profile_digest}".encode()).hexdigest()
+
+
+def _entry_path(key: str) -> str:
+    return os.path.join(_cache_dir(), f"{key}.json")
+
+
+def get(key: str) -> Optional[Dict]:
+    """Return cached metrics for key or None. Expired entries count as misses."""
+    path = _entry_path(key)
+    max_age = int(settings.SLICE_CACHE_MAX_AGE_SEC or 0)
+    try:
+        st = os.stat(path)
+        if max_age and (time.time() - st.st_mtime) > max_age:
+            os.remove(path)
+            raise FileNotFoundError(path)
+        with open(path, "r") as f:
+            metrics = json.load(f)
+        # touch entry so it becomes most recently used
+        os.utime(path, None)
+    except (OSError, ValueError):
+        with _lock:
+            _stats["misses"] += 1
+        return None
+
+    with _lock:
+        _stats["hits"] += 1
+    return metrics
+
+
+def put(key: str, metrics: Dict) -> None:
+    """Store metrics for key (atomic write) and run eviction."""
+    # raw_gcode_path points to a temp file that callers delete: never cache it
+    data = {k: v for k, v in metrics.items() if k != "raw_gcode_path"}
+    directory = _cache_dir()
+    try:
+        fd, tmp_path = tempfile.mkstemp(suffix=".tmp", dir=directory)
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, _entry_path(key))
+    except Exception as e:
+        logger.warning("Failed to store slice cache entry %s: %s", key, e)
+        return
+
+    with _lock:
+        _stats["stores"] += 1
+    evict()
+
+
+def evict() -> int:
+    """Remove expired entries, then least recently used ones until the cache fits
+    in SLICE_CACHE_MAX_MB. Returns the number of removed entries.
+    """
+    max_bytes = int(settings.SLICE_CACHE_MAX_MB or 0) * 1024 * 1024
+    max_age = int(settings.SLICE_CACHE_MAX_AGE_SEC or 0)
+    now = time.time()
+    directory = _cache_dir()
+
+    entries = []
+    for name in os.listdir(directory):
+        if not name.endswith(".json"):
+            continue
+        path = os.path.join(directory, name)
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        entries.append((st.st_mtime, st.st_size, path))
+
+    removed = 0
+    total = sum(e[1] for e in entries)
+    entries.sort()  # oldest access first
+    for mtime, size, path in entries:
+        expired = max_age and (now - mtime) > max_age
+        too_big = max_bytes and total > max_bytes
+        if not (expired or too_big):
+            continue
+        try:
+            os.remove(path)
+            removed += 1
+            total -= size
+        except OSError:
+            pass
+
+    if removed:
+        with _lock:
+            _stats["evictions"] += removed
+    return removed
+
+
+def stats() -> Dict:
+    """Return a snapshot of hit/miss counters."""
+    with _lock:
+        return dict(_stats)
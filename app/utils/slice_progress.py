@@ -0,0 +1,96 @@
+import time
+import queue
+import threading
+from typing import Dict, List, Optional, Set
+
+from app.core.config import settings
+
+# In-process pub/sub of slicing progress, keyed by channel (the item id).
+# Publishers are worker threads; subscribers (SSE responses) get their own queue,
+# pre-filled with the last event so late subscribers see the current state.
+# A slice can be linked to several channels: requests coalesced onto one slicer
+# run (single-flight) all receive its progress.
+
+ESTADO_FINAL = ("completado", "fallido")
+
+
+class ProgressHub:
+    def __init__(self, ttl_sec: float = 600.0, max_queue: int = 256):
+        self.ttl_sec = ttl_sec
+        self.max_queue = max_queue
+        self._lock = threading.Lock()
+        self._last: Dict[str, Dict] = {}
+        self._finished_at: Dict[str, float] = {}
+        self._subs: Dict[str, List[queue.Queue]] = {}
+        self._links: Dict[str, Set[str]] = {}
+
+    def link(self, source: str, channel: str) -> None:
+        """Forward events published on `source` to `channel` too."""
+        with self._lock:
+            self._links.setdefault(source, set()).add(channel)
+
+    def unlink(self, source: str, channel: str) -> None:
+        with self._lock:
+            channels = self._links.get(source)
+            if channels:
+                channels.discard(channel)
+                if not channels:
+                    del self._links[source]
+
+    def publish(self, channel: str, event: Dict, retain: bool = True) -> None:
+        """Deliver event to `channel` and the channels linked to it.
+
+        retain=False: `channel` is only a forwarding source (e.g. a slice flight):
+        its own last state is not kept, only the linked channels' is. Otherwise it
+        would never be pruned, since sources never get a final event.
+        """
+        event = dict(event, ts=time.time())
+        with self._lock:
+            targets = {channel} | self._links.get(channel, set())
+            for target in targets:
+                if retain or target != channel:
+                    self._last[target] = event
+                    if event.get("estado") in ESTADO_FINAL:
+                        self._finished_at[target] = time.monotonic()
+                for q in self._subs.get(target, ()):
+                    try:
+                        q.put_nowait(event)
+                    except queue.Full:
+                        # slow reader: drop its oldest update, never the newest state
+                        try:
+                            q.get_nowait()
+                        except queue.Empty:
+                            pass
+                        q.put_nowait(event)
+            self._prune()
+
+    def subscribe(self, channel: str) -> queue.Queue:
+        q: queue.Queue = queue.Queue(maxsize=self.max_queue)
+        with self._lock:
+            self._subs.setdefault(channel, []).append(q)
+            if channel in self._last:
+                q.put_nowait(self._last[channel])
+        return q
+
+    def unsubscribe(self, channel: str, q: queue.Queue) -> None:
+        with self._lock:
+            subs = self._subs.get(channel)
+            if subs and q in subs:
+                subs.remove(q)
+                if not subs:
+                    del self._subs[channel]
+
+    def last(self, channel: str) -> Optional[Dict]:
+        with self._lock:
+            return self._last.get(channel)
+
+    def _prune(self) -> None:
+        # caller holds _lock; forget finished channels nobody listens to anymore
+        now = time.monotonic()
+        for channel in [c for c, t in self._finished_at.items() if now - t > self.ttl_sec]:
+            if channel not in self._subs:
+                self._last.pop(channel, None)
+                self._finished_at.pop(channel, None)
+
+
+hub = ProgressHub(ttl_sec=settings.SLICE_PROGRESS_TTL_SEC)
@@ -0,0 +1,139 @@
+import os
+import re
+import zipfile
+from typing import Dict, List, Optional
+
+# Split a multi-object 3MF plate into one 3MF per build item, so each object can
+# be sliced by its own PrusaSlicer process, and add the per-object metrics back up.
+# The model XML is rewritten at byte level: the <build> keeps a single <item> and
+# <resources> keeps only the objects that item references (components included).
+
+MODEL_PATH = "3D/3dmodel.model"
+
+_OBJECT_START_RE = re.compile(rb'<(?:[\w.-]+:)?object\b([^>]*)>')
+_OBJECT_END_RE = re.compile(rb'</(?:[\w.-]+:)?object\s*>')
+_ID_RE = re.compile(rb'\bid\s*=\s*["\']([^"\']*)["\']')
+_OBJECTID_RE = re.compile(rb'\bobjectid\s*=\s*["\']([^"\']*)["\']')
+_PATH_ATTR_RE = re.compile(rb'\b[\w.-]+:path\s*=')
+_COMPONENT_RE = re.compile(rb'<(?:[\w.-]+:)?component\b([^>]*)>')
+_BUILD_RE = re.compile(rb'(<(?:[\w.-]+:)?build\b[^>]*>)(.*?)(</(?:[\w.-]+:)?build\s*>)', re.S)
+_ITEM_RE = re.compile(rb'<(?:[\w.-]+:)?item\b[^>]*?(?:/>|>.*?</(?:[\w.-]+:)?item\s*>)', re.S)
+
+
+def _object_spans(model: bytes) -> Dict[bytes, tuple]:
+    """object id -> (start, end, referenced object ids) for the <object> blocks."""
+    spans = {}
+    for m in _OBJECT_START_RE.finditer(model):
+        id_match = _ID_RE.search(m.group(1))
+        if not id_match:
+            continue
+        if m.group(1).rstrip().endswith(b"/"):
+            end = m.end()
+        else:
+            close = _OBJECT_END_RE.search(model, m.end())
+            if not close:
+                raise ValueError("Malformed 3MF model: unclosed <object>")
+            end = close.end()
+        deps = [
+            _OBJECTID_RE.search(c.group(1)).group(1)
+            for c in _COMPONENT_RE.finditer(model, m.end(), end)
+            # components in other model parts (p:path) are kept with their part
+            if _OBJECTID_RE.search(c.group(1)) and not _PATH_ATTR_RE.search(c.group(1))
+        ]
+        spans[id_match.group(1)] = (m.start(), end, deps)
+    return spans
+
+
+def build_items(model: bytes) -> List[bytes]:
+    build = _BUILD_RE.search(model)
+    return _ITEM_RE.findall(build.group(2)) if build else []
+
+
+def _model_for_item(model: bytes, spans: Dict[bytes, tuple], item: bytes) -> bytes:
+    keep = set()
+    todo = [_OBJECTID_RE.search(item).group(1)]
+    while todo:
+        object_id = todo.pop()
+        if object_id in keep or object_id not in spans:
+            continue
+        keep.add(object_id)
+        todo.extend(spans[object_id][2])
+
+    out = []
+    pos = 0
+    for object_id, (start, end, _) in sorted(spans.items(), key=lambda kv: kv[1][0]):
+        if object_id not in keep:
+            out.append(model[pos:start])
+            pos = end
+    out.append(model[pos:])
+    reduced = b"".join(out)
+
+    build = _BUILD_RE.search(reduced)
+    return reduced[:build.start(2)] + item + reduced[build.end(2):]
+
+
+def split_3mf(path: str, out_dir: str, prefix: str) -> List[str]:
+    """Write one 3MF per build item into out_dir (<prefix>_<i>.3mf).
+
+    Returns the list of paths, or [] when the plate has a single item (nothing to
+    split). Every other part of the package (metadata, slicer config) is copied.
+    """
+    with zipfile.ZipFile(path, "r") as src:
+        model = src.read(MODEL_PATH)
+        items = build_items(model)
+        if len(items) < 2:
+            return []
+        spans = _object_spans(model)
+        others = [(info, src.read(info.filename)) for info in src.infolist() if info.filename != MODEL_PATH]
+
+    paths = []
+    for i, item in enumerate(items):
+        sub_path = os.path.join(out_dir, f"{prefix}_{i}.3mf")
+        with zipfile.ZipFile(sub_path, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=1) as dst:
+            for info, data in others:
+                dst.writestr(info, data)
+            dst.writestr(MODEL_PATH, _model_for_item(model, spans, item))
+        paths.append(sub_path)
+    return paths
+
+
+def _sum(values) -> Optional[float]:
+    values = [v for v in values if v is not None]
+    return sum(values) if values else None
+
+
+def merge_metrics(parts: List[Dict]) -> Dict:
+    """Add up per-object slicer metrics into plate totals.
+
+    cost, time, tool changes, per-tool filament and per-feature time are summed
+    (objects printed one after another); layers is the max. The sum ignores what
+    a merged plate shares (one heat-up, interleaved layers), hence the benchmark.
+    """
+    merged: Dict = {
+        "cost": _sum(p.get("cost") for p in parts),
+        "time": _sum(p.get("time") for p in parts),
+        "tool_changes": int(sum(p.get("tool_changes") or 0 for p in parts)),
+    }
+    if merged["cost"] is not None:
+        merged["cost"] = round(merged["cost"], 3)
+    if merged["time"] is not None:
+        merged["time"] = round(merged["time"], 3)
+
+    if any("per_tool" in p for p in parts):
+        tools: Dict[int, Dict] = {}
+        for p in parts:
+            for t in p.get("per_tool") or []:
+                acc = tools.setdefault(t["tool"], {"tool": t["tool"], "filament_mm": 0.0, "filament_g": 0.0,
+                                                   "cost": 0.0, "filament_colour": t.get("filament_colour")})
+                for k in ("filament_mm", "filament_g", "cost"):
+                    acc[k] = round(acc[k] + (t.get(k) or 0), 3)
+        merged["per_tool"] = [tools[k] for k in sorted(tools)]
+        merged["layers"] = max(p.get("layers") or 0 for p in parts)
+        feature_time: Dict[str, float] = {}
+        for p in parts:
+            for k, v in (p.get("feature_time") or {}).items():
+                feature_time[k] = round(feature_time.get(k, 0) + v, 3)
+        merged["feature_time"] = feature_time
+
+    merged["split_objects"] = len(parts)
+    return merged
@@ -3,13 +3,23 @@ import re
 import shutil
 import tempfile
 import math
+import time
 import logging
 import subprocess
+import threading
 import zipfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import urlparse, unquote
-from typing import Dict, Tuple, Optional
+from typing import Callable, Dict, List, Tuple, Optional, Union
 
 from app.core.config import settings
+from app.utils import slice_cache, download_cache, mesh3mf, slice_split, gcode_store
+from app.utils.gcode_analyzer import analyze_gcode
+from app.utils.downloader import fetch_to_file, fetch_s3_to_file, link_or_copy, remove_quietly
+from app.utils.singleflight import SingleFlight
+from app.utils.slice_batcher import SliceBatcher
+from app.utils.slice_progress import hub as progress_hub
 
 from fastapi import HTTPException
 
@@ -24,6 +34,11 @@ COST_RE = re.compile(r";\s*total filament cost\s*=\s*([\d.]+)", re.I)
 EST_TIME_RE = re.compile(r";\s*estimated printing time(?:\s*\([^)]+\))?\s*=\s*([0-9hms\s:]+)", re.I)
 TOOL_CHANGE_RE = re.compile(r";\s*total toolchanges\s*=\s*(\d+)", re.I)
 
+# PrusaSlicer CLI progress lines, e.g. "45 => Making infill"
+PROGRESS_RE = re.compile(r"^\s*(\d{1,3})\s*=>\s*(.*?)\s*$")
+
+ProgressCallback = Callable[[int, str], None]
+
 
 def _parse_time_to_seconds(timestr: str) -> Optional[float]:
     """Parse a time string like '1h 23m', '83m', '1:23:45', '2h 52m 11s' and return
@@ -75,6 +90,22 @@ def _parse_time_to_seconds(timestr: str) -> Optional[float]:
     return None
 
 
+def _build_metrics(cost_str: Optional[str], time_str: Optional[str], tool_str: Optional[str]) -> Dict:
+    """Convert the raw captured summary values into the metrics dict."""
+    cost = float(cost_str) if cost_str else None
+
+    # estimated time (convert to hours float)
+    time_hours = _parse_time_to_seconds(time_str) if time_str else None
+
+    tool_changes = int(tool_str) if tool_str else 0
+
+    return {
+        "cost": float(round(cost, 3)) if cost is not None else None,
+        "time": round(time_hours, 3) if time_hours is not None else None,
+        "tool_changes": int(tool_changes),
+    }
+
+
 def parse_gcode_metrics(gcode_text: str) -> Dict:
     """Extract three summary metrics from gcode text:
 
@@ -84,29 +115,105 @@ def parse_gcode_metrics(gcode_text: str) -> Dict:
 
     Returns a dict: {"cost": float|None, "time": float|None, "tool_changes": int}
     """
-    metrics: Dict = {}
-
-    # cost
     cm = COST_RE.search(gcode_text)
-    cost = float(cm.group(1)) if cm and cm.group(1) else None
-
-    # estimated time (convert to hours float)
     tm = EST_TIME_RE.search(gcode_text)
-    time_hours = None
-    if tm and tm.group(1):
-        time_hours = _parse_time_to_seconds(tm.group(1))
-
-    # tool changes
     tmch = TOOL_CHANGE_RE.search(gcode_text)
-    tool_changes = int(tmch.group(1)) if tmch and tmch.group(1) else 0
 
-    metrics.update({
-        "cost": float(round(cost, 3)) if cost is not None else None,
-        "time": round(time_hours, 3) if time_hours is not None else None,
-        "tool_changes": int(tool_changes),
-    })
+    return _build_metrics(
+        cm.group(1) if cm else None,
+        tm.group(1) if tm else None,
+        tmch.group(1) if tmch else None,
+    )
+
+
+# Same patterns over bytes, used by the file-based parser below
+_SUMMARY_PATTERNS_B = {
+    "cost": re.compile(COST_RE.pattern.encode(), re.I),
+    "time": re.compile(EST_TIME_RE.pattern.encode(), re.I),
+    "tool_changes": re.compile(TOOL_CHANGE_RE.pattern.encode(), re.I),
+}
+
+GCODE_TAIL_BLOCK = 64 * 1024
+# PrusaSlicer's summary + config block is well under this; beyond it we fall back
+GCODE_TAIL_MAX = 4 * 1024 * 1024
+GCODE_SCAN_CHUNK = 1024 * 1024
+# Upper bound for a single line carried between blocks
+_MAX_CARRY = 64 * 1024
+
+
+def _search_missing(buf: bytes, found: Dict[str, bytes]) -> None:
+    for key, pattern in _SUMMARY_PATTERNS_B.items():
+        if key in found:
+            continue
+        m = pattern.search(buf)
+        if m:
+            found[key] = m.group(1)
 
-    return metrics
+
+def _scan_gcode_tail(f, size: int, found: Dict[str, bytes]) -> None:
+    """Read the file backwards in GCODE_TAIL_BLOCK blocks (up to GCODE_TAIL_MAX bytes)
+    and stop as soon as all summary keys are found.
+    """
+    pos = size
+    carry = b""  # partial line at the start of the previously read region
+    while pos > 0 and (size - pos) < GCODE_TAIL_MAX and len(found) < len(_SUMMARY_PATTERNS_B):
+        start = max(0, pos - GCODE_TAIL_BLOCK)
+        f.seek(start)
+        data = f.read(pos - start) + carry
+        pos = start
+        if start > 0:
+            # the first line may be cut: search only complete lines, carry the rest
+            nl = data.find(b"\n")
+            if nl == -1:
+                carry = data[-_MAX_CARRY:]
+                continue
+            carry, data = data[:nl + 1][-_MAX_CARRY:], data[nl + 1:]
+        else:
+            carry = b""
+        _search_missing(data, found)
+
+
+def _scan_gcode_forward(f, found: Dict[str, bytes]) -> None:
+    """Fallback: scan the whole file forward in GCODE_SCAN_CHUNK chunks with bounded memory."""
+    f.seek(0)
+    carry = b""
+    while len(found) < len(_SUMMARY_PATTERNS_B):
+        chunk = f.read(GCODE_SCAN_CHUNK)
+        if not chunk:
+            if carry:
+                _search_missing(carry, found)
+            break
+        data = carry + chunk
+        nl = data.rfind(b"\n")
+        if nl == -1:
+            carry = data[-_MAX_CARRY:]
+            continue
+        data, carry = data[:nl + 1], data[nl + 1:][-_MAX_CARRY:]
+        _search_missing(data, found)
+
+
+def parse_gcode_metrics_file(gcode_path: str) -> Dict:
+    """Same result as parse_gcode_metrics, reading only what is needed from the file.
+
+    PrusaSlicer writes the summary lines at the end of the G-code, so the file is
+    scanned backwards first. If cost or time are not found in the tail, a chunked
+    forward scan over the whole file is used instead. The toolchanges line is only
+    written for multi-material prints, so once cost and time are found in the tail
+    a missing toolchanges line means 0.
+    """
+    found: Dict[str, bytes] = {}
+    with open(gcode_path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        _scan_gcode_tail(f, size, found)
+        if "cost" not in found or "time" not in found:
+            found.clear()
+            _scan_gcode_forward(f, found)
+
+    def _val(key: str) -> Optional[str]:
+        v = found.get(key)
+        return v.decode("ascii", errors="ignore") if v else None
+
+    return _build_metrics(_val("cost"), _val("time"), _val("tool_changes"))
 
 
 def _gdrive_direct_url(file_url: str) -> str | None:
@@ -133,12 +240,92 @@ def _gdrive_direct_url(file_url: str) -> str | None:
             return f"https://drive.google.com/uc?export=download&id={file_id}"
     return None
 
+def _validate_3mf(tmp_path: str) -> None:
+    """Verify the file is a ZIP containing [Content_Types].xml (OPC/3MF).
+    Removes the file and raises HTTPException (400) when it is not.
+    """
+    if not zipfile.is_zipfile(tmp_path):
+        remove_quietly(tmp_path)
+        raise HTTPException(status_code=400, detail="Downloaded file is not a valid 3MF (not a ZIP container)")
+
+    try:
+        with zipfile.ZipFile(tmp_path, "r") as z:
+            namelist = z.namelist()
+    except Exception as e:
+        logger.exception("Error inspecting downloaded zip file: %s", e)
+        remove_quietly(tmp_path)
+        raise HTTPException(status_code=400, detail=f"Failed to validate downloaded file: {e}")
+
+    if "[Content_Types].xml" not in namelist:
+        remove_quietly(tmp_path)
+        raise HTTPException(status_code=400, detail="Downloaded file is not a valid 3MF (missing [Content_Types].xml)")
+
+
+def _validate_mesh(tmp_path: str) -> None:
+    """Reject unprintable models (empty, open/non-manifold, degenerate, larger
+    than the bed) before they reach the slicer. Removes the file and raises
+    HTTPException (422) with the list of problems. Models our parser cannot
+    read are left for PrusaSlicer to judge.
+    """
+    if not settings.MESH_CHECK_ENABLED:
+        return
+    try:
+        problems = mesh3mf.check_printability(
+            mesh3mf.load_mesh(tmp_path),
+            (settings.BED_SIZE_X_MM, settings.BED_SIZE_Y_MM, settings.BED_SIZE_Z_MM),
+            max_bad_edge_fraction=settings.MESH_MAX_BAD_EDGE_FRACTION,
+            max_degenerate_fraction=settings.MESH_MAX_DEGENERATE_FRACTION,
+        )
+    except Exception as e:
+        logger.warning("Mesh check skipped for %s: %s", tmp_path, e)
+        return
+    if problems:
+        remove_quietly(tmp_path)
+        raise HTTPException(status_code=422, detail={
+            "codigo": "MODELO_NO_IMPRIMIBLE",
+            "mensaje": "The 3MF model is not printable",
+            "problemas": problems,
+        })
+
+
+# Concurrent identical downloads / slices share one execution
+download_flight = SingleFlight("download_3mf")
+slice_flight = SingleFlight("slice")
+
+
+def _private_copy(shared_path: str, is_leader: bool) -> str:
+    """Give each caller of a coalesced download its own temp file (hard link)."""
+    tmp_dir = os.environ.get("TMP_DIR", tempfile.gettempdir())
+    fd, tmp_path = tempfile.mkstemp(suffix=".3mf", dir=tmp_dir)
+    os.close(fd)
+    link_or_copy(shared_path, tmp_path)
+    slice_cache.remember_digest(tmp_path, slice_cache.file_digest(shared_path))
+    return tmp_path
+
+
 def download_3mf(file_url: str) -> str:
+    """
+    Same as _download_3mf, but concurrent calls for the same (normalized) URL are
+    coalesced into one download. Every caller gets its own temp file, which it
+    owns and must delete as before.
+    """
+    key = _gdrive_direct_url(file_url) or file_url
+    try:
+        return download_flight.do(key, lambda: _download_3mf(file_url), timeout=settings.SINGLEFLIGHT_WAIT_SEC,
+                                  share=_private_copy, release=remove_quietly)
+    except TimeoutError:
+        raise HTTPException(status_code=504, detail="Timed out waiting for a concurrent download of the same file")
+
+
+def _download_3mf(file_url: str) -> str:
     """
     Download a .3mf from an HTTP(S) URL or s3:// URL to a temporary file.
     Returns local filepath (string). Raises HTTPException on invalid input/failure.
     Validation strategy: stream-download with size limit, then verify file is a ZIP
-    containing [Content_Types].xml (typical for OPC/3MF).
+    containing [Content_Types].xml (typical for OPC/3MF), then a printability check
+    of the mesh (_validate_mesh).
+    HTTP downloads go through app.utils.downloader (pooled sessions, Range resume);
+    the sha256 computed while streaming is registered for the slice cache.
     """
     # Lazy import requests (like original) to keep optional deps
     try:
@@ -150,38 +337,51 @@ def download_3mf(file_url: str) -> str:
     tmp_dir = os.environ.get("TMP_DIR", tempfile.gettempdir())
     parsed = urlparse(file_url)
 
-    # -- s3:// handling (keep previous behavior) --
+    # -- s3:// handling (head_object size check + parallel ranged parts) --
     if parsed.scheme == "s3":
         try:
             import boto3  # type: ignore
         except Exception:
             logger.error("boto3 not available to handle s3:// URLs; please provide a presigned HTTPS URL or install boto3")
             raise HTTPException(status_code=400, detail="boto3 not installed; cannot handle s3:// URLs. Provide a presigned HTTPS URL or install boto3 on the server.")
+        tmp_path = None
         try:
             s3 = boto3.client("s3")
             bucket = parsed.netloc
             key = parsed.path.lstrip("/")
+
+            # size check before fetching anything
+            head = s3.head_object(Bucket=bucket, Key=key)
+            etag = head.get("ETag")
+            size = int(head.get("ContentLength") or 0)
+            if size / (1024 * 1024) > max_mb:
+                raise HTTPException(status_code=400, detail="File exceeds maximum allowed size")
+
             fd, tmp_path = tempfile.mkstemp(suffix=".3mf", dir=tmp_dir)
             os.close(fd)
-            with open(tmp_path, "wb") as f:
-                s3.download_fileobj(bucket, key, f)
-            size_mb = os.path.getsize(tmp_path) / (1024 * 1024)
-            if size_mb > max_mb:
-                os.remove(tmp_path)
-                raise HTTPException(status_code=400, detail="File exceeds maximum allowed size")
+
+            # unchanged ETag: reuse the cached copy
+            # (if the entry was evicted since lookup, fall through and download it)
+            cached = download_cache.lookup(file_url)
+            if cached and etag and cached.get("etag") == etag and download_cache.materialize(cached, tmp_path):
+                download_cache.record_revalidation()
+                slice_cache.remember_digest(tmp_path, cached["sha256"])
+                return tmp_path
+
+            # concurrent ranged part downloads into a preallocated file
+            fetch_s3_to_file(s3, bucket, key, tmp_path, size, etag=etag)
             # Validate structure (zip + [Content_Types].xml)
-            if not zipfile.is_zipfile(tmp_path):
-                os.remove(tmp_path)
-                raise HTTPException(status_code=400, detail="Downloaded file is not a valid 3MF (not a ZIP container)")
-            with zipfile.ZipFile(tmp_path, "r") as z:
-                if "[Content_Types].xml" not in z.namelist():
-                    os.remove(tmp_path)
-                    raise HTTPException(status_code=400, detail="Downloaded file is not a valid 3MF (missing [Content_Types].xml)")
+            _validate_3mf(tmp_path)
+            _validate_mesh(tmp_path)
+            download_cache.store(file_url, tmp_path, slice_cache.file_digest(tmp_path), size,
+                                 etag=etag, last_modified=str(head.get("LastModified") or "") or None)
             return tmp_path
         except HTTPException:
             raise
         except Exception as e:
             logger.exception("Failed to download from s3: %s", e)
+            if tmp_path:
+                remove_quietly(tmp_path)
             raise HTTPException(status_code=400, detail=f"Failed to download s3 object: {e}")
 
     # -- If Google Drive shared link, transform to direct download --
@@ -196,66 +396,218 @@ def download_3mf(file_url: str) -> str:
         logger.error("requests is required for HTTP downloads but is not installed")
         raise HTTPException(status_code=500, detail="Server misconfiguration: 'requests' library required to download HTTP URLs")
 
-    try:
-        resp = requests.get(file_url, stream=True, timeout=30, allow_redirects=True)
-    except Exception as e:
-        logger.exception("Failed to GET file URL: %s", e)
-        raise HTTPException(status_code=400, detail=f"Failed to download file: {e}")
-
-    if resp.status_code != 200:
-        raise HTTPException(status_code=400, detail=f"Failed to download file: status {resp.status_code}")
-
     # create temp file
     fd, tmp_path = tempfile.mkstemp(suffix=".3mf", dir=tmp_dir)
     os.close(fd)
 
-    size = 0
-    try:
-        with open(tmp_path, "wb") as f:
-            for chunk in resp.iter_content(chunk_size=8192):
-                if chunk:
-                    f.write(chunk)
-                    size += len(chunk)
-                    if (size / (1024 * 1024)) > max_mb:
-                        f.close()
-                        os.remove(tmp_path)
-                        raise HTTPException(status_code=400, detail="File exceeds maximum allowed size")
-        # after fully written, validate ZIP + OPC structure
-        if not zipfile.is_zipfile(tmp_path):
-            os.remove(tmp_path)
-            raise HTTPException(status_code=400, detail="Downloaded file is not a valid 3MF (not a ZIP container)")
-
+    # revalidate a cached copy of the same URL with a conditional GET
+    cached = download_cache.lookup(file_url)
+    headers = download_cache.conditional_headers(cached)
+    while True:
         try:
-            with zipfile.ZipFile(tmp_path, "r") as z:
-                namelist = z.namelist()
-                if "[Content_Types].xml" not in namelist:
-                    os.remove(tmp_path)
-                    raise HTTPException(status_code=400, detail="Downloaded file is not a valid 3MF (missing [Content_Types].xml)")
+            result = fetch_to_file(file_url, tmp_path, max_bytes=int(max_mb * 1024 * 1024), headers=headers)
         except HTTPException:
+            remove_quietly(tmp_path)
             raise
         except Exception as e:
-            logger.exception("Error inspecting downloaded zip file: %s", e)
-            if os.path.exists(tmp_path):
-                os.remove(tmp_path)
-            raise HTTPException(status_code=400, detail=f"Failed to validate downloaded file: {e}")
+            logger.exception("Error writing downloaded file: %s", e)
+            remove_quietly(tmp_path)
+            raise HTTPException(status_code=400, detail=f"Failed to save downloaded file: {e}")
+        if result is not None:
+            break
+
+        # not modified: reuse the cached file (already validated when stored)
+        if download_cache.materialize(cached, tmp_path):
+            download_cache.record_revalidation()
+            slice_cache.remember_digest(tmp_path, cached["sha256"])
+            return tmp_path
+        # evicted between lookup and the 304 (no body received): fetch unconditionally,
+        # which never returns None
+        headers = {}
+
+    # after fully written, validate ZIP + OPC structure
+    _validate_3mf(tmp_path)
+    _validate_mesh(tmp_path)
+    slice_cache.remember_digest(tmp_path, result.sha256)
+    download_cache.store(file_url, tmp_path, result.sha256, result.size, result.etag, result.last_modified)
+    return tmp_path
+
+
+def _model_key(model_3mf_path: str) -> str:
+    """Model part of the slice cache key: the canonical mesh fingerprint, so
+    re-exports of the same model hit the same entry; file sha256 as fallback."""
+    if settings.SLICE_CACHE_GEOMETRY_KEY:
+        try:
+            return "mesh:" + mesh3mf.fingerprint(model_3mf_path)
+        except Exception as e:
+            logger.warning("Mesh fingerprint failed for %s, using file digest: %s", model_3mf_path, e)
+    return slice_cache.file_digest(model_3mf_path)
 
-        return tmp_path
 
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.exception("Error writing downloaded file: %s", e)
-        if os.path.exists(tmp_path):
-            os.remove(tmp_path)
-        raise HTTPException(status_code=400, detail=f"Failed to save downloaded file: {e}")
+def slice_key(model_3mf_path: str) -> str:
+    """Key identifying the slice result of a model: mesh + profile + slicing mode.
+    Used by the slice cache and stored with precomputed catalog metrics."""
+    # split mode sums per-object metrics, which differ from a merged slice
+    mode = ":split" if settings.SLICE_SPLIT_OBJECTS else ""
+    return slice_cache.make_key(_model_key(model_3mf_path) + mode, settings.SLICER_PROFILE_PATH)
 
 
-def run_prusaslicer_and_parse_metrics(model_3mf_path: str) -> Dict:
+def run_prusaslicer_and_parse_metrics(model_3mf_path: str, use_cache: bool = True,
+                                      progress_key: Optional[str] = None) -> Dict:
     """Run PrusaSlicer CLI to export G-code for the given 3MF and parse metrics.
 
+    Results are cached on disk by (3MF mesh fingerprint, profile content); pass
+    use_cache=False (or set SLICE_CACHE_ENABLED=false) to force a fresh slice.
+    On a cache hit "raw_gcode_path" is None since no G-code is produced.
+    The G-code is kept compressed in app.utils.gcode_store; "gcode_artifact" is
+    its key (None when not stored, e.g. split slices or evicted artifacts).
+
+    With progress_key, slicer progress is published on that channel of
+    app.utils.slice_progress.hub as {"estado": "laminando", "progreso", "mensaje"}.
+
     Returns a metrics dict.
     Raises HTTPException on failures/timeouts.
     """
+    use_cache = use_cache and settings.SLICE_CACHE_ENABLED
+
+    cache_key = None
+    if use_cache:
+        try:
+            cache_key = slice_key(model_3mf_path)
+            cached = slice_cache.get(cache_key)
+        except OSError as e:
+            logger.warning("Slice cache lookup failed: %s", e)
+            cached = None
+        if cached is not None:
+            cached["raw_gcode_path"] = None
+            cached["cache_hit"] = True
+            if cached.get("gcode_artifact") and not gcode_store.exists(cached["gcode_artifact"]):
+                # evicted: production will slice again
+                cached["gcode_artifact"] = None
+            return cached
+
+    # identical models being sliced right now: wait for that slice instead
+    flight_key = cache_key or slice_key(model_3mf_path)
+    # progress is published on the flight, so coalesced callers get it too
+    progress_source = "slice:" + flight_key
+
+    def _on_progress(percent: int, message: str) -> None:
+        progress_hub.publish(progress_source, {"estado": "laminando", "progreso": percent, "mensaje": message},
+                             retain=False)
+
+    def _slice() -> Dict:
+        if settings.SLICE_SPLIT_OBJECTS:
+            result = _run_prusaslicer_split(model_3mf_path, on_progress=_on_progress)
+        elif settings.SLICE_BATCH_ENABLED:
+            # one process slices the whole batch: its progress is not per model
+            result = get_slice_batcher().slice(model_3mf_path)
+        else:
+            result = _run_prusaslicer(model_3mf_path, on_progress=_on_progress)
+        result["gcode_artifact"] = _store_gcode(flight_key, result.get("raw_gcode_path"))
+        if cache_key:
+            slice_cache.put(cache_key, result)
+        return result
+
+    def _share(result: Dict, is_leader: bool) -> Dict:
+        if is_leader:
+            return result
+        # the G-code file belongs to the leader's caller
+        return dict(result, raw_gcode_path=None, coalesced=True)
+
+    if progress_key:
+        progress_hub.link(progress_source, progress_key)
+    try:
+        return slice_flight.do(flight_key, _slice, timeout=settings.SINGLEFLIGHT_WAIT_SEC, share=_share)
+    except TimeoutError:
+        raise HTTPException(status_code=504, detail="Slicing timed out")
+    finally:
+        if progress_key:
+            progress_hub.unlink(progress_source, progress_key)
+
+
+def _store_gcode(key: str, gcode_path: Optional[str]) -> Optional[str]:
+    """Keep the produced G-code in the artifact store; None if disabled or failed."""
+    if not (settings.GCODE_STORE_ENABLED and gcode_path):
+        return None
+    try:
+        return gcode_store.put(key, gcode_path)
+    except Exception as e:
+        logger.warning("Failed to store G-code artifact %s: %s", key, e)
+        return None
+
+
+def _run_slicer_process(cmd: List[str], timeout: float,
+                        on_progress: Optional[ProgressCallback] = None) -> Tuple[int, str]:
+    """Run the slicer with its output streamed (stderr merged into stdout).
+
+    Progress lines ("45 => Making infill") are passed to on_progress(percent,
+    message) as they are printed. The process is killed when it runs longer than
+    `timeout` or, once it has printed something, stays silent for
+    SLICE_STALL_TIMEOUT_SEC. Returns (returncode, last lines of output).
+    Raises HTTPException 504 when the slice is killed.
+    """
+    stdbuf = shutil.which("stdbuf")
+    if stdbuf:
+        # stdout to a pipe is block-buffered: force line buffering to see progress live
+        cmd = [stdbuf, "-oL", "-eL"] + list(cmd)
+    try:
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                text=True, errors="replace", bufsize=1)
+    except Exception as e:
+        logger.exception("Failed to start PrusaSlicer: %s", e)
+        raise HTTPException(status_code=500, detail=f"Failed to run slicer: {e}")
+
+    tail = deque(maxlen=50)
+    last_output = [None]
+
+    def _read() -> None:
+        for line in proc.stdout:
+            last_output[0] = time.monotonic()
+            line = line.rstrip()
+            tail.append(line)
+            match = PROGRESS_RE.match(line) if on_progress else None
+            if match:
+                try:
+                    on_progress(min(100, int(match.group(1))), match.group(2))
+                except Exception as e:
+                    logger.warning("Slice progress callback failed: %s", e)
+
+    reader = threading.Thread(target=_read, name="slicer-output", daemon=True)
+    reader.start()
+
+    stall = settings.SLICE_STALL_TIMEOUT_SEC
+    deadline = time.monotonic() + timeout
+    killed = None
+    # the reader ends at EOF, i.e. as soon as the slicer exits
+    while reader.is_alive():
+        reader.join(timeout=0.5)
+        now = time.monotonic()
+        if now > deadline:
+            killed = f"timed out after {timeout} seconds"
+        elif stall and last_output[0] is not None and now - last_output[0] > stall:
+            killed = f"stalled, no output for {stall} seconds"
+        if killed:
+            proc.kill()
+            break
+    try:
+        proc.wait(timeout=max(1.0, deadline - time.monotonic()))
+    except subprocess.TimeoutExpired:
+        # closed its output but kept running
+        killed = killed or f"timed out after {timeout} seconds"
+        proc.kill()
+        proc.wait()
+    reader.join(timeout=5)
+    proc.stdout.close()
+
+    output = "\n".join(tail)
+    if killed:
+        logger.error("PrusaSlicer %s, killed. output=%s", killed, output[-2000:])
+        raise HTTPException(status_code=504, detail="Slicing stalled" if killed.startswith("stalled") else "Slicing timed out")
+    return proc.returncode, output
+
+
+def _run_prusaslicer(model_3mf_path: str, on_progress: Optional[ProgressCallback] = None) -> Dict:
+    """Uncached slice: launch PrusaSlicer and parse the produced G-code."""
     # Prefer config values from Settings so .env entries loaded by app.core.config
     prusa_bin = settings.PRUSA_SLICER_BIN
     if not prusa_bin:
@@ -273,41 +625,173 @@ def run_prusaslicer_and_parse_metrics(model_3mf_path: str) -> Dict:
         cmd += ["--load", profile]
     cmd += ["--export-gcode", "--merge", "-o", gcode_path, model_3mf_path]
 
-    try:
-        proc = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
-    except subprocess.TimeoutExpired:
-        # attempt to kill and cleanup
-        logger.exception("PrusaSlicer timed out after %s seconds", timeout)
-        raise HTTPException(status_code=504, detail="Slicing timed out")
-    except Exception as e:
-        logger.exception("Failed to start PrusaSlicer: %s", e)
-        raise HTTPException(status_code=500, detail=f"Failed to run slicer: {e}")
-
-    # log limited stdout/stderr
-    out = (proc.stdout or "")[:4000]
-    err = (proc.stderr or "")[:4000]
-    if proc.returncode != 0:
-        logger.error("PrusaSlicer failed (%s). stdout=%s stderr=%s", proc.returncode, out, err)
-        raise HTTPException(status_code=500, detail=f"Slicer failed: {err[:300]}")
+    returncode, output = _run_slicer_process(cmd, timeout, on_progress)
+    if returncode != 0:
+        logger.error("PrusaSlicer failed (%s). output=%s", returncode, output[-4000:])
+        raise HTTPException(status_code=500, detail=f"Slicer failed: {output[-300:]}")
 
     # ensure gcode exists
     if not os.path.exists(gcode_path):
         logger.error("Expected gcode not found at %s", gcode_path)
         raise HTTPException(status_code=500, detail="Slicer did not produce gcode")
 
-    # read gcode (limit read size to avoid huge files)
-    text = ""
+    return _metrics_from_gcode(gcode_path, profile)
+
+
+def _metrics_from_gcode(gcode_path: str, profile: Optional[str]) -> Dict:
+    """Metrics dict for a produced G-code file (summary block + analyzer)."""
+    # parse metrics from the summary block (no full read of the gcode)
     try:
-        with open(gcode_path, "r", errors="ignore") as f:
-            # read up to first 50MB
-            text = f.read(50 * 1024 * 1024)
+        metrics = parse_gcode_metrics_file(gcode_path)
     except Exception as e:
         logger.exception("Failed reading gcode: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to read gcode: {e}")
 
-    # parse metrics
-    metrics = parse_gcode_metrics(text)
+    # per-tool filament, layers and time per feature (multi-color pricing)
+    if settings.GCODE_ANALYZER_ENABLED:
+        try:
+            metrics.update(analyze_gcode(gcode_path))
+        except Exception as e:
+            logger.warning("G-code analysis failed, using summary metrics only: %s", e)
+
     metrics["slicer_profile"] = os.path.basename(profile) if profile else None
     metrics["raw_gcode_path"] = gcode_path
 
-    return metrics
\ No newline at end of file
+    return metrics
+
+
+_split_executor: Optional[ThreadPoolExecutor] = None
+_split_executor_lock = threading.Lock()
+
+
+def _get_split_executor() -> ThreadPoolExecutor:
+    # shared by all requests, so it bounds the total number of per-object slicer processes
+    global _split_executor
+    with _split_executor_lock:
+        if _split_executor is None:
+            workers = settings.SLICE_SPLIT_WORKERS or os.cpu_count() or 1
+            _split_executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="slice-split")
+        return _split_executor
+
+
+def _run_prusaslicer_batch(model_paths: List[str]) -> List[Union[Dict, Exception]]:
+    """Slice several 3MF files with ONE PrusaSlicer process (no --merge: every
+    input is its own print), one G-code per input in a private output directory.
+    Returns a metrics dict or an exception per input, in order.
+
+    PrusaSlicer stops at the first model it cannot slice, so inputs left without
+    G-code are retried on their own; that isolates the failure to its request.
+    """
+    prusa_bin = settings.PRUSA_SLICER_BIN
+    if not prusa_bin:
+        raise HTTPException(status_code=500, detail="PRUSA_SLICER_BIN not configured")
+    profile = settings.SLICER_PROFILE_PATH
+    tmp_dir = settings.TMP_DIR or tempfile.gettempdir()
+    # the same file queued twice is sliced once
+    unique_paths = list(dict.fromkeys(model_paths))
+    if len(unique_paths) == 1:
+        try:
+            return [_run_prusaslicer(unique_paths[0])] * len(model_paths)
+        except Exception as e:
+            return [e] * len(model_paths)
+
+    out_dir = tempfile.mkdtemp(prefix="batch_", dir=tmp_dir)
+    by_path: Dict[str, Union[Dict, Exception]] = {}
+    try:
+        cmd = [prusa_bin]
+        if profile:
+            cmd += ["--load", profile]
+        cmd += ["--export-gcode", "--output", out_dir, "--output-filename-format", "{input_filename_base}.gcode"]
+        cmd += unique_paths
+        timeout = int(settings.SLICE_TIMEOUT_SEC or 300) * len(unique_paths)
+        try:
+            returncode, output = _run_slicer_process(cmd, timeout)
+            if returncode != 0:
+                logger.warning("Batch slice of %s models failed (%s): %s",
+                               len(unique_paths), returncode, output[-1000:])
+        except HTTPException as e:
+            logger.warning("Batch slice of %s models killed: %s", len(unique_paths), e.detail)
+
+        for path in unique_paths:
+            base_name = os.path.splitext(os.path.basename(path))[0]
+            produced = os.path.join(out_dir, f"{base_name}.gcode")
+            try:
+                if os.path.exists(produced):
+                    # same location as a single slice, so callers clean it up as before
+                    gcode_path = os.path.join(tmp_dir, f"{base_name}.gcode")
+                    os.replace(produced, gcode_path)
+                    by_path[path] = _metrics_from_gcode(gcode_path, profile)
+                else:
+                    by_path[path] = _run_prusaslicer(path)
+            except Exception as e:
+                by_path[path] = e
+    finally:
+        shutil.rmtree(out_dir, ignore_errors=True)
+    return [by_path[p] for p in model_paths]
+
+
+_batcher: Optional[SliceBatcher] = None
+_batcher_lock = threading.Lock()
+
+
+def get_slice_batcher() -> SliceBatcher:
+    global _batcher
+    with _batcher_lock:
+        if _batcher is None:
+            _batcher = SliceBatcher(
+                _run_prusaslicer_batch,
+                window_sec=settings.SLICE_BATCH_WINDOW_MS / 1000.0,
+                max_batch=settings.SLICE_BATCH_MAX,
+                concurrency=settings.SLICE_MAX_WORKERS,
+            )
+        return _batcher
+
+
+def _run_prusaslicer_split(model_3mf_path: str, on_progress: Optional[ProgressCallback] = None) -> Dict:
+    """Slice each build item of the plate in its own PrusaSlicer process, in
+    parallel, and add up the metrics (app.utils.slice_split.merge_metrics).
+    Single-object plates, or plates that cannot be split, are sliced merged.
+    """
+    tmp_dir = settings.TMP_DIR or tempfile.gettempdir()
+    work_dir = tempfile.mkdtemp(prefix="split_", dir=tmp_dir)
+    try:
+        try:
+            parts = slice_split.split_3mf(model_3mf_path, work_dir, os.path.basename(work_dir))
+        except Exception as e:
+            logger.warning("Could not split %s, slicing merged: %s", model_3mf_path, e)
+            parts = []
+        if not parts:
+            return _run_prusaslicer(model_3mf_path, on_progress)
+
+        part_progress = [0] * len(parts)
+
+        def _part_progress(i: int) -> Optional[ProgressCallback]:
+            if on_progress is None:
+                return None
+
+            def _report(percent: int, message: str) -> None:
+                # plate progress is the mean over the objects
+                part_progress[i] = percent
+                on_progress(sum(part_progress) // len(parts), message)
+            return _report
+
+        futures = [_get_split_executor().submit(_run_prusaslicer, p, _part_progress(i)) for i, p in enumerate(parts)]
+        results, error = [], None
+        for future in futures:
+            # wait for every part so no G-code is left behind on failure
+            try:
+                results.append(future.result())
+            except Exception as e:
+                error = error or e
+        for r in results:
+            if r.get("raw_gcode_path"):
+                remove_quietly(r["raw_gcode_path"])
+        if error:
+            raise error
+
+        metrics = slice_split.merge_metrics(results)
+        metrics["slicer_profile"] = results[0].get("slicer_profile")
+        metrics["raw_gcode_path"] = None
+        return metrics
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
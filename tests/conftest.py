@@ -0,0 +1,11 @@
+import os
+import tempfile
+
+# app.core.config.Settings exige estas variables al importarse; valores de prueba
+# (sin base de datos ni PrusaSlicer reales)
+_tmp = tempfile.mkdtemp(prefix="creamax-tests-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_tmp, 'test.sqlite')}")
+os.environ.setdefault("BASE_URL", "http://localhost")
+os.environ.setdefault("PRUSA_SLICER_BIN", "/bin/false")
+os.environ.setdefault("SLICER_PROFILE_PATH", os.path.join(_tmp, "profile.ini"))
+os.environ.setdefault("TMP_DIR", _tmp)
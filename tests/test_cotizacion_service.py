@@ -0,0 +1,33 @@
+import numpy as np
+
+from app.services.cotizacion_service import estimate_price_from_params, estimate_prices_bulk, precio_por_cantidad
+from app.services.reglas_precio import REGLAS_POR_DEFECTO
+
+
+def test_bulk_matches_scalar_exactly():
+    rng = np.random.default_rng(3)
+    n = 20000
+    cost = np.round(rng.uniform(50, 5000, n), 2)
+    time = np.round(rng.uniform(0.2, 30, n), 2)
+    tool_changes = rng.integers(0, 300, n)
+    include_nfc = rng.random(n) < 0.5
+
+    bulk = estimate_prices_bulk(cost, time, tool_changes, include_nfc, reglas=REGLAS_POR_DEFECTO)
+    for i in range(n):
+        params = {"slicer_metrics": {"cost": float(cost[i]), "time": float(time[i]),
+                                     "tool_changes": int(tool_changes[i])},
+                  "include_nfc": bool(include_nfc[i])}
+        cot_min, cot_max, desglose = estimate_price_from_params(params, reglas=REGLAS_POR_DEFECTO)
+        assert (cot_min, cot_max) == (bulk["cotizacion_min"][i], bulk["cotizacion_max"][i])
+        assert desglose["material"] == bulk["material"][i]
+        assert desglose["energia"] == bulk["energia"][i]
+
+
+def test_quantity_totals_match_bulk():
+    cantidad = np.arange(1, 2000)
+    bulk = estimate_prices_bulk(np.full(cantidad.size, 1234.57), np.full(cantidad.size, 3.33),
+                                cantidad=cantidad, reglas=REGLAS_POR_DEFECTO)
+    cot_min, cot_max = float(bulk["cotizacion_min"][0]), float(bulk["cotizacion_max"][0])
+    for i, c in enumerate(cantidad.tolist()):
+        precio = precio_por_cantidad(None, c, cot_min, cot_max)
+        assert (precio["total_min"], precio["total_max"]) == (bulk["total_min"][i], bulk["total_max"][i])
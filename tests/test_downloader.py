@@ -0,0 +1,106 @@
+import os
+import hashlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+from fastapi import HTTPException
+
+from app.utils.downloader import fetch_to_file
+
+BODY = os.urandom(256 * 1024)
+ETAG = '"v1"'
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Stand-in de un servidor de archivos: /file, /big (Content-Length mayor al
+    límite) y /drop (corta la conexión a mitad del cuerpo en el primer GET)."""
+
+    requests_seen = []
+    dropped = False
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        type(self).requests_seen.append((self.path, dict(self.headers)))
+        if self.path == "/big":
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(BODY)))
+            self.end_headers()
+            self.wfile.write(BODY)
+            return
+
+        range_header = self.headers.get("Range")
+        if range_header and self.headers.get("If-Range") == ETAG:
+            start = int(range_header.split("=")[1].rstrip("-"))
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{len(BODY) - 1}/{len(BODY)}")
+            self.send_header("Content-Length", str(len(BODY) - start))
+            self.send_header("ETag", ETAG)
+            self.end_headers()
+            self.wfile.write(BODY[start:])
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(BODY)))
+        self.send_header("ETag", ETAG)
+        self.end_headers()
+        if self.path == "/drop" and not type(self).dropped:
+            type(self).dropped = True
+            self.wfile.write(BODY[:len(BODY) // 2])
+            self.wfile.flush()
+            self.close_connection = True
+            return
+        self.wfile.write(BODY)
+
+
+@pytest.fixture
+def server():
+    _Handler.requests_seen = []
+    _Handler.dropped = False
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_streaming_sha256_matches_body(server, tmp_path):
+    dest = str(tmp_path / "file.3mf")
+    result = fetch_to_file(f"{server}/file", dest, max_bytes=len(BODY), session=requests.Session())
+
+    assert result.size == len(BODY)
+    assert result.sha256 == hashlib.sha256(BODY).hexdigest()
+    assert result.etag == ETAG
+    with open(dest, "rb") as f:
+        assert f.read() == BODY
+
+
+def test_content_length_over_limit_is_rejected_before_body(server, tmp_path):
+    dest = str(tmp_path / "big.3mf")
+    with pytest.raises(HTTPException) as exc:
+        fetch_to_file(f"{server}/big", dest, max_bytes=1024, session=requests.Session())
+
+    assert exc.value.status_code == 400
+    assert "maximum allowed size" in exc.value.detail
+    assert os.path.getsize(dest) == 0
+
+
+def test_resume_with_range_and_if_range_after_dropped_connection(server, tmp_path):
+    dest = str(tmp_path / "drop.3mf")
+    result = fetch_to_file(f"{server}/drop", dest, max_bytes=len(BODY), chunk_size=4096,
+                           session=requests.Session())
+
+    assert result.size == len(BODY)
+    assert result.sha256 == hashlib.sha256(BODY).hexdigest()
+    with open(dest, "rb") as f:
+        assert f.read() == BODY
+
+    first, resumed = _Handler.requests_seen
+    assert "Range" not in first[1]
+    written = int(resumed[1]["Range"].split("=")[1].rstrip("-"))
+    assert 0 < written < len(BODY)
+    assert resumed[1]["If-Range"] == ETAG
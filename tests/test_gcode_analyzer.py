@@ -0,0 +1,148 @@
+import re
+
+import numpy as np
+import pytest
+
+from app.utils.gcode_analyzer import analyze_gcode, parse_e_words
+
+CONFIG = (
+    "; prusaslicer_config = begin\n"
+    "; filament_colour = #FF0000;#00FF00\n"
+    "; filament_cost = 20000,25000\n"
+    "; filament_density = 1.24,1.27\n"
+    "; filament_diameter = 1.75,1.75\n"
+    "; use_relative_e_distances = {relative}\n"
+    "; prusaslicer_config = end\n"
+)
+SUMMARY = "; filament used [mm] = 1.0, 2.0\n; total filament cost = 1.00\n"
+
+
+def reference(text: str, relative: bool):
+    """Parser de referencia, línea por línea: posición del eje E como la lleva el firmware."""
+    body = text.split("; filament used [mm]")[0].split("; prusaslicer_config = begin")[0]
+    position, tool, layers, feature, remaining = 0.0, 0, 0, None, None
+    extruded, minutes = {}, {}
+    for line in body.splitlines():
+        if re.fullmatch(r"T\d+", line.strip()):
+            tool = int(line.strip()[1:])
+        elif line.startswith(";LAYER_CHANGE"):
+            layers += 1
+        elif line.startswith(";TYPE:"):
+            feature = line[len(";TYPE:"):].strip()
+        elif line.startswith("M73"):
+            r = int(re.match(r"M73 P\d+ R(\d+)", line).group(1))
+            if remaining is not None and r <= remaining and feature:
+                minutes[feature] = minutes.get(feature, 0) + remaining - r
+            remaining = r
+        elif line.startswith(("M82", "M83")):
+            relative = line.startswith("M83")
+        elif line.startswith("G92"):
+            m = re.search(r" E(-?[\d.]+)", line)
+            if m:
+                position = float(m.group(1))
+        elif line.startswith("G"):
+            m = re.search(r" E(-?[\d.]+)", line)
+            if m:
+                value = float(m.group(1))
+                delta = value if relative else value - position
+                position = position + value if relative else value
+                extruded[tool] = extruded.get(tool, 0.0) + delta
+    return {
+        "layers": layers,
+        "filament_mm": {t: round(v, 2) for t, v in extruded.items() if v > 0},
+        "feature_time": {k: round(v / 60.0, 3) for k, v in minutes.items()},
+    }
+
+
+def _layers(n: int, relative: bool, rng: np.random.Generator) -> str:
+    lines = []
+    e = 0.0
+    remaining = 10 * n
+    for layer in range(n):
+        lines += [";LAYER_CHANGE", f";Z:{0.2 * (layer + 1):.2f}", f"M73 P{layer} R{remaining}"]
+        remaining -= int(rng.integers(0, 3))
+        if layer % 3 == 0:
+            lines.append(f"T{layer % 2}")
+        for feature in ("Perimeter", "Solid infill"):
+            lines.append(f";TYPE:{feature}")
+            for _ in range(int(rng.integers(5, 25))):
+                step = float(rng.uniform(0.001, 2.5))
+                e = step if relative else e + step
+                lines.append(f"G1 X{rng.uniform(0, 200):.3f} Y{rng.uniform(0, 200):.3f} E{e:.5f}".replace("E0.", "E."))
+            # retracción / desretracción
+            lines += ["G1 E-.8 F2100", "G1 E.8 F2100"] if relative else [f"G1 E{e - 0.8:.5f}", f"G1 E{e:.5f}"]
+            lines.append(f"M73 P{layer} R{remaining}")
+            remaining -= int(rng.integers(0, 2))
+        if not relative and layer % 4 == 1:
+            lines.append("G92 E0")
+            e = 0.0
+    return "\n".join(lines) + "\n"
+
+
+def _write(tmp_path, body: str, relative: bool) -> str:
+    path = tmp_path / "plate.gcode"
+    path.write_text(body + SUMMARY + "\n" + CONFIG.format(relative=int(relative)))
+    return str(path)
+
+
+def _check(path: str, expected: dict, chunk_size: int) -> None:
+    result = analyze_gcode(path, chunk_size=chunk_size)
+    assert result["layers"] == expected["layers"]
+    assert result["feature_time"] == pytest.approx(expected["feature_time"])
+    got = {t["tool"]: t["filament_mm"] for t in result["per_tool"]}
+    assert got.keys() == expected["filament_mm"].keys()
+    for tool, mm in expected["filament_mm"].items():
+        assert got[tool] == pytest.approx(mm, abs=0.011)
+
+
+CHUNK_SIZES = [16, 64, 100, 1000, 16 * 1024 * 1024]
+
+
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+@pytest.mark.parametrize("relative", [True, False])
+def test_matches_reference(tmp_path, chunk_size, relative):
+    rng = np.random.default_rng(7)
+    header = "M201 X1000 Y1000 Z200 E5000\nM203 X200 Y200 Z12 E120\nM204 P1250 R1250 T1250\n"
+    header += ("M83\n" if relative else "M82\n") + "G92 E0\n"
+    body = header + _layers(12, relative, rng)
+    path = _write(tmp_path, body, relative)
+    _check(path, reference(open(path).read(), relative), chunk_size)
+
+
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+def test_mode_switches_and_resets(tmp_path, chunk_size):
+    # línea de purga en relativo, cuerpo en absoluto con G92, vuelta a relativo sin G92
+    rng = np.random.default_rng(11)
+    body = (
+        "M83\nG1 X60 E9 F1000\nG1 X100 E12.5\nG92 E5\nG1 E-.8\n"
+        "M82\nG1 X10 E20\nG1 X20 E21.5\nG92 E0\nG1 X30 E1.25\nM907 E538\n"
+        + _layers(4, False, rng)
+        + "M83\nG1 X5 E.5\nT1\nG1 X6 E1.5\nG92 E100\nG1 X7 E2\n"
+    )
+    path = _write(tmp_path, body, relative=False)
+    _check(path, reference(open(path).read(), relative=False), chunk_size)
+
+
+def test_m_code_e_words_are_not_extrusion(tmp_path):
+    body = "M83\nM203 X200 Y200 Z12 E120\nM201 E5000\nM907 E538\nG1 X1 E2.5\n"
+    path = _write(tmp_path, body, relative=True)
+    result = analyze_gcode(path, chunk_size=16)
+    assert [t["filament_mm"] for t in result["per_tool"]] == [2.5]
+
+
+def test_parse_e_words_matches_float():
+    numbers = [".03412", "-.8", "12.5", "0", "7", "1234567", "-123456", "-1234567", "3.", "-0.0001",
+               ".1234567", "999.999", "12345678", "-12345678", ".12345678"]
+    buf = "".join(n + "\n" for n in numbers).encode() + b"\0" * 8
+    starts, pos = [], 0
+    for n in numbers:
+        starts.append(pos)
+        pos += len(n) + 1
+    words = np.ndarray((len(buf) - 7,), dtype="<u8", buffer=buf, strides=(1,))
+    values, ok = parse_e_words(words[np.array(starts)])
+    for n, value, fits in zip(numbers, values, ok):
+        if len(n) <= 7:
+            assert fits, n
+            assert value == pytest.approx(float(n), rel=1e-12, abs=1e-12), n
+        else:
+            assert not fits, n
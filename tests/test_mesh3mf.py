@@ -0,0 +1,86 @@
+import zipfile
+
+import numpy as np
+import pytest
+
+from app.utils import mesh3mf
+from app.utils.mesh3mf import mesh_stats, parse_3mf
+
+CUBE_VERTICES = [(x, y, z) for x in (0, 10) for y in (0, 10) for z in (0, 10)]
+CUBE_TRIANGLES = [
+    (0, 2, 1), (1, 2, 3), (4, 5, 6), (5, 7, 6), (0, 1, 4), (1, 5, 4),
+    (2, 6, 3), (3, 6, 7), (0, 4, 2), (2, 4, 6), (1, 3, 5), (3, 7, 5),
+]
+
+
+def _model(vertices: str, triangles: str) -> str:
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<model unit="millimeter" xmlns="http://schemas.microsoft.com/3dmanufacturing/core/2015/02" '
+        'xmlns:slic3rpe="http://schemas.slic3r.org/3mf/2017/06">\n'
+        '<resources><object id="1" type="model"><mesh>\n'
+        f'<vertices>\n{vertices}</vertices>\n<triangles>\n{triangles}</triangles>\n'
+        '</mesh></object></resources>\n<build><item objectid="1"/></build>\n</model>\n'
+    )
+
+
+def _vertex(v, fmt='<vertex x="{}" y="{}" z="{}"/>\n'):
+    return fmt.format(*v)
+
+
+def _triangles(fmt='<triangle v1="{}" v2="{}" v3="{}"/>\n'):
+    return "".join(fmt.format(*t) for t in CUBE_TRIANGLES)
+
+
+def _write(tmp_path, model: str) -> str:
+    path = tmp_path / "model.3mf"
+    with zipfile.ZipFile(path, "w") as z:
+        z.writestr(mesh3mf.MODEL_PATH, model)
+    return str(path)
+
+
+def _assert_cube(mesh) -> None:
+    stats = mesh_stats(mesh)
+    assert stats["vertices"] == 8
+    assert stats["triangles"] == 12
+    assert stats["volume_mm3"] == pytest.approx(1000.0)
+    assert len(mesh.vertices) == 8
+    np.testing.assert_array_equal(mesh.vertices, np.array(CUBE_VERTICES, dtype=np.float64))
+
+
+def test_canonical_layout(tmp_path):
+    model = _model("".join(_vertex(v) for v in CUBE_VERTICES), _triangles())
+    _assert_cube(parse_3mf(_write(tmp_path, model)))
+
+
+def test_vertex_inside_comment_is_ignored(tmp_path):
+    vertices = "".join(_vertex(v) for v in CUBE_VERTICES[:4])
+    vertices += '<!-- <vertex x="99" y="99" z="99"/> </vertices> -> -->\n'
+    vertices += "".join(_vertex(v) for v in CUBE_VERTICES[4:])
+    triangles = "<!-- <triangle v1='0' v2='0' v3='0'/> -->\n" + _triangles()
+    _assert_cube(parse_3mf(_write(tmp_path, _model(vertices, triangles))))
+
+
+def test_cdata_in_payload(tmp_path):
+    vertices = "".join(_vertex(v) for v in CUBE_VERTICES) + '<![CDATA[ <vertex x="5" y="5" z="5"/> ]]>\n'
+    _assert_cube(parse_3mf(_write(tmp_path, _model(vertices, _triangles()))))
+
+
+def test_whitespace_around_equals(tmp_path):
+    vertices = "".join(_vertex(v, '<vertex x = "{}" y= "{}" z ="{}" />\n') for v in CUBE_VERTICES)
+    triangles = _triangles('<triangle v1 = "{}" v2="{}" v3 = "{}"/>\n')
+    _assert_cube(parse_3mf(_write(tmp_path, _model(vertices, triangles))))
+
+
+def test_painted_triangles_with_comment(tmp_path):
+    triangles = "<!-- painted -->\n" + _triangles('<triangle v1="{}" v2="{}" v3="{}" slic3rpe:mmu_segmentation="4"/>\n')
+    mesh = parse_3mf(_write(tmp_path, _model("".join(_vertex(v) for v in CUBE_VERTICES), triangles)))
+    _assert_cube(mesh)
+    assert list(mesh.extras) == [b"mmu_segmentation=4"] * 12
+
+
+@pytest.mark.parametrize("chunk_size", [7, 64, 1000])
+def test_comments_across_chunks(tmp_path, monkeypatch, chunk_size):
+    monkeypatch.setattr(mesh3mf, "PARSE_CHUNK_SIZE", chunk_size)
+    vertices = "".join(_vertex(v) + '<!-- a > b <vertex x="1" y="1" z="1"/> -->\n' for v in CUBE_VERTICES)
+    _assert_cube(parse_3mf(_write(tmp_path, _model(vertices, _triangles()))))
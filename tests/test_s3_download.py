@@ -0,0 +1,80 @@
+import os
+
+import boto3
+import pytest
+from botocore.exceptions import ClientError
+from fastapi import HTTPException
+from moto import mock_aws
+
+from app.utils import slicing
+from app.utils.downloader import fetch_s3_to_file
+
+BUCKET = "modelos"
+PART = 256 * 1024
+
+
+@pytest.fixture
+def s3(monkeypatch):
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    with mock_aws():
+        client = boto3.client("s3")
+        client.create_bucket(Bucket=BUCKET)
+        yield client
+
+
+def test_multipart_object_is_reassembled(s3, tmp_path):
+    # tamaño no múltiplo de la parte: la última es más corta
+    body = os.urandom(PART * 5 + 1234)
+    s3.put_object(Bucket=BUCKET, Key="modelo.3mf", Body=body)
+    head = s3.head_object(Bucket=BUCKET, Key="modelo.3mf")
+
+    dest = str(tmp_path / "modelo.3mf")
+    fetch_s3_to_file(s3, BUCKET, "modelo.3mf", dest, head["ContentLength"], etag=head["ETag"],
+                     part_size=PART, concurrency=4)
+
+    with open(dest, "rb") as f:
+        assert f.read() == body
+
+
+def test_head_object_size_over_limit_is_rejected(s3, monkeypatch):
+    s3.put_object(Bucket=BUCKET, Key="grande.3mf", Body=os.urandom(2 * 1024 * 1024))
+    monkeypatch.setenv("MAX_UPLOAD_MB", "1")
+    get_calls = []
+    monkeypatch.setattr(slicing, "fetch_s3_to_file", lambda *a, **k: get_calls.append(a))
+
+    with pytest.raises(HTTPException) as exc:
+        slicing._download_3mf(f"s3://{BUCKET}/grande.3mf")
+
+    assert exc.value.status_code == 400
+    assert "maximum allowed size" in exc.value.detail
+    assert get_calls == []
+
+
+class _OverwriteAfterFirstPart:
+    """Cliente S3 que reemplaza el objeto justo después de servir la primera parte."""
+
+    def __init__(self, client, key):
+        self.client, self.key, self.calls = client, key, 0
+
+    def get_object(self, **kwargs):
+        self.calls += 1
+        response = self.client.get_object(**kwargs)
+        if self.calls == 1:
+            self.client.put_object(Bucket=BUCKET, Key=self.key, Body=os.urandom(PART * 3))
+        return response
+
+
+def test_etag_change_mid_download_fails(s3, tmp_path):
+    s3.put_object(Bucket=BUCKET, Key="cambia.3mf", Body=os.urandom(PART * 3))
+    head = s3.head_object(Bucket=BUCKET, Key="cambia.3mf")
+    client = _OverwriteAfterFirstPart(s3, "cambia.3mf")
+
+    with pytest.raises(ClientError) as exc:
+        fetch_s3_to_file(client, BUCKET, "cambia.3mf", str(tmp_path / "cambia.3mf"), head["ContentLength"],
+                         etag=head["ETag"], part_size=PART, concurrency=1)
+
+    assert exc.value.response["Error"]["Code"] in ("PreconditionFailed", "412")
+    # la primera parte se sirvió; fallan las posteriores al cambio
+    assert client.calls > 1